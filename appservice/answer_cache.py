@@ -0,0 +1,153 @@
+"""
+RAG 답변 / 검색 결과 cache (Lambda T3, 컨테이너 메모리)
+- AnswerCache key: 정규화된 질의 + 검색된 chunk id 집합 + KB 버전 (최근 완료 ingestion job)
+  같은 chunk 집합에 대해 token-set Jaccard 유사도가 임계값 이상인 질의는 같은 답변 재사용
+- TTLCache: 정확 일치 key cache (KB retrieve 결과 등)
+- 둘 다 TTL 만료 + LRU 제거 (OrderedDict + lock - T3 batch 모드의 여러 thread에서 동시 사용)
+"""
+
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Tuple
+
+import kb_index
+
+DEFAULT_MAX_ENTRIES = 256
+DEFAULT_TTL_SECONDS = 3600
+DEFAULT_SIMILARITY = 0.75
+
+PUNCTUATION_PATTERN = re.compile(r'[^\w\s.]|(?<!\d)\.|\.(?!\d)')
+
+
+def normalize_query(query: str) -> str:
+    """
+    질의 정규화: 소문자, 문장부호 제거 (소수점 유지), 공백 정리
+    """
+    return ' '.join(PUNCTUATION_PATTERN.sub(' ', query.lower()).split())
+
+
+def jaccard(a: frozenset, b: frozenset) -> float:
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+class TTLCache:
+    """
+    정확 일치 key의 TTL + LRU cache
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES, ttl_seconds: float = DEFAULT_TTL_SECONDS,
+                 clock=time.monotonic):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.clock = clock
+        self.entries = OrderedDict()  # key -> (value, expires_at)
+        self.stats = {'hits': 0, 'misses': 0}
+        self.lock = threading.Lock()
+
+    def get(self, key) -> Optional[Any]:
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None or entry[1] <= self.clock():
+                if entry is not None:
+                    del self.entries[key]
+                self.stats['misses'] += 1
+                return None
+            self.entries.move_to_end(key)
+            self.stats['hits'] += 1
+            return entry[0]
+
+    def put(self, key, value) -> None:
+        with self.lock:
+            self.entries[key] = (value, self.clock() + self.ttl_seconds)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self.lock:
+            self.entries.clear()
+
+
+class AnswerCache:
+    """
+    질의 유사도 기반 답변 cache
+
+    같은 (KB 버전, chunk id 집합) 안에서만 유사 질의를 비교하므로,
+    검색 결과가 달라지면 (문서 갱신, 다른 주제) 자연히 cache miss가 됩니다.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES, ttl_seconds: float = DEFAULT_TTL_SECONDS,
+                 similarity: float = DEFAULT_SIMILARITY, clock=time.monotonic):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.similarity = similarity
+        self.clock = clock
+        self.entries = OrderedDict()  # (version, chunk ids, normalized query) -> entry
+        self.stats = {'hits': 0, 'near_hits': 0, 'misses': 0}
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def context_key(chunk_ids: List[str], version: str) -> Tuple[str, Tuple[str, ...]]:
+        return version, tuple(sorted(set(chunk_ids)))
+
+    def get(self, query: str, chunk_ids: List[str], version: str) -> Optional[Dict[str, Any]]:
+        """
+        Cache 조회 (정확 일치 우선, 없으면 같은 context의 가장 유사한 질의)
+
+        Returns:
+            {"answer", "match": "exact" | "similar", "similarity", "cached_query"} 또는 None
+        """
+        normalized = normalize_query(query)
+        context = self.context_key(chunk_ids, version)
+        key = context + (normalized,)
+        tokens = frozenset(kb_index.tokenize(normalized))
+
+        with self.lock:
+            now = self.clock()
+            entry = self.entries.get(key)
+            if entry is not None and entry['expires_at'] > now:
+                self.entries.move_to_end(key)
+                self.stats['hits'] += 1
+                return {'answer': entry['answer'], 'match': 'exact', 'similarity': 1.0, 'cached_query': normalized}
+
+            best_key, best_entry, best_similarity = None, None, self.similarity
+            for candidate_key, candidate in list(self.entries.items()):
+                if candidate['expires_at'] <= now:
+                    del self.entries[candidate_key]
+                    continue
+                if candidate_key[:2] != context:
+                    continue
+                similarity = jaccard(tokens, candidate['tokens'])
+                if similarity >= best_similarity:
+                    best_key, best_entry, best_similarity = candidate_key, candidate, similarity
+
+            if best_key is None:
+                self.stats['misses'] += 1
+                return None
+
+            self.entries.move_to_end(best_key)
+            self.stats['near_hits'] += 1
+        return {
+            'answer': best_entry['answer'],
+            'match': 'similar',
+            'similarity': round(best_similarity, 3),
+            'cached_query': best_key[2]
+        }
+
+    def put(self, query: str, chunk_ids: List[str], version: str, answer: str) -> None:
+        normalized = normalize_query(query)
+        key = self.context_key(chunk_ids, version) + (normalized,)
+        tokens = frozenset(kb_index.tokenize(normalized))
+        with self.lock:
+            self.entries[key] = {'answer': answer, 'tokens': tokens, 'expires_at': self.clock() + self.ttl_seconds}
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self.lock:
+            self.entries.clear()
@@ -0,0 +1,141 @@
+"""
+RAG 프롬프트 context packer
+- 검색 결과를 점수 순으로 토큰 예산(budget) 안에 greedy하게 채움 (kb_rerank를 거친 결과는 rerank 순서 유지)
+- 같은 문서에서 offset이 크게 겹치는 passage, 내용이 중복되는 chunk 제거
+- 예산을 넘는 passage는 남은 예산이 충분하면 줄 단위로 잘라서 포함
+- 문서 헤더는 "[n] 파일명 › 섹션" 한 줄 (URI/유형/점수 제외, 본문 첫 heading 줄은 헤더와 중복이므로 제거)
+"""
+
+import math
+import re
+from typing import Dict, Any, List, Tuple
+
+DEFAULT_TOKEN_BUDGET = 1200
+MIN_PARTIAL_TOKENS = 80  # 남은 예산이 이보다 작으면 passage를 잘라 넣지 않음
+MAX_OVERLAP_RATIO = 0.5  # 이미 선택된 passage와 이 비율 이상 겹치면 제외
+
+HANGUL_PATTERN = re.compile(r'[가-힣]')
+LEADING_HEADING_PATTERN = re.compile(r'^#{1,6}\s+[^\n]*\n+')
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    토큰 수 추정 (tokenizer 없이): 한글 음절 ~1 token, 그 외 문자 ~4자당 1 token
+    """
+    hangul = len(HANGUL_PATTERN.findall(text))
+    return hangul + math.ceil((len(text) - hangul) / 4)
+
+
+def source_label(doc: Dict[str, Any]) -> str:
+    """
+    간결한 출처 표기: 파일명 › 섹션
+    """
+    name = doc.get('key') or (doc.get('uri') or '').split('/')[-1] or '문서'
+    heading = doc.get('heading')
+    return f"{name} › {heading}" if heading else name
+
+
+def document_key(doc: Dict[str, Any]) -> str:
+    return doc.get('document_id') or doc.get('uri') or ''
+
+
+def overlap_ratio(offsets: Tuple[int, int], selected: List[Tuple[int, int]]) -> float:
+    """
+    passage 구간 중 이미 선택된 구간들과 겹치는 비율
+    """
+    start, end = offsets
+    covered = 0
+    for other_start, other_end in sorted(selected):
+        lo, hi = max(start, other_start), min(end, other_end)
+        if hi > lo:
+            covered += hi - lo
+            start = max(start, hi)
+    return covered / max(offsets[1] - offsets[0], 1)
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """
+    줄 단위로 예산 이내까지 자르기 (첫 줄이 예산을 넘으면 문자 단위)
+    """
+    lines = []
+    used = 0
+    for line in text.splitlines(keepends=True):
+        tokens = estimate_tokens(line)
+        if used + tokens > max_tokens:
+            if not lines:
+                # 한글 1자 = 1 token 기준으로 보수적으로 자름
+                lines.append(line[:max_tokens])
+            break
+        lines.append(line)
+        used += tokens
+    return ''.join(lines).rstrip()
+
+
+def pack_context(docs: List[Dict[str, Any]], token_budget: int = DEFAULT_TOKEN_BUDGET) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+    """
+    검색 결과를 토큰 예산 안에 packing
+
+    Returns:
+        (packed, stats)
+        packed: [{"label", "text", "tokens", "truncated", "doc"}, ...] 점수 내림차순 (rerank된 결과는 입력 순서)
+        stats: {"budget", "used_tokens", "candidates", "packed", "duplicates", "truncated", "skipped"}
+    """
+    if any('rerank_score' in doc for doc in docs):
+        # kb_rerank.rerank 출력은 이미 rerank 점수 순 (시간 예산 초과로 채점 안 된 후보는 원래 순서로 뒤에 위치)
+        ranked = list(docs)
+    else:
+        ranked = sorted(docs, key=lambda d: d.get('score', 0), reverse=True)
+    packed = []
+    selected_spans = {}  # document key -> [(start, end), ...]
+    seen_texts = []
+    used = 0
+    stats = {'budget': token_budget, 'candidates': len(docs), 'duplicates': 0, 'truncated': 0, 'skipped': 0}
+
+    for doc in ranked:
+        text = (doc.get('content') or '').strip()
+        if doc.get('heading'):
+            text = LEADING_HEADING_PATTERN.sub('', text, count=1)
+        if not text:
+            continue
+
+        # 중복 제거: 같은 문서의 겹치는 offset 구간, 또는 내용 포함 관계 (offset 없는 KB chunk)
+        offsets = doc.get('offsets')
+        spans = selected_spans.get(document_key(doc), [])
+        if offsets and spans and overlap_ratio(tuple(offsets), spans) >= MAX_OVERLAP_RATIO:
+            stats['duplicates'] += 1
+            continue
+        if any(text in other or other in text for other in seen_texts):
+            stats['duplicates'] += 1
+            continue
+
+        label = source_label(doc)
+        header_tokens = estimate_tokens(label) + 4
+        text_tokens = estimate_tokens(text)
+        remaining = token_budget - used - header_tokens
+        truncated = False
+        if text_tokens > remaining:
+            if remaining < MIN_PARTIAL_TOKENS:
+                stats['skipped'] += 1
+                continue
+            text = truncate_to_tokens(text, remaining)
+            text_tokens = estimate_tokens(text)
+            truncated = True
+            stats['truncated'] += 1
+
+        packed.append({'label': label, 'text': text, 'tokens': header_tokens + text_tokens,
+                       'truncated': truncated, 'doc': doc})
+        used += header_tokens + text_tokens
+        seen_texts.append(text)
+        if offsets:
+            selected_spans.setdefault(document_key(doc), []).append(tuple(offsets))
+
+    stats['used_tokens'] = used
+    stats['packed'] = len(packed)
+    return packed, stats
+
+
+def format_context(packed: List[Dict[str, Any]]) -> str:
+    """
+    프롬프트용 문서 블록: "[n] 출처" 헤더 + 본문
+    """
+    return '\n\n'.join(f"[{i}] {item['label']}\n{item['text']}" for i, item in enumerate(packed, start=1))
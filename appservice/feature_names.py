@@ -0,0 +1,17 @@
+"""
+모델 입력 feature 이름 (Lambda T1 / T2 / T12, kb_parameters 인덱스 생성 공용)
+- boto3 client 등 import 시 부작용이 없는 모듈 (offline 도구에서 AWS 설정 없이 import)
+"""
+
+FEATURE_NAMES = [
+    'Process_Temperature', 'Process_Pressure', 'Process_InjectionSpeed',
+    'Process_InjectionTime', 'Process_CoolingTime', 'Process_ClampForce',
+    'Process_MoldTemperature', 'Process_MeltTemperature', 'Process_CycleTime',
+    'Process_ShotSize', 'Process_BackPressure', 'Process_ScrewSpeed',
+    'Process_HoldPressure', 'Process_HoldTime', 'Process_CushionPosition',
+    'Process_PlasticizingTime', 'Sensor_Vibration', 'Sensor_Noise',
+    'Sensor_Temperature1', 'Sensor_Temperature2', 'Sensor_Temperature3',
+    'Sensor_Pressure1', 'Sensor_Pressure2', 'Sensor_Pressure3',
+    'Sensor_Flow', 'Sensor_Position', 'Sensor_Speed', 'Sensor_Torque',
+    'Sensor_Current', 'Sensor_Voltage'
+]
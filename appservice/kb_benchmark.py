@@ -0,0 +1,235 @@
+"""
+Knowledge Base 검색 품질 / 지연 benchmark (offline)
+- gold set (kb_benchmark_gold.json): 한국어/영어 질의별 기대 문서(path)와 section(heading 일부)
+- retriever별 recall@k, MRR, 질의별 지연 (S3 직접 / 로컬 BM25 / 로컬 vector / hybrid)
+- 네트워크 없이 실행: S3는 knowledge_base_docs/ 로컬 파일로, hybrid의 KB branch는 로컬 vector 검색으로 대체
+- 검색 함수는 lambda_t3_rag 구현을 그대로 호출 (T3가 실제로 실행하는 코드 경로 측정)
+- JSON report 출력, --compare로 이전 report(다른 commit)와 지표 비교
+
+실행:
+    python appservice/kb_benchmark.py --docs knowledge_base_docs --output kb_benchmark_report.json
+    python appservice/kb_benchmark.py --compare kb_benchmark_report.base.json
+"""
+
+import argparse
+import io
+import json
+import os
+import subprocess
+import time
+from datetime import datetime
+from typing import Callable, Dict, Any, List
+
+import numpy as np
+
+REPORT_VERSION = 1
+DEFAULT_GOLD_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'kb_benchmark_gold.json')
+DEFAULT_KS = (1, 3, 5)
+RETRIEVERS = ('s3', 'local', 'vector', 'hybrid')
+
+
+class LocalS3:
+    """
+    retrieve_from_s3_direct가 사용하는 S3 호출(list_objects_v2, get_object)을 로컬 문서로 대체
+    (S3 버킷과 같은 flat 구조 - key는 파일명)
+    """
+
+    def __init__(self, docs_dir: str):
+        self.paths = {}
+        for root, _, files in os.walk(docs_dir):
+            for filename in sorted(files):
+                self.paths[filename] = os.path.join(root, filename)
+
+    def list_objects_v2(self, Bucket: str, MaxKeys: int = 1000, **kwargs) -> Dict[str, Any]:
+        keys = sorted(self.paths)[:MaxKeys]
+        return {'Contents': [{'Key': key, 'Size': os.path.getsize(self.paths[key])} for key in keys]}
+
+    def get_object(self, Bucket: str, Key: str, **kwargs) -> Dict[str, Any]:
+        with open(self.paths[Key], 'rb') as f:
+            return {'Body': io.BytesIO(f.read())}
+
+
+def offline_retrievers(docs_dir: str, category_filter: bool = False,
+                       rerank: bool = False) -> Dict[str, Callable[[str], List[Dict]]]:
+    """
+    lambda_t3_rag 검색 함수를 offline으로 실행하도록 구성
+
+    Returns:
+        {retriever 이름: query -> 검색 결과}
+    """
+    os.environ.setdefault('AWS_DEFAULT_REGION', 'us-east-1')
+    import kb_categories
+    import lambda_t3_rag as t3
+
+    t3.s3 = LocalS3(docs_dir)
+    t3.retrieve_from_knowledge_base = (
+        lambda query, max_results=5, category=None: t3.retrieve_from_vector_index(query, category, max_results)
+    )
+
+    functions = {
+        's3': lambda query, category: t3.retrieve_from_s3_direct(query, category),
+        'local': lambda query, category: t3.retrieve_from_local_index(query, category),
+        'vector': lambda query, category: t3.retrieve_from_vector_index(query, category),
+        'hybrid': lambda query, category: t3.retrieve_hybrid(query, category)[0]
+    }
+
+    def bind(fn):
+        if category_filter:
+            retrieve = lambda query: t3.retrieve_with_category(
+                lambda category: fn(query, category), kb_categories.infer_category_from_query(query, default=None)
+            )[0]
+        else:
+            retrieve = lambda query: fn(query, None)
+        if rerank:
+            return lambda query: t3.rerank_results(query, retrieve(query))[0]
+        return retrieve
+
+    return {name: bind(fn) for name, fn in functions.items()}
+
+
+def is_relevant(result: Dict[str, Any], target: Dict[str, str]) -> bool:
+    """
+    문서 key(파일명)가 같고, 결과에 heading이 있으면 target section을 포함해야 일치
+    (S3 직접 검색은 문서 전체를 반환하므로 문서 단위로만 판정)
+    """
+    if result.get('key', result.get('uri', '').split('/')[-1]) != os.path.basename(target['document']):
+        return False
+    heading = result.get('heading')
+    return not heading or not target.get('section') or target['section'] in heading
+
+
+def evaluate(results: List[Dict[str, Any]], targets: List[Dict[str, str]], ks=DEFAULT_KS) -> Dict[str, Any]:
+    """
+    질의 1개 지표: recall@k (상위 k개 안에서 찾은 target 비율), reciprocal rank (첫 일치 순위의 역수)
+    """
+    metrics = {}
+    for k in ks:
+        found = sum(any(is_relevant(result, target) for result in results[:k]) for target in targets)
+        metrics[f'recall@{k}'] = found / len(targets)
+    rank = next((i + 1 for i, result in enumerate(results)
+                 if any(is_relevant(result, target) for target in targets)), None)
+    metrics['rr'] = 1.0 / rank if rank else 0.0
+    return metrics
+
+
+def summarize(rows: List[Dict[str, Any]], ks=DEFAULT_KS) -> Dict[str, Any]:
+    latencies = np.array([row['latency_ms'] for row in rows])
+    summary = {f'recall@{k}': round(float(np.mean([row[f'recall@{k}'] for row in rows])), 4) for k in ks}
+    summary['mrr'] = round(float(np.mean([row['rr'] for row in rows])), 4)
+    summary['latency_ms'] = {
+        'mean': round(float(latencies.mean()), 3),
+        'p50': round(float(np.percentile(latencies, 50)), 3),
+        'p95': round(float(np.percentile(latencies, 95)), 3),
+        'max': round(float(latencies.max()), 3)
+    }
+    return summary
+
+
+def run_benchmark(questions: List[Dict[str, Any]], retrievers: Dict[str, Callable[[str], List[Dict]]],
+                  ks=DEFAULT_KS) -> Dict[str, Any]:
+    """
+    retriever별로 gold set 전체 실행 (첫 호출은 인덱스 로드 포함 cold 지연으로 별도 기록)
+    """
+    report = {}
+    for name, retrieve in retrievers.items():
+        start = time.perf_counter()
+        retrieve(questions[0]['query'])
+        cold_ms = (time.perf_counter() - start) * 1000
+
+        rows = []
+        for question in questions:
+            start = time.perf_counter()
+            results = retrieve(question['query'])
+            latency_ms = (time.perf_counter() - start) * 1000
+            row = {'query': question['query'], 'lang': question.get('lang', ''), 'latency_ms': round(latency_ms, 3)}
+            row.update(evaluate(results, question['targets'], ks))
+            row['top'] = [
+                f"{result.get('key', '')}" + (f" › {result['heading']}" if result.get('heading') else '')
+                for result in results[:max(ks)]
+            ]
+            rows.append(row)
+
+        by_lang = {}
+        for lang in sorted({row['lang'] for row in rows}):
+            by_lang[lang] = summarize([row for row in rows if row['lang'] == lang], ks)
+        report[name] = {'summary': summarize(rows, ks), 'by_lang': by_lang, 'cold_ms': round(cold_ms, 2),
+                        'queries': rows}
+    return report
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              check=True, cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except Exception:
+        return None
+
+
+def compare_reports(current: Dict[str, Any], baseline: Dict[str, Any]) -> List[str]:
+    """
+    retriever별 요약 지표 변화 (현재 - 기준)
+    """
+    lines = [f"baseline {baseline.get('commit')} -> current {current.get('commit')}"]
+    for name, result in current['retrievers'].items():
+        base = baseline.get('retrievers', {}).get(name)
+        if base is None:
+            lines.append(f"  {name}: (baseline 없음)")
+            continue
+        summary, base_summary = result['summary'], base['summary']
+        deltas = [
+            f"{metric} {summary[metric]:.3f} ({summary[metric] - base_summary[metric]:+.3f})"
+            for metric in summary if metric != 'latency_ms' and metric in base_summary
+        ]
+        p50, base_p50 = summary['latency_ms']['p50'], base_summary['latency_ms']['p50']
+        deltas.append(f"p50 {p50:.2f} ms ({p50 - base_p50:+.2f})")
+        lines.append(f"  {name}: " + ', '.join(deltas))
+    return lines
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Knowledge Base 검색 benchmark (offline)')
+    parser.add_argument('--docs', type=str, default='knowledge_base_docs')
+    parser.add_argument('--gold', type=str, default=DEFAULT_GOLD_PATH)
+    parser.add_argument('--retrievers', type=str, default=','.join(RETRIEVERS))
+    parser.add_argument('--category-filter', action='store_true', help='질의 카테고리 필터 검색 (T3 기본 동작)')
+    parser.add_argument('--rerank', action='store_true', help='검색 결과 local rerank + cutoff 적용 (T3 기본 동작)')
+    parser.add_argument('--output', type=str, default='kb_benchmark_report.json')
+    parser.add_argument('--compare', type=str, default=None, help='비교할 이전 report')
+    args = parser.parse_args()
+
+    with open(args.gold, 'r', encoding='utf-8') as f:
+        gold = json.load(f)
+    questions = gold['questions']
+
+    available = offline_retrievers(args.docs, args.category_filter, args.rerank)
+    retrievers = {name: available[name] for name in args.retrievers.split(',')}
+    results = run_benchmark(questions, retrievers)
+
+    report = {
+        'version': REPORT_VERSION,
+        'commit': git_commit(),
+        'created_at': datetime.utcnow().isoformat(),
+        'gold_set': {'path': os.path.basename(args.gold), 'version': gold.get('version'), 'questions': len(questions)},
+        'category_filter': args.category_filter,
+        'rerank': args.rerank,
+        'ks': list(DEFAULT_KS),
+        'retrievers': results
+    }
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+    for name, result in results.items():
+        summary = result['summary']
+        metrics = ', '.join(f"{metric} {value:.3f}" for metric, value in summary.items() if metric != 'latency_ms')
+        print(f"{name:>7}: {metrics}, p50 {summary['latency_ms']['p50']:.2f} ms, "
+              f"p95 {summary['latency_ms']['p95']:.2f} ms (cold {result['cold_ms']:.1f} ms)")
+    print(f"✅ Report -> {args.output}")
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        print('\n'.join(compare_reports(report, baseline)))
+
+
+if __name__ == '__main__':
+    main()
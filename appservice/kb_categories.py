@@ -0,0 +1,77 @@
+"""
+Knowledge Base 문서 카테고리
+- 파일명 패턴 기반 카테고리 (S3 버킷은 flat 구조라 디렉토리 대신 파일명으로 분류)
+- T0: ingestion 전 문서별 metadata sidecar(<key>.metadata.json) 기록 → Bedrock KB chunk에 category 속성 부여
+- T3: 질의 카테고리 추론, retrieve metadata filter / 로컬 인덱스 category mask
+"""
+
+from typing import Dict, Any, List
+
+CATEGORY_METADATA_KEY = 'category'
+METADATA_SUFFIX = '.metadata.json'  # Bedrock KB S3 data source metadata 파일 규칙
+
+# Document name patterns for category inference (한 문서가 여러 카테고리에 속할 수 있음)
+DOCUMENT_PATTERNS = {
+    'sop': ['sop', 'process'],
+    'equipment': ['machine', 'specs'],
+    'sensors': ['sensor', '센서'],
+    'troubleshooting': ['defect', 'troubleshooting', 'porosity'],
+    'quality': ['quality', 'parameter', 'guidelines'],
+    'safety': ['safety', 'regulations']
+}
+
+
+def document_categories(key: str) -> List[str]:
+    """
+    문서 key(파일명)가 속한 카테고리 목록
+    """
+    name = key.rsplit('/', 1)[-1].lower()
+    return [category for category, patterns in DOCUMENT_PATTERNS.items() if any(p in name for p in patterns)]
+
+
+def metadata_sidecar(key: str) -> Dict[str, Any]:
+    """
+    Bedrock KB metadata 파일 내용 ({"metadataAttributes": {"category": [...]}})
+    """
+    return {'metadataAttributes': {CATEGORY_METADATA_KEY: document_categories(key)}}
+
+
+def merge_sidecar(existing: Dict[str, Any], key: str) -> Dict[str, Any]:
+    """
+    기존 metadata 파일에 category 추가 (다른 metadata 속성 유지)
+
+    Returns:
+        병합된 내용, 이미 category가 있으면 None (수동 관리 값 우선)
+    """
+    attributes = dict(existing.get('metadataAttributes') or {})
+    if CATEGORY_METADATA_KEY in attributes:
+        return None
+    attributes[CATEGORY_METADATA_KEY] = document_categories(key)
+    return dict(existing, metadataAttributes=attributes)
+
+
+def retrieval_filter(category: str) -> Dict[str, Any]:
+    """
+    Bedrock retrieve vectorSearchConfiguration filter (category 목록에 포함된 chunk만)
+    """
+    return {'listContains': {'key': CATEGORY_METADATA_KEY, 'value': category}}
+
+
+def infer_category_from_query(query: str, default: str = 'quality') -> str:
+    """
+    쿼리에서 카테고리 추론 (일치하는 키워드가 없으면 default)
+    """
+    query_lower = query.lower()
+
+    if any(kw in query_lower for kw in ['불량', '원인', '문제', 'defect', 'issue', '포로시티', 'porosity']):
+        return 'troubleshooting'
+    elif any(kw in query_lower for kw in ['센서', 'sensor', '측정', '교정', 'calibration']):
+        return 'sensors'
+    elif any(kw in query_lower for kw in ['장비', 'equipment', '기계', 'machine', '스펙']):
+        return 'equipment'
+    elif any(kw in query_lower for kw in ['절차', 'sop', '프로세스', 'process', '공정']):
+        return 'sop'
+    elif any(kw in query_lower for kw in ['안전', 'safety', '규정']):
+        return 'safety'
+    else:
+        return default
@@ -0,0 +1,143 @@
+"""
+Knowledge Base markdown chunker
+- markdown heading 단위로 section 분리 (상위 heading은 breadcrumb으로 보존)
+- 표(table)는 가능한 한 하나의 chunk에 유지, 크기 예산(max_chars) 초과 시 줄 단위 분할
+- 인접 chunk 간 줄 단위 overlap
+- chunk는 원문 offset (start, end)으로 저장 - 원문 text[start:end]가 곧 passage
+"""
+
+import re
+from typing import Dict, Any, List, Tuple
+
+DEFAULT_MAX_CHARS = 800
+DEFAULT_OVERLAP_CHARS = 120
+
+HEADING_PATTERN = re.compile(r'^(#{1,6})\s+(.+?)\s*#*\s*$')
+
+
+def split_lines(text: str) -> List[Tuple[int, int]]:
+    """
+    줄 단위 (start, end) offset (end는 개행 포함)
+    """
+    spans = []
+    start = 0
+    for line in text.splitlines(keepends=True):
+        spans.append((start, start + len(line)))
+        start += len(line)
+    return spans
+
+
+def parse_blocks(text: str) -> List[Dict[str, Any]]:
+    """
+    Markdown을 block 단위로 분리
+
+    Returns:
+        [{"type": "heading" | "table" | "text", "start", "end", "lines": [(start, end), ...],
+          "level", "title"}, ...]  (빈 줄은 block 경계로만 사용)
+    """
+    blocks = []
+    current = None
+    for start, end in split_lines(text):
+        line = text[start:end].strip()
+        heading = HEADING_PATTERN.match(line)
+
+        if heading:
+            current = None
+            blocks.append({
+                'type': 'heading', 'start': start, 'end': end, 'lines': [(start, end)],
+                'level': len(heading.group(1)), 'title': heading.group(2)
+            })
+            continue
+        if not line:
+            current = None
+            continue
+
+        block_type = 'table' if line.startswith('|') else 'text'
+        if current is None or current['type'] != block_type:
+            current = {'type': block_type, 'start': start, 'end': end, 'lines': []}
+            blocks.append(current)
+        current['lines'].append((start, end))
+        current['end'] = end
+    return blocks
+
+
+def parse_sections(text: str) -> List[Dict[str, Any]]:
+    """
+    Heading 기준 section 목록 (본문이 없는 heading은 하위 section의 breadcrumb으로만 사용)
+
+    Returns:
+        [{"heading": "H1 > H2 > H3", "blocks": [...]}, ...]
+    """
+    sections = []
+    path = []  # [(level, title), ...]
+    current = None
+    for block in parse_blocks(text):
+        if block['type'] == 'heading':
+            path = [(level, title) for level, title in path if level < block['level']]
+            path.append((block['level'], block['title']))
+            current = {'heading': ' > '.join(title for _, title in path), 'blocks': [block]}
+            sections.append(current)
+            continue
+        if current is None:
+            # 첫 heading 이전 본문
+            current = {'heading': '', 'blocks': []}
+            sections.append(current)
+        current['blocks'].append(block)
+    return [section for section in sections if any(b['type'] != 'heading' for b in section['blocks'])]
+
+
+def _block_units(block: Dict[str, Any], max_chars: int) -> List[Tuple[int, int]]:
+    """
+    Chunk 조립 단위: 예산 이내 block은 통째로, 초과 block은 줄 단위 (초과 줄은 고정 길이로 분할)
+    """
+    if block['end'] - block['start'] <= max_chars:
+        return [(block['start'], block['end'])]
+
+    units = []
+    for start, end in block['lines']:
+        while end - start > max_chars:
+            units.append((start, start + max_chars))
+            start += max_chars
+        units.append((start, end))
+    return units
+
+
+def chunk_section(section: Dict[str, Any], max_chars: int = DEFAULT_MAX_CHARS,
+                  overlap_chars: int = DEFAULT_OVERLAP_CHARS) -> List[Tuple[int, int]]:
+    """
+    Section을 크기 예산 이내의 연속 구간 (start, end)들로 분할 (줄 단위 overlap)
+    """
+    units = [unit for block in section['blocks'] for unit in _block_units(block, max_chars)]
+    chunks = []
+    i = 0
+    while i < len(units):
+        start = units[i][0]
+        j = i
+        while j + 1 < len(units) and units[j + 1][1] - start <= max_chars:
+            j += 1
+        end = units[j][1]
+        chunks.append((start, end))
+        if j + 1 >= len(units):
+            break
+
+        # 다음 chunk는 현재 chunk 끝부분 overlap_chars 이내의 unit부터 시작
+        next_i = j + 1
+        while next_i - 1 > i and end - units[next_i - 1][0] <= overlap_chars:
+            next_i -= 1
+        i = next_i
+    return chunks
+
+
+def chunk_document(text: str, max_chars: int = DEFAULT_MAX_CHARS,
+                   overlap_chars: int = DEFAULT_OVERLAP_CHARS) -> List[Dict[str, Any]]:
+    """
+    문서를 passage 목록으로 분할
+
+    Returns:
+        [{"start", "end", "heading"}, ...] - passage 원문은 text[start:end]
+    """
+    passages = []
+    for section in parse_sections(text):
+        for start, end in chunk_section(section, max_chars, overlap_chars):
+            passages.append({'start': start, 'end': end, 'heading': section['heading']})
+    return passages
@@ -0,0 +1,167 @@
+"""
+Knowledge Base 추출형(extractive) 답변
+- 로컬 BM25 인덱스(kb_index.py) 상위 passage를 문장 / 목록 항목 / 표 행 단위로 분리
+- 질의 term의 IDF 가중 coverage로 단위별 점수 (heading breadcrumb 일치는 절반 가중) → 상위 단위를 출처 번호와 함께 조합
+- 질의의 조사("불량의", "원인은")는 제거 후 토큰화 (조사 경계 bigram이 coverage를 낮추지 않도록)
+- LLM 호출 없이 수 ms 내 응답 (Bedrock 장애 시 fallback, 단순 조회 질문용 저지연 모드)
+"""
+
+import re
+from typing import Dict, Any, List, Optional
+
+import kb_index
+
+DEFAULT_TOP_PASSAGES = 5
+DEFAULT_MAX_UNITS = 4
+DEFAULT_MIN_COVERAGE = 0.3  # 질의 IDF 합 대비 일치 비율이 이보다 낮은 단위는 제외
+HEADING_WEIGHT = 0.5  # 단위 본문에는 없고 heading breadcrumb에만 있는 term의 가중치
+
+SENTENCE_SPLIT_PATTERN = re.compile(r'(?<=[.!?])\s+|(?<=다\.)\s*')
+LIST_MARKER_PATTERN = re.compile(r'^(?:[-*+]|\d+[.)])\s+')
+TABLE_SEPARATOR_PATTERN = re.compile(r'^\|?[\s:|-]+\|?$')
+PARTICLE_PATTERN = re.compile(r'([가-힣]{2,})(?:은|는|이|가|을|를|의|에|에서|으로|로|와|과|도)(?![가-힣])')
+
+
+def strip_particles(query: str) -> str:
+    """
+    질의 단어 끝 조사 제거 ("불량의 주요 원인은" -> "불량 주요 원인")
+    """
+    return PARTICLE_PATTERN.sub(r'\1', query)
+
+
+def clean_markdown(text: str) -> str:
+    return text.replace('**', '').replace('`', '').strip()
+
+
+def split_cells(line: str) -> List[str]:
+    return [clean_markdown(cell) for cell in line.strip().strip('|').split('|')]
+
+
+def extract_units(text: str) -> List[str]:
+    """
+    Passage 원문을 답변 단위로 분리
+    - 표 행: "첫 열 — 헤더 값, 헤더 값, ..." (헤더 행과 결합)
+    - 목록 항목: 상위 항목 문맥 포함 ("상위 › 하위")
+    - 본문: 문장 단위
+    """
+    units = []
+    table_header = None
+    parents = []  # [(indent, text), ...] 목록 항목 문맥
+    in_code = False
+
+    for raw_line in text.splitlines():
+        line = raw_line.strip()
+        if line.startswith('```'):
+            in_code = not in_code
+            continue
+        if not line or line.startswith('#'):
+            table_header = None
+            parents = []
+            continue
+
+        if line.startswith('|') and not in_code:
+            cells = split_cells(line)
+            if TABLE_SEPARATOR_PATTERN.match(line):
+                continue
+            if table_header is None:
+                table_header = cells
+                continue
+            pairs = [f"{header} {value}" for header, value in zip(table_header[1:], cells[1:]) if value]
+            units.append(f"{cells[0]} — {', '.join(pairs)}" if pairs else cells[0])
+            continue
+        table_header = None
+
+        indent = len(raw_line) - len(raw_line.lstrip())
+        is_item = bool(LIST_MARKER_PATTERN.match(line))
+        content = clean_markdown(LIST_MARKER_PATTERN.sub('', line))
+        if not content:
+            continue
+
+        if is_item or in_code:
+            parents = [(level, parent) for level, parent in parents if level < indent]
+            prefix = ' › '.join(parent for _, parent in parents)
+            units.append(f"{prefix} › {content}" if prefix else content)
+            parents.append((indent, content.rstrip(':')))
+        elif content.endswith(':'):
+            # "원인:" 같은 label 줄은 같은 들여쓰기의 이후 목록 항목 문맥으로 사용
+            parents = [(indent - 1, content.rstrip(':').strip())]
+        else:
+            parents = []
+            units.extend(s.strip() for s in SENTENCE_SPLIT_PATTERN.split(content) if s and s.strip())
+    return units
+
+
+def extract_answer(index: 'kb_index.BM25Index', query: str, top_passages: int = DEFAULT_TOP_PASSAGES,
+                   max_units: int = DEFAULT_MAX_UNITS, min_coverage: float = DEFAULT_MIN_COVERAGE,
+                   mask=None) -> Optional[Dict[str, Any]]:
+    """
+    추출형 답변 생성
+
+    Returns:
+        {"answer", "units": [{"text", "score", "citation"}], "passages": [인용된 passage, ...]}
+        일치하는 단위가 없으면 None
+    """
+    query_terms = {}
+    for term in set(kb_index.tokenize(strip_particles(query))):
+        term_id = index.vocabulary.get(term)
+        if term_id is not None:
+            query_terms[term] = float(index.idf[term_id])
+    passages = index.search(query, top_passages, mask)
+    passage_terms = set()
+    for passage in passages:
+        passage_terms.update(kb_index.tokenize(passage['heading'] + '\n' + passage['text']))
+
+    # 검색된 passage에 없는 term (조사 경계 bigram 등)은 coverage 분모에서 제외
+    total_weight = sum(weight for term, weight in query_terms.items() if term in passage_terms)
+    if total_weight <= 0:
+        return None
+
+    candidates = []
+    for rank, passage in enumerate(passages):
+        section = passage['heading'].split(' > ')[-1] if passage['heading'] else ''
+        heading_terms = set(kb_index.tokenize(passage['heading']))
+        for order, unit in enumerate(extract_units(passage['text'])):
+            unit_terms = set(kb_index.tokenize(unit))
+            unit_weight = sum(weight for term, weight in query_terms.items() if term in unit_terms)
+            heading_weight = sum(weight for term, weight in query_terms.items()
+                                 if term in heading_terms and term not in unit_terms)
+            coverage = (unit_weight + HEADING_WEIGHT * heading_weight) / total_weight
+            if coverage < min_coverage:
+                continue
+            if heading_weight > 0 and section and not unit.startswith(section):
+                # heading 문맥이 일치에 기여한 경우 답변에도 section 표기
+                unit = f"{section} › {unit}"
+            # 같은 coverage면 상위 passage, 짧은 단위 우선
+            score = coverage + 0.05 / (rank + 1) - 0.0005 * len(unit)
+            candidates.append((score, rank, order, unit))
+
+    selected = []
+    seen = set()
+    for score, rank, order, unit in sorted(candidates, key=lambda c: -c[0]):
+        if unit in seen:
+            continue
+        seen.add(unit)
+        selected.append((score, rank, order, unit))
+        if len(selected) >= max_units:
+            break
+    if not selected:
+        return None
+
+    # 인용 번호는 등장 순서대로 부여
+    citations = {}
+    cited_passages = []
+    units = []
+    for score, rank, order, unit in selected:
+        if rank not in citations:
+            citations[rank] = len(citations) + 1
+            cited_passages.append(passages[rank])
+        units.append({'text': unit, 'score': round(score, 4), 'citation': citations[rank]})
+
+    lines = ['문서에서 찾은 관련 내용입니다.', '']
+    lines.extend(f"- {unit['text']} [{unit['citation']}]" for unit in units)
+    lines.extend(['', '출처:'])
+    lines.extend(
+        f"[{i}] {passage['key']} › {passage['heading']}" if passage['heading'] else f"[{i}] {passage['key']}"
+        for i, passage in enumerate(cited_passages, start=1)
+    )
+    return {'answer': '\n'.join(lines), 'units': units, 'passages': cited_passages}
@@ -0,0 +1,278 @@
+"""
+Knowledge Base 로컬 BM25 검색 인덱스
+- knowledge_base_docs/ 문서를 heading/표/크기 기준 passage로 분할 (kb_chunker.py)
+- passage 단위 역색인(postings, passage 길이, IDF)을 사전 생성 (kb_index.json, passage는 원문 offset으로 저장)
+- 한국어는 음절 bigram, 영어/숫자는 단어 단위로 토큰화 (형태소 분석기 불필요)
+- Lambda T3 컨테이너당 1회 로드, 검색은 S3 호출 없이 numpy 누적 연산으로 처리
+
+인덱스 생성:
+    python appservice/kb_index.py build --docs knowledge_base_docs --output appservice/kb_index.json
+"""
+
+import argparse
+import json
+import os
+import re
+import time
+import numpy as np
+from collections import Counter
+from typing import Dict, Any, List
+
+import kb_chunker
+
+INDEX_VERSION = 2
+DEFAULT_INDEX_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'kb_index.json')
+
+# BM25 파라미터
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# 한글 음절 연속 구간 / 영문·숫자 단어
+TOKEN_PATTERN = re.compile(r'[가-힣]+|[a-z0-9]+(?:\.[0-9]+)?')
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    한국어/영어 혼합 텍스트 토큰화
+    - 한글: 음절 bigram ("냉각시간" -> "냉각", "각시", "시간"), 1음절 단어는 그대로
+    - 영어/숫자: 소문자 단어 ("Process_Temperature" -> "process", "temperature")
+    """
+    tokens = []
+    for match in TOKEN_PATTERN.findall(text.lower()):
+        if '가' <= match[0] <= '힣':
+            if len(match) == 1:
+                tokens.append(match)
+            else:
+                tokens.extend(match[i:i + 2] for i in range(len(match) - 1))
+        else:
+            tokens.append(match)
+    return tokens
+
+
+def passage_index_text(document: Dict[str, Any], passage: Dict[str, Any]) -> str:
+    """
+    색인 대상 텍스트: heading breadcrumb + passage 원문 (상위 heading 용어도 검색되도록)
+    """
+    return passage['heading'] + '\n' + document['text'][passage['start']:passage['end']]
+
+
+class BM25Index:
+    """
+    Passage 단위 BM25 역색인
+
+    postings의 BM25 가중치(impact)를 로드 시 미리 계산하므로,
+    검색은 query term별 (passage ids, weights) 누적 + argpartition top-k만 수행합니다.
+    """
+
+    def __init__(self, documents: List[Dict[str, Any]], passages: List[Dict[str, Any]],
+                 vocabulary: Dict[str, int], postings: List[List[List[int]]], doc_lengths: List[int],
+                 k1: float = BM25_K1, b: float = BM25_B):
+        self.documents = documents
+        self.passages = passages  # [{"doc": document index, "start", "end", "heading"}, ...]
+        self.vocabulary = vocabulary
+        self.raw_postings = postings  # term id -> [[passage ids], [term frequencies]]
+        self.k1 = k1
+        self.b = b
+        self.doc_lengths = np.asarray(doc_lengths, dtype=np.float64)  # passage별 토큰 수
+        self.avg_doc_length = float(self.doc_lengths.mean()) if len(self.doc_lengths) else 0.0
+
+        n_docs = len(passages)
+        document_frequency = np.array([len(doc_ids) for doc_ids, _ in postings], dtype=np.float64)
+        self.idf = np.log(1.0 + (n_docs - document_frequency + 0.5) / (document_frequency + 0.5))
+
+        # term -> (doc ids, BM25 weights)
+        norm = self.k1 * (1.0 - self.b + self.b * self.doc_lengths / (self.avg_doc_length or 1.0))
+        self.postings = []
+        for term_id, (doc_ids, freqs) in enumerate(postings):
+            doc_ids = np.asarray(doc_ids, dtype=np.int64)
+            freqs = np.asarray(freqs, dtype=np.float64)
+            weights = self.idf[term_id] * freqs * (self.k1 + 1.0) / (freqs + norm[doc_ids])
+            self.postings.append((doc_ids, weights))
+
+        self._category_masks = {}
+
+    @classmethod
+    def build(cls, documents: List[Dict[str, Any]],
+              max_chars: int = kb_chunker.DEFAULT_MAX_CHARS,
+              overlap_chars: int = kb_chunker.DEFAULT_OVERLAP_CHARS) -> 'BM25Index':
+        """
+        문서 리스트를 passage로 분할하여 인덱스 생성 (각 문서는 'text' 필드 필수)
+        """
+        passages = [
+            dict(passage, doc=doc_index)
+            for doc_index, doc in enumerate(documents)
+            for passage in kb_chunker.chunk_document(doc['text'], max_chars, overlap_chars)
+        ]
+        vocabulary = {}
+        postings = []
+        doc_lengths = []
+        for passage_id, passage in enumerate(passages):
+            counts = Counter(tokenize(passage_index_text(documents[passage['doc']], passage)))
+            doc_lengths.append(sum(counts.values()))
+            for term, freq in counts.items():
+                term_id = vocabulary.setdefault(term, len(vocabulary))
+                if term_id == len(postings):
+                    postings.append([[], []])
+                postings[term_id][0].append(passage_id)
+                postings[term_id][1].append(freq)
+        return cls(documents, passages, vocabulary, postings, doc_lengths)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        JSON 직렬화 (raw term frequency 저장, 가중치는 로드 시 재계산)
+        """
+        terms = sorted(self.vocabulary, key=self.vocabulary.get)
+        return {
+            'version': INDEX_VERSION,
+            'k1': self.k1,
+            'b': self.b,
+            'documents': self.documents,
+            'passages': self.passages,
+            'terms': terms,
+            'postings': self.raw_postings,
+            'doc_lengths': self.doc_lengths.astype(int).tolist()
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'BM25Index':
+        vocabulary = {term: i for i, term in enumerate(data['terms'])}
+        return cls(data['documents'], data['passages'], vocabulary, data['postings'], data['doc_lengths'],
+                   data.get('k1', BM25_K1), data.get('b', BM25_B))
+
+    def save(self, path: str) -> None:
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False, separators=(',', ':'))
+
+    @classmethod
+    def load(cls, path: str) -> 'BM25Index':
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls.from_dict(json.load(f))
+
+    def category_mask(self, patterns: List[str]) -> np.ndarray:
+        """
+        파일명 패턴 기반 카테고리 필터 (kb_categories.DOCUMENT_PATTERNS, 패턴별 cache)
+        """
+        cache_key = tuple(patterns)
+        mask = self._category_masks.get(cache_key)
+        if mask is None:
+            doc_mask = [any(p in doc['key'].lower() for p in patterns) for doc in self.documents]
+            mask = np.array([doc_mask[passage['doc']] for passage in self.passages], dtype=bool)
+            self._category_masks[cache_key] = mask
+        return mask
+
+    def score(self, query: str, mask: np.ndarray = None) -> np.ndarray:
+        """
+        모든 passage의 BM25 점수 (query term 빈도 반영)
+        - mask가 주어지면 postings를 먼저 필터링하여 대상 passage만 누적 (나머지는 0)
+        """
+        scores = np.zeros(len(self.passages))
+        for term, query_freq in Counter(tokenize(query)).items():
+            term_id = self.vocabulary.get(term)
+            if term_id is None:
+                continue
+            doc_ids, weights = self.postings[term_id]
+            if mask is not None:
+                keep = mask[doc_ids]
+                doc_ids, weights = doc_ids[keep], weights[keep]
+            scores[doc_ids] += query_freq * weights
+        return scores
+
+    def passage(self, passage_id: int) -> Dict[str, Any]:
+        """
+        Passage 메타데이터 + 원문 (문서 전체 text 제외)
+        """
+        passage = self.passages[passage_id]
+        document = self.documents[passage['doc']]
+        return {
+            'passage_id': f"{document['path']}#{passage['start']}-{passage['end']}",
+            'key': document['key'],
+            'path': document['path'],
+            'category': document['category'],
+            'title': document['title'],
+            'heading': passage['heading'],
+            'start': passage['start'],
+            'end': passage['end'],
+            'text': document['text'][passage['start']:passage['end']]
+        }
+
+    def search(self, query: str, top_k: int = 5, mask: np.ndarray = None) -> List[Dict[str, Any]]:
+        """
+        BM25 top-k passage 검색
+
+        Args:
+            mask: 검색 대상 passage bool mask (카테고리 필터)
+
+        Returns:
+            [{"passage_id", "heading", "text", "score", ...}, ...] 점수 내림차순 (점수 0 제외)
+        """
+        scores = self.score(query, mask)
+
+        candidates = np.flatnonzero(scores > 0)
+        if len(candidates) > top_k:
+            candidates = candidates[np.argpartition(-scores[candidates], top_k - 1)[:top_k]]
+        candidates = candidates[np.argsort(-scores[candidates], kind='stable')]
+
+        return [dict(self.passage(i), score=float(scores[i])) for i in candidates]
+
+
+def load_documents(docs_dir: str) -> List[Dict[str, Any]]:
+    """
+    knowledge_base_docs/ 하위 markdown 문서 로드
+    - key: S3 업로드 시 object key (flat 구조 - 파일명)
+    - category: 하위 디렉토리명
+    """
+    documents = []
+    for root, _, files in os.walk(docs_dir):
+        for filename in sorted(files):
+            if not filename.endswith('.md'):
+                continue
+            path = os.path.join(root, filename)
+            with open(path, 'r', encoding='utf-8') as f:
+                text = f.read()
+            title_match = re.search(r'^#\s+(.+)$', text, re.MULTILINE)
+            documents.append({
+                'key': filename,
+                'path': os.path.relpath(path, docs_dir),
+                'category': os.path.relpath(root, docs_dir).split(os.sep)[0],
+                'title': title_match.group(1).strip() if title_match else filename,
+                'text': text
+            })
+    return sorted(documents, key=lambda d: d['path'])
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Knowledge Base BM25 인덱스 생성')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    build_parser = subparsers.add_parser('build', help='문서 디렉토리로 인덱스 생성')
+    build_parser.add_argument('--docs', type=str, default='knowledge_base_docs')
+    build_parser.add_argument('--output', type=str, default=DEFAULT_INDEX_PATH)
+    build_parser.add_argument('--max-chars', type=int, default=kb_chunker.DEFAULT_MAX_CHARS)
+    build_parser.add_argument('--overlap', type=int, default=kb_chunker.DEFAULT_OVERLAP_CHARS)
+
+    search_parser = subparsers.add_parser('search', help='인덱스 검색 테스트')
+    search_parser.add_argument('query', type=str)
+    search_parser.add_argument('--index', type=str, default=DEFAULT_INDEX_PATH)
+    search_parser.add_argument('--top-k', type=int, default=5)
+
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        documents = load_documents(args.docs)
+        index = BM25Index.build(documents, args.max_chars, args.overlap)
+        index.save(args.output)
+        print(f"✅ Indexed {len(documents)} documents ({len(index.passages)} passages), "
+              f"{len(index.vocabulary)} terms -> {args.output} "
+              f"({os.path.getsize(args.output) / 1024:.1f} KB)")
+    else:
+        index = BM25Index.load(args.index)
+        start = time.perf_counter()
+        results = index.search(args.query, args.top_k)
+        elapsed_us = (time.perf_counter() - start) * 1e6
+        for result in results:
+            print(f"{result['score']:8.3f}  {result['path']}  [{result['heading']}]")
+        print(f"({elapsed_us:.0f} µs)")
+
+
+if __name__ == '__main__':
+    main()
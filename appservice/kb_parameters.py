@@ -0,0 +1,429 @@
+"""
+Knowledge Base 파라미터 사양 인덱스
+- knowledge_base_docs/ 문서의 표(최소/최대/권장 열, 범위 열)와 사양 목록("정상 범위: 650-680°C")을 파싱
+- 원본 feature 이름(FEATURE_NAMES) 기준 parameter -> [(kind, min, max, unit, source), ...] 인덱스 생성
+  (appservice/parameter_ranges.json: T3 이미지에 포함, --upload 시 S3 config/parameter_ranges.json: T2/T12가 로드)
+- 사양 조회 질문("금형 온도 권장 범위는?", "Temperature1 정확도", "recommended mold temperature range")은
+  검색/LLM 없이 dict 조회로 응답
+  (조회형 질문만 해당 - "왜", "~하면", "어떤 불량", "why", "if" 같은 원인/조건 질문은 생성형 답변으로)
+- 센서 section("Temperature1 - 용탕 온도 센서")의 항목은 Sensor_* feature로 기록
+
+인덱스 생성:
+    python appservice/kb_parameters.py build --docs knowledge_base_docs [--upload]
+"""
+
+import argparse
+import json
+import os
+import re
+from typing import Dict, Any, List, Optional, Tuple
+
+import kb_chunker
+
+INDEX_VERSION = 1
+PARAMETER_RANGES_KEY = 'config/parameter_ranges.json'
+DEFAULT_INDEX_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'parameter_ranges.json')
+
+# 문서 / 질의에서 사용하는 파라미터 명칭 (한국어, 영어) -> 원본 feature (긴 명칭 우선, 대소문자 무시)
+# "용탕 온도 센서"처럼 센서를 가리키는 명칭은 공정 파라미터 명칭("용탕 온도")보다 길어 Sensor_* 로 매칭
+PARAMETER_ALIASES = {
+    'Process_Temperature': ['용탕 온도', 'melt temperature'],
+    'Process_MeltTemperature': ['용탕 온도', 'melt temperature'],
+    'Process_MoldTemperature': ['금형 온도', 'mold temperature'],
+    'Process_CoolingTime': ['냉각 시간', 'cooling time'],
+    'Process_InjectionSpeed': ['사출 속도', '고속 사출', 'injection speed'],
+    'Process_InjectionTime': ['사출 시간', 'injection time'],
+    'Process_Pressure': ['사출 압력', '2차 사출압', 'injection pressure'],
+    'Process_HoldPressure': ['보압 압력', '증압', 'hold pressure', 'holding pressure'],
+    'Process_HoldTime': ['보압 시간', '증압 시간', 'hold time', 'holding time'],
+    'Process_ClampForce': ['형체력', '형체압', 'clamp force', 'clamping force'],
+    'Process_CycleTime': ['사이클 타임', 'cycle time'],
+    'Sensor_Temperature1': ['용탕 온도 센서', '온도 센서 1', 'melt temperature sensor', 'temperature sensor 1'],
+    'Sensor_Temperature2': ['금형 온도 센서', '온도 센서 2', 'mold temperature sensor', 'temperature sensor 2'],
+    'Sensor_Temperature3': ['냉각수 온도', '냉각수 온도 센서', '온도 센서 3', 'coolant temperature',
+                            'temperature sensor 3'],
+    'Sensor_Pressure1': ['사출 압력 센서', '압력 센서 1', 'injection pressure sensor', 'pressure sensor 1'],
+    'Sensor_Pressure2': ['압력 센서 2', 'pressure sensor 2'],
+    'Sensor_Pressure3': ['압력 센서 3', 'pressure sensor 3'],
+    'Sensor_Vibration': ['진동 센서', 'vibration sensor'],
+    'Sensor_Noise': ['소음 센서', 'noise sensor'],
+    'Sensor_Flow': ['냉각수 유량', '유량 센서', 'coolant flow', 'flow sensor'],
+    'Sensor_Torque': ['토크 센서', 'torque sensor'],
+    'Sensor_Current': ['전류 센서', 'current sensor'],
+    'Sensor_Voltage': ['전압 센서', 'voltage sensor']
+}
+
+# 센서 번호 ("Temperature1 정확도") - 질의 매칭에만 사용
+# 문서마다 번호 체계가 달라 (금형 온도 센서 가이드의 Temperature3 = 금형 가동측) 인덱스 생성은 센서 명칭 / Sensor_* 이름 기준
+SENSOR_ID_ALIASES = {
+    'Sensor_Temperature1': ['Temperature1'],
+    'Sensor_Temperature2': ['Temperature2'],
+    'Sensor_Temperature3': ['Temperature3'],
+    'Sensor_Pressure1': ['Pressure1'],
+    'Sensor_Pressure2': ['Pressure2'],
+    'Sensor_Pressure3': ['Pressure3']
+}
+
+KIND_LABELS = {
+    'guideline': '가이드라인',
+    'normal': '정상 범위',
+    'measurement': '측정 범위',
+    'accuracy': '정확도'
+}
+
+NUMBER = r'-?\d+(?:\.\d+)?'
+RANGE_PATTERN = re.compile(rf'({NUMBER})\s*([^\d\s~–-]*)\s*(?:-|~|–)\s*({NUMBER})\s*([^\s,()]*)')
+ACCURACY_PATTERN = re.compile(rf'±\s*({NUMBER})\s*([^\s,()]*(?:\s*FS)?)')
+VALUE_PATTERN = re.compile(rf'^({NUMBER})\s*([^\s,()]*)$')
+BULLET_PATTERN = re.compile(r'^\s*(?:[-*+]|\d+\.)\s+(.+?)\s*:\s*(.+)$')
+
+# 사양 조회 질문 판별: 조회형 키워드가 있고 원인/조건 표현이 없어야 함
+# ('기준', '몇', '얼마'는 "기준보다 높으면", "몇 도 낮추면" 같은 원인/조건 질문에도 쓰여 제외)
+SPEC_KEYWORDS = ['범위', '권장', '적정', '정확도', '사양', '최소', '최대', '스펙']
+NON_LOOKUP_KEYWORDS = ['왜', '어떤', '어떻게', '원인', '이유', '때문', '영향', '불량', '생기', '발생', '줄어', '늘어']
+CONDITIONAL_PATTERN = re.compile(r'(?<![표측단평정화])면(?=[\s?,.!]|$)')  # "높으면", "벗어나면" (표면/측면 등 명사 제외)
+
+# 영어 질의는 단어 단위로 판별 ("spec"이 "inspect"에, "if"가 "verify"에 걸리지 않도록)
+SPEC_KEYWORDS_EN = ['range', 'recommended', 'optimal', 'optimum', 'accuracy', 'precision', 'spec', 'specs',
+                    'specification', 'minimum', 'maximum', 'limit', 'limits']
+NON_LOOKUP_KEYWORDS_EN = ['why', 'how', 'cause', 'causes', 'reason', 'because', 'effect', 'affect', 'affects',
+                          'impact', 'defect', 'defects', 'if', 'when', 'exceed', 'exceeds', 'happen', 'happens']
+SPEC_PATTERN_EN = re.compile(r'\b(?:' + '|'.join(SPEC_KEYWORDS_EN) + r')\b')
+NON_LOOKUP_PATTERN_EN = re.compile(r'\b(?:' + '|'.join(NON_LOOKUP_KEYWORDS_EN) + r')\b')
+
+
+def is_spec_query(query: str) -> bool:
+    """
+    사양 값 자체를 묻는 조회형 질문인지 ("금형 온도 권장 범위는?" O, "범위를 벗어나면 왜 기공이 생기나요?" X)
+    """
+    lowered = query.lower()
+    if not any(keyword in query for keyword in SPEC_KEYWORDS) and not SPEC_PATTERN_EN.search(lowered):
+        return False
+    if any(keyword in query for keyword in NON_LOOKUP_KEYWORDS) or NON_LOOKUP_PATTERN_EN.search(lowered):
+        return False
+    return CONDITIONAL_PATTERN.search(query) is None
+
+
+def compact(text: str) -> str:
+    return re.sub(r'\s+', '', text.replace('**', '').replace('`', ''))
+
+
+def build_alias_table(feature_names: List[str], sensor_ids: bool = True) -> List[Tuple[str, List[str]]]:
+    """
+    (공백 제거 소문자 명칭, [features]) 목록 - 긴 명칭부터 (feature 이름 자체 포함)
+
+    Args:
+        sensor_ids: 센서 번호 명칭(SENSOR_ID_ALIASES) 포함 여부 (문서 인덱스 생성에서는 False)
+    """
+    groups = [PARAMETER_ALIASES, SENSOR_ID_ALIASES] if sensor_ids else [PARAMETER_ALIASES]
+    aliases = {}
+    for group in groups:
+        for feature, names in group.items():
+            if feature not in feature_names:
+                continue
+            for name in names:
+                aliases.setdefault(compact(name).lower(), []).append(feature)
+    for feature in feature_names:
+        aliases.setdefault(compact(feature).lower(), []).append(feature)
+    return sorted(aliases.items(), key=lambda item: len(item[0]), reverse=True)
+
+
+def resolve_features(text: str, alias_table: List[Tuple[str, List[str]]]) -> List[str]:
+    """
+    텍스트에 언급된 feature (가장 긴 명칭 1개 기준)
+    """
+    target = compact(text).lower()
+    for alias, features in alias_table:
+        if alias in target:
+            return features
+    return []
+
+
+def match_features(text: str, alias_table: List[Tuple[str, List[str]]]) -> List[str]:
+    """
+    텍스트에 언급된 모든 feature (명칭이 겹치면 긴 명칭 우선 - 매칭된 부분은 제거 후 계속)
+    """
+    target = compact(text).lower()
+    features = []
+    for alias, alias_features in alias_table:
+        if alias in target:
+            target = target.replace(alias, ' ')
+            features.extend(f for f in alias_features if f not in features)
+    return features
+
+
+def classify_kind(label: str, has_bounds_columns: bool = False) -> str:
+    if '정확도' in label or '정밀도' in label:
+        return 'accuracy'
+    if '측정' in label:
+        return 'measurement'
+    if has_bounds_columns:
+        return 'guideline'
+    return 'normal'
+
+
+def parse_range(text: str, default_unit: str = '') -> Optional[Dict[str, Any]]:
+    """
+    "650-680°C", "0°C ~ 300°C", "22-28 L/min", "±2°C" -> {"min", "max", "unit"}
+    """
+    accuracy = ACCURACY_PATTERN.search(text)
+    match = RANGE_PATTERN.search(text)
+    if match:
+        low, high = float(match.group(1)), float(match.group(3))
+        unit = match.group(4) or match.group(2) or default_unit
+        return {'min': min(low, high), 'max': max(low, high), 'unit': unit.strip()}
+    if accuracy:
+        value = float(accuracy.group(1))
+        return {'min': -value, 'max': value, 'unit': (accuracy.group(2) or default_unit).strip()}
+    return None
+
+
+def parse_value(text: str) -> Tuple[Optional[float], str]:
+    match = VALUE_PATTERN.match(text.strip())
+    if not match:
+        return None, ''
+    return float(match.group(1)), match.group(2)
+
+
+def find_column(header: List[str], keywords: List[str]) -> Optional[int]:
+    for i, cell in enumerate(header):
+        if any(keyword in cell for keyword in keywords):
+            return i
+    return None
+
+
+def table_entries(rows: List[List[str]], section_features: List[str],
+                  alias_table: List[Tuple[str, List[str]]]) -> List[Dict[str, Any]]:
+    """
+    표 행 파싱
+    - 최소/최대 열이 있는 표: guideline (권장/최적 열은 recommended)
+    - 범위 열이 있는 표: 범위 문자열 파싱
+    - 행 이름으로 feature를 찾지 못하면 section heading의 feature 사용 (행 이름은 label로 기록)
+    """
+    header, body = rows[0], rows[1:]
+    min_col = find_column(header, ['최소'])
+    max_col = find_column(header, ['최대'])
+    recommended_col = find_column(header, ['권장', '최적'])
+    range_col = find_column(header, ['범위'])
+    unit_col = find_column(header, ['단위'])
+    if (min_col is None or max_col is None) and range_col is None:
+        return []
+
+    entries = []
+    for row in body:
+        if len(row) < len(header):
+            continue
+        label = row[0]
+        features = resolve_features(label, alias_table) or section_features
+        if not features:
+            continue
+        unit = row[unit_col] if unit_col is not None else ''
+
+        if min_col is not None and max_col is not None:
+            low, low_unit = parse_value(row[min_col])
+            high, high_unit = parse_value(row[max_col])
+            if low is None or high is None:
+                continue
+            entry = {'kind': 'guideline', 'min': low, 'max': high, 'unit': unit or low_unit or high_unit}
+            if recommended_col is not None:
+                recommended, _ = parse_value(row[recommended_col])
+                if recommended is not None:
+                    entry['recommended'] = recommended
+        else:
+            entry = parse_range(row[range_col], unit)
+            if entry is None:
+                continue
+            entry = dict(kind=classify_kind(header[range_col]), **entry)
+
+        entries.extend(dict(entry, feature=feature, label=label) for feature in features)
+    return entries
+
+
+def parse_document(document: Dict[str, Any], feature_names: List[str]) -> List[Dict[str, Any]]:
+    """
+    문서 하나에서 파라미터 범위 항목 추출
+
+    Returns:
+        [{"feature", "kind", "min", "max", "unit", "label", "recommended"?, "source", "heading"}, ...]
+    """
+    alias_table = build_alias_table(feature_names, sensor_ids=False)
+    text = document['text']
+    entries = []
+    for section in kb_chunker.parse_sections(text):
+        section_title = section['heading'].split(' > ')[-1] if section['heading'] else ''
+        section_features = resolve_features(section_title, alias_table)
+        section_entries = []
+
+        for block in section['blocks']:
+            lines = [text[start:end].strip() for start, end in block['lines']]
+            if block['type'] == 'table':
+                rows = [
+                    [cell.replace('**', '').strip() for cell in line.strip('|').split('|')]
+                    for line in lines if not re.match(r'^\|?[\s:|-]+\|?$', line)
+                ]
+                if len(rows) > 1:
+                    section_entries.extend(table_entries(rows, section_features, alias_table))
+            elif block['type'] == 'text':
+                for line in lines:
+                    match = BULLET_PATTERN.match(line.replace('**', ''))
+                    if not match:
+                        continue
+                    label, value = match.group(1).strip(), match.group(2).strip()
+                    features = resolve_features(label, alias_table) or section_features
+                    parsed = parse_range(value)
+                    if not features or parsed is None or '주파수' in label:
+                        continue  # "주파수 범위: 10-1000 Hz" 같은 센서 대역은 운전 범위가 아님
+                    kind = classify_kind(label)
+                    if kind != 'accuracy' and '±' in value and not RANGE_PATTERN.search(value):
+                        continue  # "온도 편차: ±5°C" 같은 허용 편차는 범위가 아님
+                    section_entries.extend(
+                        dict(parsed, feature=feature, kind=kind, label=label) for feature in features
+                    )
+
+        for entry in section_entries:
+            entry['source'] = document['path']
+            entry['heading'] = section['heading']
+        entries.extend(section_entries)
+    return entries
+
+
+def build_parameter_index(documents: List[Dict[str, Any]], feature_names: List[str]) -> Dict[str, Any]:
+    """
+    문서 목록 -> {"version", "features": FEATURE_NAMES, "parameters": {feature: [항목, ...]}}
+    (features는 T3처럼 모델 코드를 포함하지 않는 Lambda에서 feature 이름 목록으로 사용)
+    """
+    by_feature = {name: [] for name in feature_names}
+    for document in documents:
+        for entry in parse_document(document, feature_names):
+            feature = entry.pop('feature')
+            by_feature[feature].append(entry)
+    return {
+        'version': INDEX_VERSION,
+        'features': list(feature_names),
+        'parameters': {name: entries for name, entries in by_feature.items() if entries}
+    }
+
+
+def format_range(entry: Dict[str, Any]) -> str:
+    """
+    "150-220 °C" / 정확도는 "±2 °C"
+    """
+    if entry['kind'] == 'accuracy':
+        value = f"±{entry['max']:g}"
+    else:
+        value = f"{entry['min']:g}-{entry['max']:g}"
+    return f"{value} {entry['unit']}".rstrip()
+
+
+class ParameterIndex:
+    """
+    파라미터 사양 조회 (feature 이름 / 센서 번호 / 한국어·영어 명칭)
+    """
+
+    def __init__(self, data: Dict[str, Any]):
+        self.parameters = data.get('parameters', {})
+        self.feature_names = data.get('features', list(self.parameters))
+        self.alias_table = build_alias_table(self.feature_names)
+
+    @classmethod
+    def load(cls, path: str) -> 'ParameterIndex':
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls(json.load(f))
+
+    def get(self, feature: str, kinds: Tuple[str, ...] = None) -> List[Dict[str, Any]]:
+        entries = self.parameters.get(feature, [])
+        if kinds is None:
+            return entries
+        return [entry for entry in entries if entry['kind'] in kinds]
+
+    def preferred_range(self, feature: str, kinds: Tuple[str, ...] = ('guideline', 'normal')) -> Optional[Tuple[float, float]]:
+        """
+        운영 범위 (kinds 순서 우선, 같은 kind는 문서 순서)
+        """
+        for kind in kinds:
+            for entry in self.get(feature, (kind,)):
+                return entry['min'], entry['max']
+        return None
+
+    def ranges(self, kinds: Tuple[str, ...] = ('guideline', 'normal')) -> Dict[str, Tuple[float, float]]:
+        ranges = {}
+        for feature in self.parameters:
+            preferred = self.preferred_range(feature, kinds)
+            if preferred is not None:
+                ranges[feature] = preferred
+        return ranges
+
+    def match_query(self, query: str) -> List[str]:
+        """
+        질의에 언급된 feature 목록 (명칭이 겹치면 긴 명칭 우선)
+        """
+        return match_features(query, self.alias_table)
+
+    def answer(self, query: str, max_entries: int = 3) -> Optional[Dict[str, Any]]:
+        """
+        사양 조회 질문이면 인덱스에서 바로 답변 생성
+
+        Returns:
+            {"answer", "parameters": {feature: [항목, ...]}} 또는 None (사양 질문이 아니거나 항목 없음)
+        """
+        if not is_spec_query(query):
+            return None
+
+        lowered = query.lower()
+        if any(keyword in lowered for keyword in ('정확도', '정밀도', 'accuracy', 'precision')):
+            kinds = ('accuracy',)
+        elif any(keyword in lowered for keyword in ('측정', 'measurement', 'measuring')):
+            kinds = ('measurement',)
+        else:
+            kinds = ('guideline', 'normal')
+
+        matched = {}
+        for feature in self.match_query(query):
+            entries = [entry for kind in kinds for entry in self.get(feature, (kind,))][:max_entries]
+            if entries:
+                matched[feature] = entries
+        if not matched:
+            return None
+
+        lines = []
+        for feature, entries in matched.items():
+            lines.append(f"**{feature}**")
+            for entry in entries:
+                kind = KIND_LABELS[entry['kind']]
+                label = kind if entry['label'] == kind else f"{kind} ({entry['label']})"
+                line = f"- {label}: {format_range(entry)}"
+                if 'recommended' in entry:
+                    line += f", 권장 {entry['recommended']:g} {entry['unit']}".rstrip()
+                section = entry['heading'].split(' > ')[-1] if entry['heading'] else ''
+                line += f" — {entry['source']}" + (f" › {section}" if section else '')
+                lines.append(line)
+        return {'answer': '\n'.join(lines), 'parameters': matched}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Knowledge Base 파라미터 사양 인덱스 생성')
+    parser.add_argument('command', choices=['build'])
+    parser.add_argument('--docs', type=str, default='knowledge_base_docs')
+    parser.add_argument('--output', type=str, default=DEFAULT_INDEX_PATH)
+    parser.add_argument('--upload', action='store_true', help='S3 config/parameter_ranges.json 업로드 (T2/T12)')
+    parser.add_argument('--bucket', type=str, default=os.environ.get('BUCKET_NAME', 'diecasting-models'))
+    args = parser.parse_args()
+
+    import kb_index
+    from feature_names import FEATURE_NAMES
+
+    documents = kb_index.load_documents(args.docs)
+    index = build_parameter_index(documents, FEATURE_NAMES)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(index, f, ensure_ascii=False, indent=2)
+    n_entries = sum(len(entries) for entries in index['parameters'].values())
+    print(f"✅ {len(index['parameters'])} parameters, {n_entries} ranges from {len(documents)} documents -> {args.output}")
+
+    if args.upload:
+        import boto3
+        boto3.client('s3').upload_file(args.output, args.bucket, PARAMETER_RANGES_KEY)
+        print(f"✅ Uploaded to s3://{args.bucket}/{PARAMETER_RANGES_KEY}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,139 @@
+"""
+검색 결과 local reranker (프롬프트 구성 전 단계)
+- Bedrock retrieve / 로컬 검색 결과를 질의 기준으로 재채점 (모델 호출 없음, 문서당 수십 µs)
+  · term proximity: 질의 term이 passage 안에서 얼마나 가까이 모여 있는지 (최소 window)
+  · coverage: passage에 등장한 질의 term 비율
+  · heading 일치: heading breadcrumb에 등장한 질의 term 비율
+  · feature 일치: 질의가 언급한 원본 feature(FEATURE_NAMES / 한국어 명칭)를 passage도 언급하는지
+  · 원래 검색 순위 (prior)
+- 시간 예산 초과 시 남은 후보는 원래 순서로 뒤에 유지 (버리지 않음)
+- cutoff 미만 후보 제거 → 생성 모델에 더 적고 관련도 높은 passage 전달
+"""
+
+import time
+from typing import Dict, Any, List, Tuple
+
+import kb_extractive
+import kb_index
+import kb_parameters
+
+DEFAULT_TIME_BUDGET_MS = 20.0
+DEFAULT_CUTOFF = 0.25  # rerank 점수(0~1)가 이보다 낮은 후보 제거
+DEFAULT_MIN_KEEP = 1  # cutoff와 무관하게 남기는 최소 후보 수
+
+# kb_benchmark gold set 기준 조정 (heading 일치가 section 단위 정답에 가장 유효)
+WEIGHTS = {
+    'proximity': 0.2,
+    'coverage': 0.25,
+    'heading': 0.3,
+    'feature': 0.1,
+    'prior': 0.15
+}
+
+
+def min_window(positions: List[Tuple[int, str]], n_terms: int) -> int:
+    """
+    서로 다른 term n_terms개를 모두 포함하는 최소 token window 길이 (positions는 위치순)
+    """
+    counts = {}
+    best = None
+    left = 0
+    for right, (position, term) in enumerate(positions):
+        counts[term] = counts.get(term, 0) + 1
+        while len(counts) == n_terms:
+            window = position - positions[left][0] + 1
+            best = window if best is None else min(best, window)
+            left_term = positions[left][1]
+            counts[left_term] -= 1
+            if counts[left_term] == 0:
+                del counts[left_term]
+            left += 1
+    return best or 0
+
+
+class Reranker:
+    """
+    질의 1개에 대한 reranker (질의 term / feature는 생성 시 1회 계산)
+    """
+
+    def __init__(self, query: str, alias_table: List[Tuple[str, List[str]]] = None):
+        self.terms = set(kb_index.tokenize(kb_extractive.strip_particles(query)))
+        self.alias_table = alias_table or []
+        self.features = set(kb_parameters.match_features(query, self.alias_table)) if alias_table else set()
+
+    def score(self, doc: Dict[str, Any], rank: int) -> Dict[str, float]:
+        """
+        후보 1개 점수 구성요소와 가중합 (0~1)
+        """
+        tokens = kb_index.tokenize(doc.get('content', ''))
+        positions = [(i, token) for i, token in enumerate(tokens) if token in self.terms]
+        matched = {token for _, token in positions}
+
+        coverage = len(matched) / len(self.terms) if self.terms else 0.0
+        if len(matched) > 1:
+            proximity = len(matched) / min_window(positions, len(matched)) * coverage
+        else:
+            proximity = coverage
+
+        heading_terms = set(kb_index.tokenize(doc.get('heading') or ''))
+        heading = len(self.terms & heading_terms) / len(self.terms) if self.terms else 0.0
+
+        feature = 0.0
+        if self.features:
+            mentioned = kb_parameters.match_features(
+                (doc.get('heading') or '') + '\n' + doc.get('content', ''), self.alias_table
+            )
+            feature = len(self.features.intersection(mentioned)) / len(self.features)
+
+        components = {
+            'proximity': proximity,
+            'coverage': coverage,
+            'heading': heading,
+            'feature': feature,
+            'prior': 1.0 / (rank + 1)
+        }
+        # feature를 언급하지 않은 질의 / heading이 없는 문서 단위 결과(S3 직접 검색)는 해당 가중치를 나머지 요소에 배분
+        active = [name for name in WEIGHTS
+                  if not (name == 'feature' and not self.features) and not (name == 'heading' and not doc.get('heading'))]
+        total = sum(WEIGHTS[name] for name in active)
+        components['score'] = sum(WEIGHTS[name] * components[name] for name in active) / total
+        return components
+
+
+def rerank(query: str, docs: List[Dict[str, Any]], alias_table: List[Tuple[str, List[str]]] = None,
+           time_budget_ms: float = DEFAULT_TIME_BUDGET_MS, cutoff: float = DEFAULT_CUTOFF,
+           min_keep: int = DEFAULT_MIN_KEEP, clock=time.perf_counter) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+    """
+    후보 재정렬 + cutoff 필터
+
+    Args:
+        alias_table: kb_parameters.build_alias_table(FEATURE_NAMES) (없으면 feature 일치 미사용)
+
+    Returns:
+        (재정렬된 후보 - 각 후보에 'rerank_score' 추가, {"candidates", "scored", "kept", "dropped",
+         "time_ms", "budget_exceeded"})
+    """
+    start = clock()
+    reranker = Reranker(query, alias_table)
+
+    scored = []
+    budget_exceeded = False
+    for rank, doc in enumerate(docs):
+        if (clock() - start) * 1000 > time_budget_ms:
+            budget_exceeded = True
+            break
+        components = reranker.score(doc, rank)
+        scored.append((components['score'], rank, dict(doc, rerank_score=round(components['score'], 4))))
+
+    scored.sort(key=lambda item: (-item[0], item[1]))
+    kept = [doc for i, (score, _, doc) in enumerate(scored) if score >= cutoff or i < min_keep]
+    unscored = [dict(doc) for doc in docs[len(scored):]]
+
+    return kept + unscored, {
+        'candidates': len(docs),
+        'scored': len(scored),
+        'kept': len(kept) + len(unscored),
+        'dropped': len(scored) - len(kept),
+        'time_ms': round((clock() - start) * 1000, 3),
+        'budget_exceeded': budget_exceeded
+    }
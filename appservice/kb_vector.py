@@ -0,0 +1,209 @@
+"""
+Knowledge Base 로컬 dense vector 인덱스
+- kb_index.json의 passage와 같은 순서로 embedding 행렬 (float32, L2 정규화) 저장 (kb_vectors.npy)
+- 로드 시 np.load(mmap_mode='r')로 memory-map, 검색은 행렬곱 1회 + argpartition top-k
+- Embedder 교체 가능: 기본값은 의존성 없는 hashing char n-gram embedder, 선택적으로 Bedrock Titan
+
+인덱스 생성 (kb_index.json 생성 후):
+    python appservice/kb_vector.py build --embedder hashing
+"""
+
+import argparse
+import json
+import math
+import os
+import re
+import time
+import zlib
+import numpy as np
+from collections import Counter
+from typing import Dict, Any, List
+
+import kb_index
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_VECTORS_PATH = os.path.join(BASE_DIR, 'kb_vectors.npy')
+DEFAULT_MANIFEST_PATH = os.path.join(BASE_DIR, 'kb_vectors.json')
+
+
+class HashingEmbedder:
+    """
+    의존성 없는 hashing embedder
+    - feature: kb_index 토큰 (한글 bigram / 영어 단어) + 단어별 문자 3-gram
+    - signed feature hashing (crc32, 프로세스 간 결정적) + sublinear tf + L2 정규화
+    """
+
+    name = 'hashing'
+
+    def __init__(self, dim: int = 512, ngram: int = 3):
+        self.dim = dim
+        self.ngram = ngram
+
+    def features(self, text: str) -> Counter:
+        features = Counter(kb_index.tokenize(text))
+        for word in re.findall(r'\w+', text.lower()):
+            padded = f'<{word}>'
+            features.update(
+                f'#{padded[i:i + self.ngram]}' for i in range(max(1, len(padded) - self.ngram + 1))
+            )
+        return features
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for feature, count in self.features(text).items():
+                h = zlib.crc32(feature.encode('utf-8'))
+                sign = 1.0 if (h >> 31) & 1 else -1.0
+                vectors[row, h % self.dim] += sign * (1.0 + math.log(count))
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.where(norms > 0, norms, 1.0)
+
+    def config(self) -> Dict[str, Any]:
+        return {'name': self.name, 'dim': self.dim, 'ngram': self.ngram}
+
+
+class BedrockEmbedder:
+    """
+    Amazon Titan Text Embeddings (Bedrock invoke_model) - 네트워크 호출 필요
+    """
+
+    name = 'bedrock'
+
+    def __init__(self, model_id: str = 'amazon.titan-embed-text-v2:0', dim: int = 512):
+        import boto3
+        self.model_id = model_id
+        self.dim = dim
+        self.client = boto3.client('bedrock-runtime', region_name='us-east-1')
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            response = self.client.invoke_model(
+                modelId=self.model_id,
+                body=json.dumps({'inputText': text, 'dimensions': self.dim, 'normalize': True})
+            )
+            vectors[row] = json.loads(response['body'].read())['embedding']
+        return vectors
+
+    def config(self) -> Dict[str, Any]:
+        return {'name': self.name, 'dim': self.dim, 'model_id': self.model_id}
+
+
+EMBEDDERS = {
+    'hashing': HashingEmbedder,
+    'bedrock': BedrockEmbedder
+}
+
+
+def create_embedder(config: Dict[str, Any]):
+    """
+    Manifest의 embedder 설정으로 embedder 생성 (인덱스 생성 시와 동일한 embedder 사용)
+    """
+    params = {k: v for k, v in config.items() if k != 'name'}
+    return EMBEDDERS[config['name']](**params)
+
+
+class VectorIndex:
+    """
+    Passage embedding 행렬 기반 cosine top-k 검색
+
+    passage 메타데이터/원문은 같은 passage 순서의 BM25Index에서 조회합니다.
+    """
+
+    def __init__(self, embeddings: np.ndarray, passage_index: 'kb_index.BM25Index', embedder):
+        if embeddings.shape[0] != len(passage_index.passages):
+            raise ValueError(f"Embedding rows ({embeddings.shape[0]}) != passages ({len(passage_index.passages)})")
+        self.embeddings = embeddings
+        self.passage_index = passage_index
+        self.embedder = embedder
+
+    @classmethod
+    def build(cls, passage_index: 'kb_index.BM25Index', embedder) -> 'VectorIndex':
+        texts = [
+            kb_index.passage_index_text(passage_index.documents[p['doc']], p)
+            for p in passage_index.passages
+        ]
+        return cls(embedder.embed(texts).astype(np.float32), passage_index, embedder)
+
+    def save(self, vectors_path: str = DEFAULT_VECTORS_PATH, manifest_path: str = DEFAULT_MANIFEST_PATH) -> None:
+        np.save(vectors_path, np.ascontiguousarray(self.embeddings, dtype=np.float32))
+        with open(manifest_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'embedder': self.embedder.config(),
+                'n_passages': int(self.embeddings.shape[0]),
+                'dim': int(self.embeddings.shape[1]),
+                'index_version': kb_index.INDEX_VERSION
+            }, f, indent=2)
+
+    @classmethod
+    def load(cls, passage_index: 'kb_index.BM25Index', vectors_path: str = DEFAULT_VECTORS_PATH,
+             manifest_path: str = DEFAULT_MANIFEST_PATH, embedder=None) -> 'VectorIndex':
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        embeddings = np.load(vectors_path, mmap_mode='r')
+        return cls(embeddings, passage_index, embedder or create_embedder(manifest['embedder']))
+
+    def search(self, query: str, top_k: int = 5, mask: np.ndarray = None) -> List[Dict[str, Any]]:
+        """
+        Cosine top-k passage 검색 (embedding은 L2 정규화되어 있으므로 내적 = cosine)
+
+        Args:
+            mask: 검색 대상 passage bool mask (카테고리 필터, 대상 행만 내적 계산)
+        """
+        query_vector = self.embedder.embed([query])[0]
+        if mask is None:
+            passage_ids = np.arange(self.embeddings.shape[0])
+            scores = self.embeddings @ query_vector
+        else:
+            passage_ids = np.flatnonzero(mask)
+            scores = self.embeddings[passage_ids] @ query_vector
+        if len(scores) == 0:
+            return []
+
+        top_k = min(top_k, len(scores))
+        candidates = np.argpartition(-scores, top_k - 1)[:top_k]
+        candidates = candidates[np.argsort(-scores[candidates], kind='stable')]
+
+        return [
+            dict(self.passage_index.passage(int(passage_ids[i])), score=float(scores[i]))
+            for i in candidates
+            if scores[i] > 0
+        ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Knowledge Base vector 인덱스 생성')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    build_parser = subparsers.add_parser('build', help='kb_index.json passage embedding 생성')
+    build_parser.add_argument('--index', type=str, default=kb_index.DEFAULT_INDEX_PATH)
+    build_parser.add_argument('--embedder', type=str, default='hashing', choices=sorted(EMBEDDERS))
+    build_parser.add_argument('--dim', type=int, default=512)
+
+    search_parser = subparsers.add_parser('search', help='인덱스 검색 테스트')
+    search_parser.add_argument('query', type=str)
+    search_parser.add_argument('--index', type=str, default=kb_index.DEFAULT_INDEX_PATH)
+    search_parser.add_argument('--top-k', type=int, default=5)
+
+    args = parser.parse_args()
+    passage_index = kb_index.BM25Index.load(args.index)
+
+    if args.command == 'build':
+        embedder = EMBEDDERS[args.embedder](dim=args.dim)
+        start = time.time()
+        vector_index = VectorIndex.build(passage_index, embedder)
+        vector_index.save()
+        print(f"✅ Embedded {vector_index.embeddings.shape[0]} passages ({args.embedder}, dim {args.dim}) "
+              f"in {time.time() - start:.1f}s -> {DEFAULT_VECTORS_PATH}")
+    else:
+        vector_index = VectorIndex.load(passage_index)
+        start = time.perf_counter()
+        results = vector_index.search(args.query, args.top_k)
+        elapsed_us = (time.perf_counter() - start) * 1e6
+        for result in results:
+            print(f"{result['score']:8.3f}  {result['path']}  [{result['heading']}]")
+        print(f"({elapsed_us:.0f} µs)")
+
+
+if __name__ == '__main__':
+    main()
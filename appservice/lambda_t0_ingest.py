@@ -1,18 +1,24 @@
 """
 Lambda T0: Knowledge Base Ingest
 문서 청킹, 임베딩 후 S3 Vector 인덱스 및 Knowledge Base 메타데이터 갱신
+- ingestion 전 문서별 category metadata 파일(<key>.metadata.json) 기록 (T3 카테고리 필터 검색용)
 """
 import json
 import boto3
 import os
 from datetime import datetime
 
+import kb_categories
+
 # AWS Clients
 bedrock_agent = boto3.client('bedrock-agent', region_name='us-east-1')
+s3 = boto3.client('s3')
 
 # Environment Variables
 KNOWLEDGE_BASE_ID = os.getenv('KNOWLEDGE_BASE_ID', 'YOUR_KNOWLEDGE_BASE_ID')
 DATA_SOURCE_ID = os.getenv('DATA_SOURCE_ID', '85CWXCHZLJ')
+BUCKET_NAME = os.getenv('BUCKET_NAME', 'your-knowledge-base-bucket')
+KB_VERSION_KEY = os.getenv('KB_VERSION_KEY', 'kb_version.json')  # T3 답변 cache 무효화용 버전 stamp
 
 
 def lambda_handler(event, context):
@@ -37,6 +43,9 @@ def lambda_handler(event, context):
             return check_ingestion_status(job_id)
         elif action == 'list_jobs':
             return list_ingestion_jobs()
+        elif action == 'write_metadata':
+            written = write_category_metadata()
+            return response(200, {'metadata_written': written})
         else:
             return response(400, {'error': f'Unknown action: {action}'})
             
@@ -48,12 +57,15 @@ def lambda_handler(event, context):
 def start_ingestion_job():
     """Data Source 동기화 시작"""
     try:
+        metadata_written = write_category_metadata()
+        
         result = bedrock_agent.start_ingestion_job(
             knowledgeBaseId=KNOWLEDGE_BASE_ID,
             dataSourceId=DATA_SOURCE_ID
         )
         
         job = result.get('ingestionJob', {})
+        version_stamped = write_version_stamp(job)
         
         return response(200, {
             'message': 'Ingestion job started successfully',
@@ -61,7 +73,9 @@ def start_ingestion_job():
             'status': job.get('status'),
             'started_at': job.get('startedAt', datetime.now()).isoformat() if job.get('startedAt') else datetime.now().isoformat(),
             'knowledge_base_id': KNOWLEDGE_BASE_ID,
-            'data_source_id': DATA_SOURCE_ID
+            'data_source_id': DATA_SOURCE_ID,
+            'version_stamped': version_stamped,
+            'metadata_written': metadata_written
         })
         
     except Exception as e:
@@ -70,6 +84,72 @@ def start_ingestion_job():
         })
 
 
+def write_version_stamp(job):
+    """
+    KB 버전 stamp 기록 (s3://BUCKET_NAME/KB_VERSION_KEY)
+    T3는 이 값이 바뀌면 답변 cache를 비움 - stamp 기록 실패가 ingestion 시작을 막지는 않음
+    """
+    try:
+        s3.put_object(
+            Bucket=BUCKET_NAME,
+            Key=KB_VERSION_KEY,
+            Body=json.dumps({
+                'job_id': job.get('ingestionJobId'),
+                'knowledge_base_id': KNOWLEDGE_BASE_ID,
+                'data_source_id': DATA_SOURCE_ID,
+                'stamped_at': datetime.now().isoformat()
+            }),
+            ContentType='application/json'
+        )
+        return True
+    except Exception as e:
+        print(f"Failed to write KB version stamp: {str(e)}")
+        return False
+
+
+def write_category_metadata():
+    """
+    버킷의 markdown 문서별 category metadata 파일 기록
+    Bedrock KB가 같은 ingestion에서 chunk metadata로 반영 - 카테고리를 알 수 없는 문서는 건너뜀
+    - 기존 metadata 파일이 있으면 category만 추가 (다른 속성 유지), 이미 category가 있으면 건너뜀
+    
+    Returns:
+        기록한 metadata 파일 수 (실패 시 0, ingestion 시작을 막지는 않음)
+    """
+    written = 0
+    try:
+        keys = set()
+        paginator = s3.get_paginator('list_objects_v2')
+        for page in paginator.paginate(Bucket=BUCKET_NAME):
+            keys.update(obj['Key'] for obj in page.get('Contents', []))
+        
+        for key in sorted(keys):
+            if not key.endswith('.md') or not kb_categories.document_categories(key):
+                continue
+            
+            sidecar = kb_categories.metadata_sidecar(key)
+            if key + kb_categories.METADATA_SUFFIX in keys:
+                try:
+                    obj = s3.get_object(Bucket=BUCKET_NAME, Key=key + kb_categories.METADATA_SUFFIX)
+                    sidecar = kb_categories.merge_sidecar(json.loads(obj['Body'].read()), key)
+                except Exception as e:
+                    # 읽을 수 없는 기존 파일은 덮어쓰지 않음
+                    print(f"Skipping unreadable metadata for {key}: {str(e)}")
+                    continue
+                if sidecar is None:
+                    continue
+            s3.put_object(
+                Bucket=BUCKET_NAME,
+                Key=key + kb_categories.METADATA_SUFFIX,
+                Body=json.dumps(sidecar, ensure_ascii=False),
+                ContentType='application/json'
+            )
+            written += 1
+    except Exception as e:
+        print(f"Failed to write category metadata: {str(e)}")
+    return written
+
+
 def check_ingestion_status(job_id):
     """Ingestion Job 상태 확인"""
     if not job_id:
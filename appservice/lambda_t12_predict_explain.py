@@ -0,0 +1,238 @@
+"""
+Lambda T1+T2: 품질 예측 + 원인 분석 통합 (predict-and-explain)
+- 한 번의 호출에서 Scaling → AutoEncoder(12D latent) → Gradient Boosting 예측 → TreeSHAP attribution
+- T1의 scaled features / latent / 42D 결합 배열을 그대로 attribution에 사용 (T2 재스케일링, 재예측 없음)
+- 에이전트의 T1 → (LLM) → T2 이중 호출과 모델 중복 로드 제거
+- 장비 매핑은 T2와 같은 장비×feature 행렬로 컴파일 (equipment_groups / equipment_ranking 동일)
+- What-if sweep (action='whatif'): 예측을 뒤집는 최소 변경 공정 설정 탐색 (whatif_sweep.py)
+"""
+
+import json
+import time
+import numpy as np
+from typing import Dict, Any
+
+import lambda_t1_predict as t1
+import lambda_t2_importance as t2
+import whatif_sweep
+from tree_shap import TreeShapExplainer
+
+# T1 GB 모델로 생성한 explainer (Cold start 시 1회)
+explainer = None
+
+# What-if sweep 범위: 장비 설명의 가이드라인 적정 범위 (파라미터 사양 인덱스가 있으면 문서 범위 우선)
+GUIDELINE_RANGES = whatif_sweep.parse_guideline_ranges(t2.EQUIPMENT_DESCRIPTIONS)
+
+
+def load_models():
+    """
+    T1 모델(AutoEncoder, GB, Scaler) 로드 후 같은 GB 모델로 TreeSHAP explainer 생성,
+    T2 장비 매핑 컴파일 (T2 load_models는 이 Lambda에서 실행되지 않음)
+    """
+    global explainer
+
+    t1.load_models()
+    if explainer is None:
+        explainer = TreeShapExplainer(t1.gb_model)
+        print(f"✅ Native TreeSHAP explainer built ({len(explainer.roots)} trees)")
+
+        t2.compile_equipment_matrix(t2.load_equipment_mapping())
+
+        parameter_index = t2.load_parameter_index()
+        if parameter_index is not None:
+            GUIDELINE_RANGES.update(parameter_index.ranges())
+
+
+def predict_and_explain(features: np.ndarray, top_n: int = 10) -> Dict[str, Any]:
+    """
+    예측과 attribution을 하나의 파이프라인에서 계산
+
+    Args:
+        features: (1, 30) raw features
+        top_n: 반환할 상위 feature 수
+
+    Returns:
+        prediction + explanation 결과와 단계별 처리 시간
+    """
+    timings = {}
+
+    stage_start = time.time()
+    latent, features_scaled = t1.generate_latent_features(features)
+    timings['encode_ms'] = (time.time() - stage_start) * 1000
+
+    stage_start = time.time()
+    prediction = t1.predict_quality(features_scaled, latent)
+    timings['predict_ms'] = (time.time() - stage_start) * 1000
+
+    # 예측에 사용한 것과 동일한 42D 입력으로 attribution
+    stage_start = time.time()
+    combined_features = np.concatenate([features_scaled, latent], axis=1)
+    phi = explainer.shap_values(combined_features)
+    explanation = t2.summarize_attributions(phi[0])
+    timings['attribution_ms'] = (time.time() - stage_start) * 1000
+
+    top_features = explanation['sorted_importance'][:top_n]
+
+    return {
+        'prediction': prediction,
+        'latent_features': latent[0].tolist(),
+        'top_features': top_features,
+        'feature_contributions': explanation['feature_contributions'],
+        'latent_contributions': explanation['latent_contributions'],
+        'latent_total': explanation['latent_total'],
+        'latent_share': explanation['latent_share'],
+        'base_value': explainer.expected_value,
+        'equipment_descriptions': t2.get_equipment_descriptions(top_features),
+        'equipment_ranking': t2.feature_importance_ranking(explanation['feature_importance']),
+        'chart_data': t2.build_chart_data(explanation['sorted_importance'], top_n),
+        'timings_ms': {k: round(v, 2) for k, v in timings.items()},
+        'method': 'Native TreeSHAP (per-sample, defect log-odds)'
+    }
+
+
+def predict_defect_proba(features: np.ndarray) -> np.ndarray:
+    """
+    (n, 30) raw features 배치를 Scaling → AutoEncoder → GB 한 번으로 평가
+
+    Returns:
+        (n,) 불량 확률
+    """
+    latent, features_scaled = t1.generate_latent_features(features)
+    return t1.gb_model.predict_proba(np.concatenate([features_scaled, latent], axis=1))[:, 1]
+
+
+def whatif(features: np.ndarray, body: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    현재 shot의 예측을 뒤집는 최소 변경 설정 탐색
+
+    sweep_features가 없으면 현재 shot의 attribution 상위 top_k개 공정 파라미터를 사용
+    """
+    sweep_features = body.get('sweep_features')
+    if not sweep_features:
+        latent, features_scaled = t1.generate_latent_features(features)
+        phi = explainer.shap_values(np.concatenate([features_scaled, latent], axis=1))
+        contributions = t2.summarize_attributions(phi[0])['feature_contributions']
+        sweep_features = whatif_sweep.select_sweep_features(
+            contributions, body.get('top_k', whatif_sweep.DEFAULT_TOP_K)
+        )
+    unknown = [name for name in sweep_features if name not in t2.FEATURE_NAMES]
+    if unknown:
+        raise ValueError(f"Unknown sweep features: {unknown}")
+
+    return whatif_sweep.run_sweep(
+        features[0], t2.FEATURE_NAMES, sweep_features, predict_defect_proba,
+        GUIDELINE_RANGES, t1.scaler.scale_,
+        steps=body.get('steps', whatif_sweep.DEFAULT_STEPS),
+        threshold=body.get('threshold', 0.5),
+        max_results=body.get('max_results', 3)
+    )
+
+
+def lambda_handler(event, context):
+    """
+    Lambda 핸들러
+
+    Input:
+        {
+            "features": {...},  # 30D features (dict 또는 list)
+            "top_n": 10
+        }
+
+    Output:
+        {
+            "statusCode": 200,
+            "body": {
+                "prediction": {...},  # Lambda T1과 동일
+                "latent_features": [...],
+                "top_features": [...],  # Lambda T2 attribution_mode=shap과 동일
+                "feature_contributions": {...},
+                "equipment_descriptions": [...],  # 각 항목에 equipment_groups 포함
+                "equipment_ranking": [...],  # Lambda T2와 동일한 장비 단위 ranking
+                "chart_data": {...},
+                "timings_ms": {"encode_ms": ..., "predict_ms": ..., "attribution_ms": ...},
+                "processing_time_ms": 25.1,
+                "model_version": "v1.0_12D_GB"
+            }
+        }
+
+    What-if action:
+        {
+            "action": "whatif",
+            "features": {...},
+            "top_k": 3,  # optional: attribution 상위 k개 공정 파라미터 sweep
+            "sweep_features": ["Process_Temperature", ...],  # optional: 직접 지정
+            "steps": 11  # optional: feature별 grid 점 수
+        }
+        -> counterfactuals: [{"changes": [{"feature", "from", "to", "delta"}], "defect_proba", "distance"}, ...]
+    """
+    start_time = time.time()
+
+    try:
+        # 모델 로드 (Cold start 시)
+        load_models()
+
+        # 입력 파싱
+        if isinstance(event.get('body'), str):
+            body = json.loads(event['body'])
+        else:
+            body = event.get('body', event)
+
+        # body가 또 다른 body를 포함하는 경우 처리 (중첩 구조)
+        if 'body' in body and isinstance(body['body'], dict):
+            body = body['body']
+
+        features = t1.extract_features(body)
+        if body.get('action') == 'whatif':
+            response_body = whatif(features, body)
+        else:
+            response_body = predict_and_explain(features, body.get('top_n', 10))
+        response_body['processing_time_ms'] = round((time.time() - start_time) * 1000, 2)
+        response_body['model_version'] = 'v1.0_12D_GB'
+
+        return {
+            'statusCode': 200,
+            'headers': {
+                'Content-Type': 'application/json',
+                'Access-Control-Allow-Origin': '*'
+            },
+            'body': json.dumps(response_body)
+        }
+
+    except ValueError as e:
+        return {
+            'statusCode': 400,
+            'headers': {
+                'Content-Type': 'application/json',
+                'Access-Control-Allow-Origin': '*'
+            },
+            'body': json.dumps({
+                'error': 'Invalid input',
+                'message': str(e)
+            })
+        }
+
+    except Exception as e:
+        print(f"Error: {str(e)}")
+        import traceback
+        traceback.print_exc()
+
+        return {
+            'statusCode': 500,
+            'headers': {
+                'Content-Type': 'application/json',
+                'Access-Control-Allow-Origin': '*'
+            },
+            'body': json.dumps({
+                'error': 'Internal server error',
+                'message': str(e)
+            })
+        }
+
+
+# Local testing
+if __name__ == '__main__':
+    with open('../config/test_t2_payload.json', 'r', encoding='utf-8') as f:
+        test_event = {'body': {'features': json.load(f)['features'], 'top_n': 10}}
+
+    result = lambda_handler(test_event, None)
+    print(json.dumps(json.loads(result['body']), indent=2, ensure_ascii=False))
@@ -1,69 +1,93 @@
 """
 Lambda T2: Feature Importance 분석 (Gradient Boosting 기반)
 - Gradient Boosting 모델의 feature_importances_를 사용하여 실시간 feature importance 계산
-- 개별 예측에 대한 feature importance 분석
+- 개별 예측에 대한 SHAP attribution 분석 (attribution_mode='shap', 배치 지원, native TreeSHAP 기본)
+- 모델 버전별 Partial Dependence / ICE 테이블 조회 (action='partial_dependence', modeloptim/create_partial_dependence.py 산출물)
+- 장비 매핑(equipment_sensor_mapping.json)을 장비×feature 희소 행렬로 컴파일하여 장비 단위 중요도 rollup
+- 배치 모드 (action='batch'): n×30 행렬의 샘플별 attribution을 feature / 예측 클래스 / 장비 그룹별로 집계
 - S3에서 로드한 장비/센서 매핑 정보를 통해 영향을 미친 장비/센서에 대한 상세 설명 제공
-- PNG 차트 생성 및 presigned URL 발급
+- 문서 기반 파라미터 사양 인덱스(kb_parameters.py)로 feature별 권장/정상 범위 주석 (spec_ranges)
+- 고해상도 PNG 차트 생성 (기본, content-addressed S3 cache) 및 presigned URL 발급
+- SVG / bar 데이터 차트 (chart_format='svg' | 'data' 선택, matplotlib / S3 불필요)
 - Streamlit UI에서 시각화
 """
 
 import json
 import boto3
+import hashlib
+import html
+import importlib.util
+import io
 import numpy as np
 import pickle
+import threading
 import time
+import os
 from typing import Dict, Any, List, Tuple
 from datetime import datetime
+from botocore.exceptions import ClientError
 
-# SHAP는 선택적으로 사용
-try:
-    import shap
-    SHAP_AVAILABLE = True
-except ImportError:
-    SHAP_AVAILABLE = False
-    print("SHAP not available - using model's feature_importances_ instead")
-
-# matplotlib for chart generation
-try:
-    import matplotlib
-    matplotlib.use('Agg')  # Non-interactive backend
-    import matplotlib.pyplot as plt
-    MATPLOTLIB_AVAILABLE = True
-except ImportError:
-    MATPLOTLIB_AVAILABLE = False
-    print("matplotlib not available - chart generation disabled")
+import kb_parameters
+from feature_names import FEATURE_NAMES
+from tree_shap import TreeShapExplainer
+
+# SHAP는 선택적으로 사용 (ATTRIBUTION_BACKEND=shap인 경우만 필요, explainer unpickle 시 import)
+SHAP_AVAILABLE = importlib.util.find_spec('shap') is not None
+if not SHAP_AVAILABLE:
+    print("SHAP not available - using native TreeSHAP for per-sample attribution")
+
+# matplotlib은 PNG export(chart_format=png)에서만 지연 import
+MATPLOTLIB_AVAILABLE = importlib.util.find_spec('matplotlib') is not None
+if not MATPLOTLIB_AVAILABLE:
+    print("matplotlib not available - PNG chart export disabled (SVG/data charts only)")
+plt = None
+
+# scipy가 있으면 장비×feature 매핑을 희소 행렬로, 없으면 dense numpy 행렬로 컴파일
+SCIPY_AVAILABLE = importlib.util.find_spec('scipy') is not None
 
 # AWS clients
 s3 = boto3.client('s3')
+lambda_client = boto3.client('lambda')
 
 # Configuration
 BUCKET_NAME = 'diecasting-models'
 GB_MODEL_KEY = 'models/gradient_boosting_model.pkl'
 SCALER_KEY = 'models/scaler.pkl'
+SHAP_EXPLAINER_KEY = 'models/shap_explainer.pkl'  # modeloptim/create_shap_explainer.py 산출물 (ATTRIBUTION_BACKEND=shap)
 EQUIPMENT_MAPPING_KEY = 'config/equipment_sensor_mapping.json'
+PARAMETER_RANGES_KEY = kb_parameters.PARAMETER_RANGES_KEY  # kb_parameters.py build --upload 산출물
+PARTIAL_DEPENDENCE_KEY = 'models/partial_dependence/{model_version}.json'  # modeloptim/create_partial_dependence.py 산출물
 PRESIGNED_URL_EXPIRATION = 3600  # 1 hour
+PRESIGNED_URL_REFRESH_MARGIN = 300  # 만료 5분 전부터는 새 URL 발급
+# 비동기 차트 렌더링 Lambda (배포 시 필수 - 미설정 시 로컬 개발용 thread, Lambda에서는 반환 후 동결되어 완료 보장 없음)
+CHART_WORKER_FUNCTION = os.environ.get('CHART_WORKER_FUNCTION')
+CHART_JOB_TIMEOUT = 120  # 이 시간 안에 차트가 업로드되지 않은 pending 작업은 failed로 보고
+ATTRIBUTION_BACKEND = os.environ.get('ATTRIBUTION_BACKEND', 'native')  # 'native' | 'shap'
+MODEL_VERSION = os.environ.get('MODEL_VERSION', 'v1.4')  # Global cache key (Lambda T1과 동일)
+ATTRIBUTION_METHODS = {
+    'native': 'Native TreeSHAP',
+    'shap': 'SHAP TreeExplainer'
+}
 
 # Model cache
 gb_model = None
 scaler = None
 feature_names = None
 equipment_mapping = None
+parameter_index = None  # kb_parameters.ParameterIndex (문서 기반 파라미터 사양)
+equipment_matrix = None  # (장비 수, 30) 0/1 매핑 행렬 (scipy.sparse CSR 또는 numpy)
+equipment_groups = []  # equipment_matrix 행 순서의 장비 메타데이터
+feature_equipment = {}  # feature name -> 소속 장비 메타데이터 리스트
+shap_explainer = None
+shap_explainer_error = None  # 로드 실패 시 매 요청마다 재시도하지 않도록 기록
+global_cache = {}  # model version -> 사전 계산된 global importance 응답 요소
+uploaded_chart_keys = set()  # 이 컨테이너에서 확인된 차트 S3 key
+presigned_url_cache = {}  # S3 key -> (presigned URL, 만료 시각)
+chart_jobs = {}  # chart_id -> {"state": "pending" | "ready" | "failed", "started_at": ...}
+partial_dependence = None  # model version별 PD/ICE artifact
+partial_dependence_error = None  # 로드 실패 시 매 요청마다 재시도하지 않도록 기록
 
 
-# Feature 이름 정의 (Lambda T1과 동일)
-FEATURE_NAMES = [
-    'Process_Temperature', 'Process_Pressure', 'Process_InjectionSpeed',
-    'Process_InjectionTime', 'Process_CoolingTime', 'Process_ClampForce',
-    'Process_MoldTemperature', 'Process_MeltTemperature', 'Process_CycleTime',
-    'Process_ShotSize', 'Process_BackPressure', 'Process_ScrewSpeed',
-    'Process_HoldPressure', 'Process_HoldTime', 'Process_CushionPosition',
-    'Process_PlasticizingTime', 'Sensor_Vibration', 'Sensor_Noise',
-    'Sensor_Temperature1', 'Sensor_Temperature2', 'Sensor_Temperature3',
-    'Sensor_Pressure1', 'Sensor_Pressure2', 'Sensor_Pressure3',
-    'Sensor_Flow', 'Sensor_Position', 'Sensor_Speed', 'Sensor_Torque',
-    'Sensor_Current', 'Sensor_Voltage'
-]
-
 # 장비/센서 설명 데이터베이스
 EQUIPMENT_DESCRIPTIONS = {
     'Process_Temperature': {
@@ -150,7 +174,7 @@ def load_models():
     """
     S3에서 모델 및 장비 매핑 정보 로드
     """
-    global gb_model, scaler, feature_names, equipment_mapping
+    global gb_model, scaler, feature_names
     
     if gb_model is None:
         print("Loading models from S3...")
@@ -172,19 +196,18 @@ def load_models():
                 scaler = pickle.load(f)
             print(f"✅ Scaler loaded (n_features: {scaler.n_features_in_})")
             
-            # 장비/센서 매핑 정보 (optional)
-            try:
-                mapping_path = '/tmp/equipment_mapping.json'
-                print(f"Downloading equipment mapping from s3://{BUCKET_NAME}/{EQUIPMENT_MAPPING_KEY}")
-                s3.download_file(BUCKET_NAME, EQUIPMENT_MAPPING_KEY, mapping_path)
-                with open(mapping_path, 'r', encoding='utf-8') as f:
-                    equipment_mapping = json.load(f)
-                print("✅ Equipment mapping loaded")
-            except Exception as e:
-                print(f"⚠️ Equipment mapping not available: {e}")
-                equipment_mapping = None
+            # 장비/센서 매핑 정보, 파라미터 사양 인덱스 (optional)
+            load_equipment_mapping()
+            load_parameter_index()
             
             feature_names = FEATURE_NAMES
+            compile_equipment_matrix(equipment_mapping)
+            build_global_cache()
+            
+            # Native TreeSHAP 테이블은 cold start 시 미리 생성 (요청 지연에서 제외)
+            if ATTRIBUTION_BACKEND == 'native':
+                load_explainer()
+            
             print("Models loaded successfully!")
             
         except Exception as e:
@@ -194,19 +217,340 @@ def load_models():
             raise
 
 
-def calculate_shap_values(features: np.ndarray, latent: np.ndarray = None) -> Dict[str, Any]:
+def load_equipment_mapping():
+    """
+    장비/센서 매핑 로드 (optional, 없으면 장비 그룹 없이 feature 단위 설명만 제공)
     """
-    Feature importance 계산 (모델의 feature_importances_ 사용)
+    global equipment_mapping
+
+    try:
+        mapping_path = '/tmp/equipment_mapping.json'
+        print(f"Downloading equipment mapping from s3://{BUCKET_NAME}/{EQUIPMENT_MAPPING_KEY}")
+        s3.download_file(BUCKET_NAME, EQUIPMENT_MAPPING_KEY, mapping_path)
+        with open(mapping_path, 'r', encoding='utf-8') as f:
+            equipment_mapping = json.load(f)
+        print("✅ Equipment mapping loaded")
+    except Exception as e:
+        print(f"⚠️ Equipment mapping not available: {e}")
+        equipment_mapping = None
+    return equipment_mapping
+
+
+def load_parameter_index():
+    """
+    문서 기반 파라미터 사양 인덱스 로드 (optional, 없으면 spec_ranges 주석 생략)
+    """
+    global parameter_index
+
+    if parameter_index is not None:
+        return parameter_index
+    try:
+        ranges_path = '/tmp/parameter_ranges.json'
+        print(f"Downloading parameter ranges from s3://{BUCKET_NAME}/{PARAMETER_RANGES_KEY}")
+        s3.download_file(BUCKET_NAME, PARAMETER_RANGES_KEY, ranges_path)
+        parameter_index = kb_parameters.ParameterIndex.load(ranges_path)
+        print(f"✅ Parameter ranges loaded ({len(parameter_index.parameters)} parameters)")
+    except Exception as e:
+        print(f"⚠️ Parameter ranges not available: {e}")
+    return parameter_index
+
+
+def load_explainer():
+    """
+    샘플별 attribution용 explainer 준비 (Cold start 시 1회, 실패 시 재시도 안 함)
+    - native: GB 모델 트리를 패킹한 numpy TreeSHAP (기본값, shap 패키지 불필요)
+    - shap: 사전 생성된 SHAP TreeExplainer를 S3에서 로드
+    
+    Returns:
+        explainer or None
+    """
+    global shap_explainer, shap_explainer_error
+    
+    if shap_explainer is not None or shap_explainer_error is not None:
+        return shap_explainer
+    
+    try:
+        if ATTRIBUTION_BACKEND == 'shap':
+            if not SHAP_AVAILABLE:
+                raise RuntimeError('shap package not installed')
+            explainer_path = '/tmp/shap_explainer.pkl'
+            print(f"Downloading SHAP explainer from s3://{BUCKET_NAME}/{SHAP_EXPLAINER_KEY}")
+            s3.download_file(BUCKET_NAME, SHAP_EXPLAINER_KEY, explainer_path)
+            with open(explainer_path, 'rb') as f:
+                shap_explainer = pickle.load(f)
+            print("✅ SHAP explainer loaded")
+        else:
+            load_models()
+            shap_explainer = TreeShapExplainer(gb_model)
+            print(f"✅ Native TreeSHAP explainer built ({len(shap_explainer.roots)} trees, "
+                  f"{shap_explainer.leaf_table.shape[0]} leaves)")
+    except Exception as e:
+        print(f"⚠️ Explainer not available: {e}")
+        shap_explainer_error = str(e)
+    
+    return shap_explainer
+
+
+def compute_attributions(combined_features: np.ndarray) -> Tuple[np.ndarray, float]:
+    """
+    여러 샘플에 대한 SHAP attribution을 한 번에 계산 (불량 클래스 log-odds 기준)
     
     Args:
-        features: 30D features (scaled)
-        latent: 12D latent features (optional)
+        combined_features: (n, 42) scaled features + latent
     
     Returns:
-        Feature importance analysis results
+        (phi, base_value) - phi: (n, 42)
+    """
+    explainer = load_explainer()
+    if explainer is None:
+        raise RuntimeError(f"Explainer unavailable: {shap_explainer_error}")
+    
+    shap_values = explainer.shap_values(combined_features)
+    expected_value = explainer.expected_value
+    
+    # 구버전 shap은 클래스별 리스트를 반환
+    if isinstance(shap_values, list):
+        shap_values = shap_values[-1]
+        expected_value = np.atleast_1d(expected_value)[-1]
+    
+    phi = np.asarray(shap_values, dtype=np.float64).reshape(combined_features.shape[0], -1)
+    base_value = float(np.atleast_1d(expected_value)[-1])
+    return phi, base_value
+
+
+def summarize_attributions(phi_row: np.ndarray) -> Dict[str, Any]:
+    """
+    단일 샘플의 attribution을 원본 feature / latent feature로 분리하여 요약
+    
+    - feature_importance: |phi| 비율 (원본 + latent 전체 합 = 1)
+    - feature_contributions: 원본 30개 feature의 부호 포함 기여도 (log-odds)
+    - latent_contributions: AutoEncoder latent 기여도 (원본 feature로 환원 불가하여 별도 보고)
+    """
+    n_original = len(FEATURE_NAMES)
+    abs_phi = np.abs(phi_row)
+    total = float(abs_phi.sum()) or 1.0
+    
+    importance_dict = {
+        name: float(v) / total
+        for name, v in zip(FEATURE_NAMES, abs_phi[:n_original])
+    }
+    contributions = {
+        name: float(v) for name, v in zip(FEATURE_NAMES, phi_row[:n_original])
+    }
+    latent_phi = phi_row[n_original:]
+    latent_contributions = {
+        f'Latent_{i+1}': float(v) for i, v in enumerate(latent_phi)
+    }
+    
+    return {
+        'feature_importance': importance_dict,
+        'sorted_importance': sorted(importance_dict.items(), key=lambda x: x[1], reverse=True),
+        'feature_contributions': contributions,
+        'latent_contributions': latent_contributions,
+        'latent_total': float(latent_phi.sum()),
+        'latent_share': float(np.abs(latent_phi).sum()) / total
+    }
+
+
+def compile_equipment_matrix(mapping: Dict[str, Any]) -> None:
+    """
+    장비 매핑을 장비×feature 0/1 행렬로 컴파일 (Cold start 시 1회)
+    - 장비 점수 = equipment_matrix @ |attribution| (단일 행렬곱, 샘플/배치 공통)
+    """
+    global equipment_matrix, equipment_groups, feature_equipment
+    
+    groups = []
+    rows, cols = [], []
+    feature_index = {name: i for i, name in enumerate(FEATURE_NAMES)}
+    for equipment in (mapping or {}).get('equipment_list', []):
+        related = [name for name in equipment.get('related_features', []) if name in feature_index]
+        if not related:
+            continue
+        rows.extend([len(groups)] * len(related))
+        cols.extend(feature_index[name] for name in related)
+        groups.append({
+            'id': equipment.get('id'),
+            'name': equipment.get('name'),
+            'name_en': equipment.get('name_en'),
+            'description': equipment.get('description'),
+            'features': related
+        })
+    
+    shape = (len(groups), len(FEATURE_NAMES))
+    if SCIPY_AVAILABLE:
+        from scipy.sparse import csr_matrix
+        matrix = csr_matrix((np.ones(len(rows)), (rows, cols)), shape=shape)
+    else:
+        matrix = np.zeros(shape)
+        matrix[rows, cols] = 1.0
+    
+    equipment_matrix = matrix
+    equipment_groups = groups
+    feature_equipment = {}
+    for group in groups:
+        for name in group['features']:
+            feature_equipment.setdefault(name, []).append({'id': group['id'], 'name': group['name']})
+    print(f"✅ Equipment matrix compiled ({shape[0]} equipment x {shape[1]} features, {len(rows)} links)")
+
+
+def rollup_equipment(feature_scores: np.ndarray) -> np.ndarray:
+    """
+    Feature 점수 (n, 30) -> 장비 점수 (n, 장비 수)
+    """
+    if equipment_matrix is None or not equipment_groups:
+        return np.zeros((feature_scores.shape[0], 0))
+    return np.asarray((equipment_matrix @ feature_scores.T).T)
+
+
+def rank_equipment(equipment_scores: np.ndarray, total: float = None) -> List[Dict[str, Any]]:
+    """
+    단일 샘플(또는 평균)의 장비 점수를 내림차순 ranking으로 변환
+    
+    Args:
+        equipment_scores: (장비 수,)
+        total: share 계산 기준 (feature 점수 합, 없으면 share 생략)
+    """
+    ranking = []
+    for group, score in zip(equipment_groups, equipment_scores):
+        entry = {'id': group['id'], 'name': group['name'], 'score': float(score), 'features': group['features']}
+        if total:
+            entry['share'] = float(score) / total
+        ranking.append(entry)
+    return sorted(ranking, key=lambda g: g['score'], reverse=True)
+
+
+def feature_importance_ranking(feature_importance: Dict[str, float]) -> List[Dict[str, Any]]:
+    """
+    Feature 중요도 dict (원본 30개 기준)의 장비 단위 ranking
+    """
+    scores = np.array([[feature_importance.get(name, 0.0) for name in FEATURE_NAMES]])
+    return rank_equipment(rollup_equipment(scores)[0], float(scores.sum()))
+
+
+def describe_feature(feat_name: str) -> Dict[str, Any]:
+    """
+    Feature의 장비/센서 설명 payload (importance 제외, 모델 버전 내에서 불변)
+    """
+    desc = describe_equipment(feat_name)
+    if parameter_index is not None:
+        spec_ranges = parameter_index.get(feat_name, ('guideline', 'normal'))
+        if spec_ranges:
+            desc['spec_ranges'] = spec_ranges
+    return desc
+
+
+def describe_equipment(feat_name: str) -> Dict[str, Any]:
+    """
+    Feature의 장비/센서 설명 (EQUIPMENT_DESCRIPTIONS / 장비 매핑)
+    """
+    groups = feature_equipment.get(feat_name, [])
+    if feat_name in EQUIPMENT_DESCRIPTIONS:
+        desc = EQUIPMENT_DESCRIPTIONS[feat_name].copy()
+        desc['feature_name'] = feat_name
+        desc['equipment_groups'] = groups
+        return desc
+    
+    if feat_name in FEATURE_NAMES:
+        # 상세 설명이 없는 원본 feature는 장비 매핑 정보로 설명
+        group_meta = [g for g in equipment_groups if feat_name in g['features']]
+        return {
+            'feature_name': feat_name,
+            'name': feat_name,
+            'equipment': ', '.join(g['name'] for g in group_meta) or '공정 파라미터',
+            'description': ' / '.join(g['description'] for g in group_meta if g.get('description')),
+            'equipment_groups': groups
+        }
+    
+    # Latent feature인 경우
+    return {
+        'feature_name': feat_name,
+        'name': feat_name,
+        'equipment': 'Latent Feature',
+        'description': 'AutoEncoder가 학습한 잠재 특성입니다.'
+    }
+
+
+def build_global_cache() -> Dict[str, Any]:
+    """
+    입력과 무관한 global importance 응답 요소를 모델 버전별로 사전 계산
+    - 정렬된 feature_importances_, 장비 설명 payload, top-N slice (요청 시 memoize)
+    """
+    # GradientBoostingClassifier의 feature_importances_ 사용
+    # 이는 각 feature가 트리 분할에 기여한 정도를 나타냄
+    # Latent feature 제외 (원본 30개 feature만 사용)
+    original_feature_importance = gb_model.feature_importances_[:len(FEATURE_NAMES)]
+    
+    importance_dict = {
+        name: float(imp) 
+        for name, imp in zip(FEATURE_NAMES, original_feature_importance)
+    }
+    
+    cache = {
+        'feature_importance': importance_dict,
+        'sorted_importance': sorted(importance_dict.items(), key=lambda x: x[1], reverse=True),
+        'descriptions': {name: describe_feature(name) for name in FEATURE_NAMES},
+        'top_n': {}
+    }
+    global_cache[MODEL_VERSION] = cache
+    print(f"✅ Global importance cache built (model_version: {MODEL_VERSION})")
+    return cache
+
+
+def get_global_cache() -> Dict[str, Any]:
+    """
+    현재 모델 버전의 global importance cache 반환 (없으면 생성)
+    """
+    load_models()
+    cache = global_cache.get(MODEL_VERSION)
+    if cache is None:
+        cache = build_global_cache()
+    return cache
+
+
+def get_global_top_n(top_n: int) -> Tuple[List[Tuple[str, float]], List[Dict], bool]:
+    """
+    Global importance 상위 N개와 장비 설명 (top_n별 memoize)
+    
+    Returns:
+        (top_features, equipment_descriptions, cache_hit)
+    """
+    cache = get_global_cache()
+    cached = cache['top_n'].get(top_n)
+    if cached is not None:
+        return cached[0], cached[1], True
+    
+    top_features = cache['sorted_importance'][:top_n]
+    descriptions = get_equipment_descriptions(top_features)
+    cache['top_n'][top_n] = (top_features, descriptions)
+    return top_features, descriptions, False
+
+
+def calculate_shap_values(features: np.ndarray, latent: np.ndarray = None,
+                          attribution_mode: str = 'global',
+                          prediction_proba: np.ndarray = None) -> Dict[str, Any]:
+    """
+    Feature importance 계산
+    
+    Args:
+        features: 30D features (scaled), (n, 30)
+        latent: 12D latent features (optional), (n, 12) - 'shap' 모드에서 없으면 0으로 채움 (latent_imputed=True)
+        attribution_mode: 'global' (모델의 feature_importances_) 또는
+                          'shap' (샘플별 SHAP attribution, 배치 지원)
+        prediction_proba: T1에서 이미 계산한 예측 확률 (n, 2) - 있으면 재예측 생략
+    
+    Returns:
+        Feature importance analysis results (첫 번째 샘플 기준, 'shap' 모드에서 n > 1이면 rows 포함)
+        attribution_mode_used: 실제 사용한 방식 ('shap' 실패 시 'global')
     """
     load_models()
     
+    # 42D 모델의 SHAP explainer는 30D 입력을 받지 못하므로 batch 경로와 같이 latent를 0으로 채움
+    latent_imputed = False
+    n_latent = gb_model.n_features_in_ - features.shape[1]
+    if attribution_mode == 'shap' and latent is None and n_latent > 0:
+        latent = np.zeros((features.shape[0], n_latent))
+        latent_imputed = True
+    
     # Debug logging
     print(f"DEBUG: features shape: {features.shape}")
     print(f"DEBUG: latent is None: {latent is None}")
@@ -216,146 +560,616 @@ def calculate_shap_values(features: np.ndarray, latent: np.ndarray = None) -> Di
     # Feature 결합 (30D + 12D = 42D)
     if latent is not None:
         combined_features = np.concatenate([features, latent], axis=1)
-        all_feature_names = FEATURE_NAMES + [f'Latent_{i+1}' for i in range(latent.shape[1])]
         print(f"DEBUG: combined_features shape: {combined_features.shape}")
     else:
         combined_features = features
-        all_feature_names = FEATURE_NAMES
         print(f"DEBUG: No latent features, using only original features")
     
-    # XGBoostingClassifier의 feature_importances_ 사용
-    # 이는 각 feature가 트리 분할에 기여한 정도를 나타냄
-    feature_importance = gb_model.feature_importances_
+    proba_source = 'request' if prediction_proba is not None else 'model'
     
-    # Latent feature 제외 (원본 28개 feature만 사용)
-    original_feature_importance = feature_importance[:len(FEATURE_NAMES)]
+    if attribution_mode == 'shap':
+        try:
+            attribution_start = time.time()
+            phi, base_value = compute_attributions(combined_features)
+            attribution_time = (time.time() - attribution_start) * 1000
+            
+            # log-loss GB는 base_value + sum(phi) = log-odds 이므로 재예측 없이 확률 계산
+            if prediction_proba is None and getattr(gb_model, 'loss', 'log_loss') in ('log_loss', 'deviance'):
+                defect_proba = 1.0 / (1.0 + np.exp(-(base_value + phi.sum(axis=1))))
+                prediction_proba = np.column_stack([1.0 - defect_proba, defect_proba])
+                proba_source = 'attribution'
+            elif prediction_proba is None:
+                prediction_proba = gb_model.predict_proba(combined_features)
+            
+            rows = [summarize_attributions(phi_row) for phi_row in phi]
+            result = dict(rows[0])
+            result.update({
+                'feature_values': combined_features[0].tolist(),
+                'feature_names': FEATURE_NAMES,
+                'prediction_proba': prediction_proba[0].tolist(),
+                'prediction_proba_source': proba_source,
+                'base_value': base_value,
+                'attribution_time_ms': round(attribution_time, 2),
+                'from_cache': False,
+                'attribution_mode_used': 'shap',
+                'latent_imputed': latent_imputed,
+                'method': f'{ATTRIBUTION_METHODS[ATTRIBUTION_BACKEND]} (per-sample, defect log-odds)'
+            })
+            if len(rows) > 1:
+                result['rows'] = [
+                    {
+                        'feature_contributions': row['feature_contributions'],
+                        'latent_total': row['latent_total'],
+                        'prediction_proba': proba.tolist()
+                    }
+                    for row, proba in zip(rows, prediction_proba)
+                ]
+            return result
+        except Exception as e:
+            print(f"⚠️ SHAP attribution failed, falling back to global importance: {e}")
     
-    # 정렬
-    importance_dict = {
-        name: float(imp) 
-        for name, imp in zip(FEATURE_NAMES, original_feature_importance)
-    }
-    sorted_importance = sorted(importance_dict.items(), key=lambda x: x[1], reverse=True)
+    # Global importance는 모델 버전별 cache에서 제공
+    cache = get_global_cache()
     
-    # 예측 수행
-    prediction_proba = gb_model.predict_proba(combined_features)[0]
+    # 예측 수행 (T1 결과가 전달되지 않은 경우만)
+    if prediction_proba is None:
+        prediction_proba = gb_model.predict_proba(combined_features)
     
     return {
         'feature_values': combined_features[0].tolist(),
-        'feature_importance': importance_dict,
-        'sorted_importance': sorted_importance,
+        'feature_importance': cache['feature_importance'],
+        'sorted_importance': cache['sorted_importance'],
         'feature_names': FEATURE_NAMES,  # Latent 제외
-        'prediction_proba': prediction_proba.tolist(),
+        'prediction_proba': prediction_proba[0].tolist(),
+        'prediction_proba_source': proba_source,
+        'from_cache': True,
+        'attribution_mode_used': 'global',
+        'latent_imputed': latent_imputed,
         'method': 'GradientBoosting feature_importances_ (original features only)'
     }
 
 
-def generate_shap_chart(feature_importance: Dict[str, float], 
-                       feature_names: List[str], top_n: int = 20) -> str:
+def parse_feature_matrix(rows: List[Any]) -> np.ndarray:
+    """
+    배치 입력 행렬 파싱 - 각 행은 30D list 또는 {feature_name: value} dict
+    
+    Returns:
+        (n, 30) raw features
+    """
+    if not rows:
+        raise ValueError('feature_matrix is empty')
+    
+    matrix = np.array([
+        [row.get(name, 0) for name in FEATURE_NAMES] if isinstance(row, dict) else row
+        for row in rows
+    ], dtype=np.float64)
+    if matrix.ndim != 2 or matrix.shape[1] != len(FEATURE_NAMES):
+        raise ValueError(f"feature_matrix rows must have {len(FEATURE_NAMES)} features, got shape {matrix.shape}")
+    return matrix
+
+
+def calculate_batch_attributions(features: np.ndarray, latent: np.ndarray = None,
+                                 top_n: int = 10, return_matrix: bool = False) -> Dict[str, Any]:
     """
-    Feature importance chart 생성 및 S3 업로드 (matplotlib 사용)
+    배치(예: 한 교대조의 shot 전체) attribution을 한 번의 벡터 연산으로 계산하고 집계
+    
+    Args:
+        features: (n, 30) scaled features
+        latent: (n, 12) latent features (없으면 0으로 채우고 latent_imputed=True)
+        top_n: 집계별 상위 feature 수
+        return_matrix: True이면 샘플별 attribution 행렬 (n, 42) 포함
     
     Returns:
-        S3 key or None if matplotlib not available
+        feature / 예측 클래스 / 장비 그룹별 평균 |attribution| 집계 (불량 클래스 log-odds 기준)
+    """
+    load_models()
+    
+    n_original = len(FEATURE_NAMES)
+    latent_imputed = latent is None
+    if latent_imputed:
+        latent = np.zeros((features.shape[0], gb_model.n_features_in_ - n_original))
+    elif latent.shape[0] != features.shape[0]:
+        raise ValueError(f"latent_matrix has {latent.shape[0]} rows, feature_matrix has {features.shape[0]}")
+    combined_features = np.concatenate([features, latent], axis=1)
+    
+    attribution_start = time.time()
+    phi, base_value = compute_attributions(combined_features)
+    attribution_time = (time.time() - attribution_start) * 1000
+    
+    # log-loss GB는 base_value + sum(phi) = log-odds 이므로 재예측 없이 확률 계산
+    if getattr(gb_model, 'loss', 'log_loss') in ('log_loss', 'deviance'):
+        defect_proba = 1.0 / (1.0 + np.exp(-(base_value + phi.sum(axis=1))))
+    else:
+        defect_proba = gb_model.predict_proba(combined_features)[:, 1]
+    is_defect = defect_proba >= 0.5
+    
+    abs_phi = np.abs(phi)
+    # 장비 점수: 샘플별 |attribution| (n, 30) -> (n, 장비 수) 단일 행렬곱
+    equipment_scores = rollup_equipment(abs_phi[:, :n_original])
+    
+    def summarize(mask: np.ndarray) -> Dict[str, Any]:
+        mean_abs = abs_phi[mask].mean(axis=0)
+        mean_abs_dict = {name: float(v) for name, v in zip(FEATURE_NAMES, mean_abs[:n_original])}
+        return {
+            'count': int(mask.sum()),
+            'mean_abs_attribution': mean_abs_dict,
+            'top_features': sorted(mean_abs_dict.items(), key=lambda x: x[1], reverse=True)[:top_n],
+            'mean_contribution': {
+                name: float(v) for name, v in zip(FEATURE_NAMES, phi[mask, :n_original].mean(axis=0))
+            },
+            'latent_mean_abs': float(mean_abs[n_original:].sum()),
+            'equipment_ranking': rank_equipment(equipment_scores[mask].mean(axis=0), float(mean_abs[:n_original].sum()))
+        }
+    
+    overall = summarize(np.ones(len(phi), dtype=bool))
+    by_equipment = overall.pop('equipment_ranking')
+    result = {
+        'n_rows': int(len(phi)),
+        'defect_rate': float(is_defect.mean()),
+        'overall': overall,
+        'by_class': {
+            label: summarize(mask)
+            for label, mask in (('normal', ~is_defect), ('defect', is_defect))
+            if mask.any()
+        },
+        'by_equipment': by_equipment,
+        'latent_imputed': latent_imputed,
+        'base_value': base_value,
+        'attribution_time_ms': round(attribution_time, 2),
+        'method': f'{ATTRIBUTION_METHODS[ATTRIBUTION_BACKEND]} (batch, defect log-odds)'
+    }
+    
+    if return_matrix:
+        result['attributions'] = phi.tolist()
+        result['feature_names'] = FEATURE_NAMES + [f'Latent_{i+1}' for i in range(latent.shape[1])]
+        result['defect_proba'] = defect_proba.tolist()
+    
+    return result
+
+
+def load_partial_dependence() -> Dict[str, Any]:
+    """
+    현재 모델 버전의 PD/ICE artifact 로드 (optional, 컨테이너당 1회, 실패 시 재시도 안 함)
     """
-    if not MATPLOTLIB_AVAILABLE:
+    global partial_dependence, partial_dependence_error
+    
+    if partial_dependence is not None or partial_dependence_error is not None:
+        return partial_dependence
+    
+    key = PARTIAL_DEPENDENCE_KEY.format(model_version=MODEL_VERSION)
+    try:
+        print(f"Loading partial dependence tables from s3://{BUCKET_NAME}/{key}")
+        obj = s3.get_object(Bucket=BUCKET_NAME, Key=key)
+        partial_dependence = json.loads(obj['Body'].read())
+        print(f"✅ Partial dependence loaded ({len(partial_dependence['features'])} features)")
+    except Exception as e:
+        print(f"⚠️ Partial dependence not available: {e}")
+        partial_dependence_error = str(e)
+    
+    return partial_dependence
+
+
+def get_partial_dependence(feature_names: List[str] = None, include_ice: bool = False) -> Dict[str, Any]:
+    """
+    Feature별 PD (및 ICE) 곡선 조회 - 사전 계산된 테이블에서 lookup만 수행
+    """
+    artifact = load_partial_dependence()
+    if artifact is None:
+        return {'available': False, 'model_version': MODEL_VERSION, 'error': partial_dependence_error}
+    
+    tables = artifact['features']
+    selected = feature_names or list(tables.keys())
+    curves = {}
+    for name in selected:
+        if name not in tables:
+            continue
+        table = tables[name]
+        curve = {'grid': table['grid'], 'pd': table['pd'], 'pd_range': table['pd_range']}
+        if include_ice:
+            curve['ice'] = table['ice']
+        curves[name] = curve
+    
+    return {
+        'available': True,
+        'model_version': artifact.get('model_version', MODEL_VERSION),
+        'target': artifact.get('target', 'defect_probability'),
+        'n_background': artifact.get('n_background'),
+        'curves': curves,
+        'missing_features': [name for name in selected if name not in tables]
+    }
+
+
+def load_matplotlib():
+    """
+    matplotlib 지연 import (PNG export 요청 시 1회)
+    """
+    global plt
+    if plt is None and MATPLOTLIB_AVAILABLE:
+        import matplotlib
+        matplotlib.use('Agg')  # Non-interactive backend
+        import matplotlib.pyplot as pyplot
+        plt = pyplot
+    return plt
+
+
+def build_chart_data(sorted_importance: List[Tuple[str, float]], top_n: int = 20) -> Dict[str, Any]:
+    """
+    클라이언트 측 렌더링용 horizontal bar 데이터 (frontend/chat.js)
+    """
+    top = sorted_importance[:top_n]
+    return {
+        'title': f'Top {len(top)} Feature Importance',
+        'labels': [name for name, _ in top],
+        'values': [round(float(value), 6) for _, value in top]
+    }
+
+
+def render_importance_svg(sorted_importance: List[Tuple[str, float]], top_n: int = 20) -> str:
+    """
+    matplotlib 없이 horizontal bar chart를 compact SVG 문자열로 생성
+    """
+    top = sorted_importance[:top_n]
+    row_height, label_width, bar_width, top_margin = 22, 200, 360, 30
+    width = label_width + bar_width + 70
+    height = top_margin + row_height * len(top) + 10
+    max_value = max([abs(value) for _, value in top] + [1e-12])
+    
+    parts = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" '
+        f'viewBox="0 0 {width} {height}" font-family="sans-serif" font-size="11">',
+        f'<text x="{width / 2:.0f}" y="18" text-anchor="middle" font-size="13" font-weight="bold">'
+        f'Top {len(top)} Feature Importance</text>'
+    ]
+    for i, (name, value) in enumerate(top):
+        y = top_margin + i * row_height
+        w = bar_width * abs(value) / max_value
+        parts.append(
+            f'<text x="{label_width - 6}" y="{y + 15}" text-anchor="end">{html.escape(name)}</text>'
+            f'<rect x="{label_width}" y="{y + 3}" width="{w:.1f}" height="{row_height - 6}" '
+            f'fill="#4CAF50" stroke="#000" stroke-width="0.5"/>'
+            f'<text x="{label_width + w + 4:.1f}" y="{y + 15}">{value:.4f}</text>'
+        )
+    parts.append('</svg>')
+    return ''.join(parts)
+
+
+def chart_cache_id(sorted_features: List[Tuple[str, float]], top_n: int) -> str:
+    """
+    (model version, top_n, importance 값) 해시 - 차트 id 겸 S3 key의 content address
+    """
+    payload = json.dumps(
+        [MODEL_VERSION, top_n, [[name, f'{value:.6f}'] for name, value in sorted_features]],
+        ensure_ascii=False
+    )
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:24]
+
+
+def chart_s3_key(chart_id: str) -> str:
+    return f'analysis/importance_chart_{chart_id}.png'
+
+
+def chart_job_key(chart_id: str) -> str:
+    return f'analysis/importance_chart_{chart_id}.job.json'
+
+
+def chart_cache_key(sorted_features: List[Tuple[str, float]], top_n: int) -> str:
+    """
+    content-addressed S3 key
+    """
+    return chart_s3_key(chart_cache_id(sorted_features, top_n))
+
+
+def chart_exists(s3_key: str) -> bool:
+    """
+    차트가 이미 업로드되어 있는지 확인 (컨테이너 내 기록 → S3 head_object 순)
+    """
+    if s3_key in uploaded_chart_keys:
+        return True
+    try:
+        s3.head_object(Bucket=BUCKET_NAME, Key=s3_key)
+        uploaded_chart_keys.add(s3_key)
+        return True
+    except ClientError as e:
+        if e.response.get('Error', {}).get('Code') in ('404', 'NoSuchKey', 'NotFound'):
+            return False
+        raise
+
+
+def render_and_upload_chart(sorted_features: List[Tuple[str, float]], top_n: int, s3_key: str) -> bool:
+    """
+    matplotlib PNG를 메모리 버퍼에 렌더링하여 S3 업로드
+    
+    Returns:
+        업로드 여부 (matplotlib 미설치 시 False)
+    """
+    plt = load_matplotlib()
+    if plt is None:
         print("matplotlib not available - skipping chart generation")
-        return None
+        return False
+    
+    top_feature_names = [f[0] for f in sorted_features]
+    top_importance_values = [f[1] for f in sorted_features]
+    
+    # Matplotlib 차트 생성
+    fig, ax = plt.subplots(figsize=(12, 8))
+    
+    y_pos = np.arange(len(top_feature_names))
+    colors = ['#4CAF50' for _ in top_importance_values]  # 녹색
+    
+    ax.barh(y_pos, top_importance_values, color=colors, edgecolor='black', linewidth=0.5)
+    
+    ax.set_yticks(y_pos)
+    ax.set_yticklabels(top_feature_names, fontsize=10)
+    ax.set_xlabel('Feature Importance', fontsize=12)
+    ax.set_title(f'Top {top_n} Feature Importance (GradientBoosting)', fontsize=14, fontweight='bold')
+    ax.grid(axis='x', alpha=0.3)
+    
+    # 값 표시
+    for i, v in enumerate(top_importance_values):
+        ax.text(v, i, f' {v:.4f}', va='center', fontsize=9)
+    
+    plt.tight_layout()
+    
+    # PNG로 저장 (메모리 버퍼)
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format='png', dpi=150, bbox_inches='tight')
+    plt.close(fig)
+    
+    # S3 업로드
+    s3.put_object(
+        Bucket=BUCKET_NAME,
+        Key=s3_key,
+        Body=buffer.getvalue(),
+        ContentType='image/png'
+    )
+    uploaded_chart_keys.add(s3_key)
+    
+    print(f"Chart uploaded to S3: {s3_key}")
+    return True
+
+
+def generate_shap_chart(feature_importance: Dict[str, float], 
+                       feature_names: List[str], top_n: int = 20) -> Tuple[str, bool]:
+    """
+    고해상도 Feature importance chart 생성 및 S3 업로드 (matplotlib 사용, chart_format=png)
+    - 같은 (model version, top_n, 값)의 차트가 이미 있으면 렌더링/업로드 생략
+    - 공유 임시 파일 대신 메모리 버퍼에 렌더링
+    
+    Returns:
+        (S3 key, 기존 차트 재사용 여부) or (None, False) if matplotlib not available
+    """
+    # Top N features만 선택
+    sorted_features = sorted(feature_importance.items(), key=lambda x: x[1], reverse=True)[:top_n]
+    s3_key = chart_cache_key(sorted_features, top_n)
     
     try:
-        # Top N features만 선택
-        sorted_features = sorted(feature_importance.items(), key=lambda x: x[1], reverse=True)[:top_n]
-        top_feature_names = [f[0] for f in sorted_features]
-        top_importance_values = [f[1] for f in sorted_features]
-        
-        # Matplotlib 차트 생성
-        fig, ax = plt.subplots(figsize=(12, 8))
-        
-        y_pos = np.arange(len(top_feature_names))
-        colors = ['#4CAF50' for _ in top_importance_values]  # 녹색
-        
-        ax.barh(y_pos, top_importance_values, color=colors, edgecolor='black', linewidth=0.5)
-        
-        ax.set_yticks(y_pos)
-        ax.set_yticklabels(top_feature_names, fontsize=10)
-        ax.set_xlabel('Feature Importance', fontsize=12)
-        ax.set_title(f'Top {top_n} Feature Importance (GradientBoosting)', fontsize=14, fontweight='bold')
-        ax.grid(axis='x', alpha=0.3)
-        
-        # 값 표시
-        for i, v in enumerate(top_importance_values):
-            ax.text(v, i, f' {v:.4f}', va='center', fontsize=9)
-        
-        plt.tight_layout()
-        
-        # PNG로 저장
-        img_path = '/tmp/importance_chart.png'
-        plt.savefig(img_path, dpi=150, bbox_inches='tight')
-        plt.close()
-        
-        # S3 업로드
-        timestamp = datetime.utcnow().strftime('%Y%m%d_%H%M%S')
-        s3_key = f'analysis/importance_chart_{timestamp}.png'
-        
-        with open(img_path, 'rb') as f:
-            s3.put_object(
-                Bucket=BUCKET_NAME,
-                Key=s3_key,
-                Body=f,
-                ContentType='image/png'
-            )
+        if chart_exists(s3_key):
+            print(f"Chart cache hit: {s3_key}")
+            return s3_key, True
         
-        print(f"Chart uploaded to S3: {s3_key}")
-        return s3_key
+        if not render_and_upload_chart(sorted_features, top_n, s3_key):
+            return None, False
+        return s3_key, False
     
     except Exception as e:
         print(f"Chart generation error: {e}")
         import traceback
         traceback.print_exc()
-        return None
+        return None, False
+
+
+def record_chart_job(chart_id: str, job: Dict[str, Any]) -> None:
+    """
+    작업 상태를 컨테이너 메모리와 S3 marker에 기록 (다른 컨테이너의 chart_status 조회용)
+    """
+    chart_jobs[chart_id] = job
+    try:
+        s3.put_object(
+            Bucket=BUCKET_NAME,
+            Key=chart_job_key(chart_id),
+            Body=json.dumps(job).encode('utf-8'),
+            ContentType='application/json'
+        )
+    except Exception as e:
+        print(f"Chart job marker write failed ({chart_id}): {e}")
+
+
+def load_chart_job(chart_id: str) -> Dict[str, Any]:
+    """
+    작업 상태 조회 (컨테이너 메모리 → S3 marker 순, 시작된 적 없는 작업이면 None)
+    """
+    if chart_id in chart_jobs:
+        return chart_jobs[chart_id]
+    try:
+        obj = s3.get_object(Bucket=BUCKET_NAME, Key=chart_job_key(chart_id))
+        return json.loads(obj['Body'].read())
+    except ClientError as e:
+        if e.response.get('Error', {}).get('Code') in ('404', 'NoSuchKey', 'NotFound'):
+            return None
+        raise
+
+
+def chart_job_expired(job: Dict[str, Any]) -> bool:
+    return job.get('state') == 'pending' and time.time() - job.get('started_at', 0) > CHART_JOB_TIMEOUT
+
+
+def run_chart_job(chart_id: str, sorted_features: List[Tuple[str, float]], top_n: int) -> None:
+    """
+    백그라운드 차트 렌더링/업로드 (비동기 Lambda 호출 또는 로컬 개발용 thread에서 실행)
+    """
+    s3_key = chart_s3_key(chart_id)
+    try:
+        if chart_exists(s3_key) or render_and_upload_chart(sorted_features, top_n, s3_key):
+            chart_jobs[chart_id] = {'state': 'ready'}
+        else:
+            record_chart_job(chart_id, {'state': 'failed', 'error': 'matplotlib not available'})
+    except Exception as e:
+        print(f"Chart job error ({chart_id}): {e}")
+        record_chart_job(chart_id, {'state': 'failed', 'error': str(e)})
+
+
+def parse_render_request(body: Dict) -> Tuple[str, List[Tuple[str, float]], int]:
+    """
+    render_chart 요청 검증 - chart_id는 (sorted_features, top_n)의 content address와 일치해야 함
+    
+    Raises:
+        KeyError / TypeError / ValueError: 필수 값 누락 또는 형식 오류
+    """
+    chart_id = body['chart_id']
+    sorted_features = [(str(name), float(value)) for name, value in body['sorted_features']]
+    if not sorted_features:
+        raise ValueError('sorted_features is empty')
+    top_n = int(body.get('top_n', len(sorted_features)))
+    if chart_id != chart_cache_id(sorted_features, top_n):
+        raise ValueError('chart_id does not match sorted_features / top_n')
+    return chart_id, sorted_features, top_n
+
+
+def start_chart_job(feature_importance: Dict[str, float], top_n: int) -> Dict[str, Any]:
+    """
+    차트 생성을 critical path 밖으로 분리
+    - 이미 존재하는 차트면 즉시 ready + URL 반환
+    - CHART_WORKER_FUNCTION이 설정되면 비동기 Lambda 호출 (InvocationType=Event)
+    - 그 외에는 로컬 background thread로 실행 (개발/테스트용 stand-in - Lambda에서는 invocation 반환 후
+      실행 환경이 동결되어 완료되지 않을 수 있음, 이 경우 CHART_JOB_TIMEOUT 후 failed로 보고)
+    
+    Returns:
+        {"chart_id": ..., "chart_state": "pending" | "ready", "chart_url": ...}
+    """
+    sorted_features = sorted(feature_importance.items(), key=lambda x: x[1], reverse=True)[:top_n]
+    chart_id = chart_cache_id(sorted_features, top_n)
+    
+    try:
+        if chart_exists(chart_s3_key(chart_id)):
+            chart_jobs[chart_id] = {'state': 'ready'}
+            return get_chart_status(chart_id)
+    except Exception as e:
+        print(f"Chart existence check failed: {e}")
+    
+    job = chart_jobs.get(chart_id, {})
+    if job.get('state') == 'pending' and not chart_job_expired(job):
+        return {'chart_id': chart_id, 'chart_state': 'pending', 'chart_url': None}
+    
+    record_chart_job(chart_id, {'state': 'pending', 'started_at': time.time()})
+    if CHART_WORKER_FUNCTION:
+        try:
+            lambda_client.invoke(
+                FunctionName=CHART_WORKER_FUNCTION,
+                InvocationType='Event',
+                Payload=json.dumps({
+                    'action': 'render_chart',
+                    'chart_id': chart_id,
+                    'sorted_features': sorted_features,
+                    'top_n': top_n
+                }).encode('utf-8')
+            )
+        except Exception as e:
+            print(f"Async chart invocation failed: {e}")
+            record_chart_job(chart_id, {'state': 'failed', 'error': str(e)})
+    else:
+        if os.environ.get('AWS_LAMBDA_FUNCTION_NAME'):
+            print("WARNING: CHART_WORKER_FUNCTION not set - chart thread may be frozen after this invocation returns")
+        threading.Thread(
+            target=run_chart_job, args=(chart_id, sorted_features, top_n), daemon=True
+        ).start()
+    
+    return {'chart_id': chart_id, 'chart_state': chart_jobs[chart_id]['state'], 'chart_url': None}
+
+
+def get_chart_status(chart_id: str) -> Dict[str, Any]:
+    """
+    차트 상태 조회 (다른 컨테이너에서 생성된 경우도 S3 차트 / 작업 marker로 확인)
+    - 시작된 적 없는 chart_id (오타, 만료된 id 등)는 'unknown'
+    - CHART_JOB_TIMEOUT이 지나도록 pending인 작업은 'failed'
+    """
+    s3_key = chart_s3_key(chart_id)
+    job = chart_jobs.get(chart_id, {})
+    if job.get('state') == 'ready' or chart_exists(s3_key):
+        job = chart_jobs[chart_id] = {'state': 'ready'}
+    else:
+        job = load_chart_job(chart_id)
+        if job is None:
+            return {'chart_id': chart_id, 'chart_state': 'unknown', 'chart_url': None}
+        if chart_job_expired(job):
+            job = chart_jobs[chart_id] = {'state': 'failed', 'error': 'chart job timed out'}
+    state = job['state']
+    
+    status = {
+        'chart_id': chart_id,
+        'chart_state': state,
+        'chart_url': generate_presigned_url(s3_key) if state == 'ready' else None
+    }
+    if job.get('error'):
+        status['error'] = job['error']
+    return status
 
 
 def get_equipment_descriptions(top_features: List[Tuple[str, float]]) -> List[Dict]:
     """
-    상위 feature들에 대한 장비/센서 설명 추가
+    상위 feature들에 대한 장비/센서 설명 추가 (설명 payload는 global cache 재사용)
     """
+    payloads = global_cache.get(MODEL_VERSION, {}).get('descriptions', {})
     descriptions = []
     
     for feat_name, importance in top_features:
-        if feat_name in EQUIPMENT_DESCRIPTIONS:
-            desc = EQUIPMENT_DESCRIPTIONS[feat_name].copy()
-            desc['feature_name'] = feat_name
-            desc['importance'] = importance
-            descriptions.append(desc)
-        else:
-            # Latent feature인 경우
-            descriptions.append({
-                'feature_name': feat_name,
-                'name': feat_name,
-                'equipment': 'Latent Feature',
-                'description': 'AutoEncoder가 학습한 잠재 특성입니다.',
-                'importance': importance
-            })
+        desc = dict(payloads.get(feat_name) or describe_feature(feat_name))
+        desc['importance'] = importance
+        descriptions.append(desc)
     
     return descriptions
 
 
 def generate_presigned_url(key: str, expiration: int = PRESIGNED_URL_EXPIRATION) -> str:
     """
-    S3 객체에 대한 presigned URL 생성
+    S3 객체에 대한 presigned URL 생성 (만료 직전까지 컨테이너 내 cache 재사용)
     """
+    now = time.time()
+    cached = presigned_url_cache.get(key)
+    if cached and cached[1] - now > PRESIGNED_URL_REFRESH_MARGIN:
+        return cached[0]
+    
     try:
         url = s3.generate_presigned_url(
             'get_object',
             Params={'Bucket': BUCKET_NAME, 'Key': key},
             ExpiresIn=expiration
         )
+        presigned_url_cache[key] = (url, now + expiration)
         return url
     except Exception as e:
         print(f"Error generating presigned URL: {e}")
         return None
 
 
+def parse_prediction_proba(body: Dict) -> np.ndarray:
+    """
+    T1 예측 결과가 함께 전달된 경우 확률 추출 (재예측 생략용)
+    - "prediction_proba": [p_normal, p_defect]
+    - "prediction": T1 응답의 prediction (class_probabilities 포함)
+    """
+    proba = body.get('prediction_proba')
+    if proba is None and isinstance(body.get('prediction'), dict):
+        class_probabilities = body['prediction'].get('class_probabilities') or {}
+        if 'normal' in class_probabilities and 'defect' in class_probabilities:
+            proba = [class_probabilities['normal'], class_probabilities['defect']]
+    
+    if proba is None:
+        return None
+    return np.atleast_2d(np.asarray(proba, dtype=np.float64))
+
+
+def response(status_code: int, body: Dict) -> Dict:
+    """Lambda Function URL 응답 포맷"""
+    return {
+        'statusCode': status_code,
+        'headers': {
+            'Content-Type': 'application/json',
+            'Access-Control-Allow-Origin': '*'
+        },
+        'body': json.dumps(body)
+    }
+
+
 def lambda_handler(event, context):
     """
     Lambda 핸들러
@@ -365,7 +1179,11 @@ def lambda_handler(event, context):
             "features": {...},  # optional: 30D features
             "latent_features": [...],  # optional: 12D latent
             "top_n": 10,
-            "generate_chart": true
+            "generate_chart": true,
+            "attribution_mode": "global",  # optional: "global" | "shap" (샘플별 attribution)
+            "chart_format": "png",  # optional: "png" (기본, matplotlib → chart_url) | "svg" (인라인 SVG) | "data" (클라이언트 렌더링)
+            "chart_mode": "sync",  # optional (png): "sync" | "async" (chart_id 반환, 백그라운드 렌더링)
+            "prediction_proba": [0.2, 0.8]  # optional: T1 결과 (있으면 재예측 생략)
         }
     
     Output:
@@ -376,13 +1194,47 @@ def lambda_handler(event, context):
                 "feature_importance": {...},
                 "top_features": [...],
                 "equipment_descriptions": [...],
-                "chart_url": "...",
+                "equipment_ranking": [{"id": "melting_furnace", "name": "용탕로", "score": ..., "share": ...}, ...],
+                "chart_url": "...",  # chart_format=png
+                "chart_id": "...", "chart_state": "pending",  # chart_mode=async
+                "chart_svg": "<svg ...>",  # chart_format=svg
+                "chart_data": {...},  # chart_format=data
                 "prediction_proba": [0.2, 0.8],
                 "processing_time_ms": 123.45,
                 "timestamp": "2024-01-01T00:00:00",
-                "method": "GradientBoosting feature_importances_"
+                "method": "GradientBoosting feature_importances_",
+                "attribution_mode_used": "global",  # 실제 사용한 방식 (shap 실패 시 global)
+                "latent_imputed": false,  # shap 모드에서 latent_features가 없어 0으로 채운 경우 true
+                # attribution_mode="shap"인 경우 추가
+                "feature_contributions": {...},  # 부호 포함 기여도 (defect log-odds)
+                "latent_contributions": {...},
+                "base_value": -1.23,
+                "cache": {
+                    "model_version": "v1.4",
+                    "served_from_cache": ["feature_importance", "top_features", "equipment_descriptions"],
+                    "prediction_proba_source": "request"  # request | attribution | model
+                }
             }
         }
+    
+    Batch action:
+        {
+            "action": "batch",
+            "feature_matrix": [[...30D...], {...}, ...],  # n×30 (list 또는 dict 행)
+            "latent_matrix": [[...12D...], ...],  # optional (없으면 0으로 채움, latent_imputed=true)
+            "top_n": 10,
+            "return_matrix": false  # true이면 샘플별 attribution 행렬 포함
+        }
+        -> overall / by_class / by_equipment 평균 |attribution| 집계
+    
+    Partial dependence action:
+        {"action": "partial_dependence", "features": ["Process_Temperature", ...], "include_ice": false}
+        -> curves: {feature: {"grid": [...], "pd": [...], "pd_range": 0.12}} (features 생략 시 전체)
+    
+    Chart actions:
+        {"action": "chart_status", "chart_id": "..."}  -> chart_state / chart_url 조회 (모르는 chart_id는 404)
+        {"action": "render_chart", ...}  -> 비동기 차트 렌더링 (CHART_WORKER_FUNCTION 직접 호출 전용,
+                                            Function URL 요청은 403)
     """
     start_time = time.time()
     
@@ -397,6 +1249,41 @@ def lambda_handler(event, context):
         if 'body' in body and isinstance(body['body'], dict):
             body = body['body']
         
+        action = body.get('action')
+        if action == 'chart_status':
+            if not body.get('chart_id'):
+                return response(400, {'error': 'chart_id is required'})
+            chart_status = get_chart_status(body['chart_id'])
+            return response(404 if chart_status['chart_state'] == 'unknown' else 200, chart_status)
+        if action == 'render_chart':
+            # 비동기 self-invoke payload는 event 자체 (Function URL 요청은 requestContext / body 포함)
+            if 'requestContext' in event or 'body' in event:
+                return response(403, {'error': 'render_chart is internal (async invocation only)'})
+            try:
+                chart_id, sorted_features, top_n = parse_render_request(body)
+            except (KeyError, TypeError, ValueError) as e:
+                return response(400, {'error': 'Invalid render_chart request', 'message': str(e)})
+            run_chart_job(chart_id, sorted_features, top_n)
+            return response(200, get_chart_status(chart_id))
+        if action == 'partial_dependence':
+            return response(200, get_partial_dependence(body.get('features'), body.get('include_ice', False)))
+        if action == 'batch':
+            load_models()
+            try:
+                feature_matrix = parse_feature_matrix(body.get('feature_matrix'))
+                latent_matrix = body.get('latent_matrix')
+                latent_matrix = np.array(latent_matrix, dtype=np.float64).reshape(len(latent_matrix), -1) if latent_matrix else None
+                batch_results = calculate_batch_attributions(
+                    scaler.transform(feature_matrix), latent_matrix,
+                    body.get('top_n', 10), body.get('return_matrix', False)
+                )
+            except (ValueError, TypeError) as e:
+                return response(400, {'error': 'Invalid input', 'message': str(e)})
+            batch_results['processing_time_ms'] = round((time.time() - start_time) * 1000, 2)
+            batch_results['timestamp'] = datetime.utcnow().isoformat()
+            batch_results['model_version'] = MODEL_VERSION
+            return response(200, batch_results)
+        
         print(f"DEBUG: body keys: {body.keys()}")
         print(f"DEBUG: body.get('latent_features'): {body.get('latent_features')}")
         
@@ -404,6 +1291,10 @@ def lambda_handler(event, context):
         latent_features = body.get('latent_features')
         top_n = body.get('top_n', 10)
         generate_chart = body.get('generate_chart', True)
+        attribution_mode = body.get('attribution_mode', 'global')
+        prediction_proba = parse_prediction_proba(body)
+        chart_format = body.get('chart_format', 'png')
+        chart_mode = body.get('chart_mode', 'sync')
         
         # Features 처리
         if features:
@@ -426,24 +1317,48 @@ def lambda_handler(event, context):
             latent_array = None
         
         # Feature importance 계산
-        importance_results = calculate_shap_values(feature_array, latent_array)
-        
-        # 상위 N개 추출
-        top_features = importance_results['sorted_importance'][:top_n]
+        importance_results = calculate_shap_values(
+            feature_array, latent_array, attribution_mode, prediction_proba
+        )
         
-        # 장비/센서 설명 추가
-        equipment_descriptions = get_equipment_descriptions(top_features)
+        served_from_cache = []
+        if importance_results['from_cache']:
+            # Global importance: 상위 N개와 장비 설명 모두 모델 버전별 cache 사용
+            top_features, equipment_descriptions, top_n_hit = get_global_top_n(top_n)
+            served_from_cache.append('feature_importance')
+            if top_n_hit:
+                served_from_cache.extend(['top_features', 'equipment_descriptions'])
+        else:
+            # 상위 N개 추출
+            top_features = importance_results['sorted_importance'][:top_n]
+            
+            # 장비/센서 설명 추가 (설명 payload는 cache 재사용)
+            equipment_descriptions = get_equipment_descriptions(top_features)
+            if MODEL_VERSION in global_cache:
+                served_from_cache.append('equipment_descriptions')
         
         # Chart 생성
         chart_url = None
-        if generate_chart:
-            chart_key = generate_shap_chart(
+        chart_payload = {}
+        if generate_chart and chart_format == 'svg':
+            chart_payload['chart_svg'] = render_importance_svg(importance_results['sorted_importance'], top_n)
+        elif generate_chart and chart_format == 'data':
+            chart_payload['chart_data'] = build_chart_data(importance_results['sorted_importance'], top_n)
+        elif generate_chart and chart_mode == 'async':
+            # 렌더링/업로드/서명은 백그라운드에서 - importance는 즉시 반환
+            chart_status = start_chart_job(importance_results['feature_importance'], top_n)
+            chart_url = chart_status.pop('chart_url')
+            chart_payload.update(chart_status)
+        elif generate_chart:
+            chart_key, chart_cached = generate_shap_chart(
                 importance_results['feature_importance'],
                 importance_results['feature_names'],
                 top_n
             )
             if chart_key:
                 chart_url = generate_presigned_url(chart_key)
+            if chart_cached:
+                served_from_cache.append('chart')
         
         # 처리 시간
         processing_time = (time.time() - start_time) * 1000
@@ -454,13 +1369,29 @@ def lambda_handler(event, context):
             'feature_importance': importance_results['feature_importance'],
             'top_features': top_features,
             'equipment_descriptions': equipment_descriptions,
+            'equipment_ranking': feature_importance_ranking(importance_results['feature_importance']),
             'chart_url': chart_url,
             'prediction_proba': importance_results['prediction_proba'],
             'processing_time_ms': round(processing_time, 2),
             'timestamp': datetime.utcnow().isoformat(),
-            'method': importance_results['method']
+            'method': importance_results['method'],
+            'attribution_mode_used': importance_results['attribution_mode_used'],
+            'latent_imputed': importance_results['latent_imputed'],
+            'cache': {
+                'model_version': MODEL_VERSION,
+                'served_from_cache': served_from_cache,
+                'prediction_proba_source': importance_results['prediction_proba_source']
+            }
         }
         
+        response_body.update(chart_payload)
+        
+        # 샘플별 attribution 결과 (attribution_mode='shap')
+        for key in ('feature_contributions', 'latent_contributions', 'latent_total',
+                    'latent_share', 'base_value', 'attribution_time_ms'):
+            if key in importance_results:
+                response_body[key] = importance_results[key]
+        
         return {
             'statusCode': 200,
             'headers': {
@@ -528,7 +1459,8 @@ if __name__ == '__main__':
             'latent_features': [0.12, -0.45, 0.33, 0.67, -0.23, 0.89, 
                                -0.12, 0.45, -0.67, 0.23, -0.89, 0.34],
             'top_n': 10,
-            'generate_chart': False
+            'generate_chart': False,
+            'attribution_mode': 'shap'
         }
     }
     
@@ -3,24 +3,96 @@ Lambda T3: RAG 기반 질의응답
 - S3에 저장된 문서 활용
 - Amazon Bedrock Knowledge Bases 연동
 - 공정 SOP, 장비 설명, 센서 정의, 트러블슈팅 노트 등
+- 로컬 BM25 인덱스 검색 (retriever='local', kb_index.py) - S3 전체 스캔 대체, heading 단위 passage 반환
+- 로컬 dense vector 검색 (retriever='vector', kb_vector.py) - Bedrock retrieve 없이 semantic 검색
+- Hybrid 검색 (retriever='hybrid'): Bedrock KB + 로컬 BM25 동시 실행, deadline 내 결과만 RRF 결합
+- 답변 cache (answer_cache.py): 유사 질의 + 같은 검색 chunk + 같은 KB 버전이면 Claude 호출 생략
+- Streaming 답변 (stream=true): invoke_model_with_response_stream 토큰을 NDJSON 이벤트로 반환
+  (Function URL 요청은 t3_stream_server.py + Lambda Web Adapter, RESPONSE_STREAM invoke mode로 줄 단위 전송,
+   handler 직접 invoke는 모든 줄을 모아 한 번에 반환)
+- 프롬프트 context는 토큰 예산 기반 packing (context_packer.py, CONTEXT_TOKEN_BUDGET)
+- KB retrieve 결과 cache: (정규화 질의, numberOfResults, 카테고리) + KB 버전 (최근 완료 ingestion job + T0 시작 stamp)
+- 추출형 답변 (kb_extractive.py): Bedrock 장애 시 fallback, answer_mode='extractive'로 LLM 없이 응답
+- 카테고리 필터 검색: 질의 카테고리로 KB retrieve metadata filter / 로컬 인덱스 postings pre-filter,
+  결과가 CATEGORY_MIN_RESULTS 미만이면 필터 없이 재검색
+- Local rerank (kb_rerank.py): 검색 결과를 term 근접도 / heading / feature 일치로 재정렬, cutoff 미만 제거 후 프롬프트 구성
+- Batch 모드 (queries=[...]): 질의별 검색 동시 실행, 공유 passage 중복 제거, Bedrock 동시 생성 수 제한
+- 파라미터 사양 조회 (kb_parameters.py): "금형 온도 권장 범위" 같은 질문은 사양 인덱스 dict 조회로 응답 (answer_mode='spec' | 'auto')
 """
 
 import json
 import boto3
+import threading
 import time
 import os
-from typing import Dict, Any, List
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Dict, Any, List, Tuple
 from datetime import datetime
 
+import answer_cache
+import context_packer
+import kb_categories
+import kb_extractive
+import kb_index
+import kb_parameters
+import kb_rerank
+import kb_vector
+
 # AWS clients
 s3 = boto3.client('s3')
 bedrock_agent_runtime = boto3.client('bedrock-agent-runtime', region_name='us-east-1')
+bedrock_agent = boto3.client('bedrock-agent', region_name='us-east-1')
 bedrock_runtime = boto3.client('bedrock-runtime', region_name='us-east-1')
 
 # Configuration (환경변수로 설정 필요)
 BUCKET_NAME = os.environ.get('BUCKET_NAME', 'your-knowledge-base-bucket')
 KNOWLEDGE_BASE_ID = os.environ.get('KNOWLEDGE_BASE_ID', 'YOUR_KNOWLEDGE_BASE_ID')
+DATA_SOURCE_ID = os.environ.get('DATA_SOURCE_ID', '85CWXCHZLJ')  # KB 버전 = 최근 완료 ingestion job + T0 stamp (T0와 동일 data source)
 MODEL_ID = 'us.anthropic.claude-sonnet-4-5-20250929-v1:0'  # Claude Sonnet 4.5 (US inference profile)
+KB_INDEX_PATH = os.environ.get('KB_INDEX_PATH', kb_index.DEFAULT_INDEX_PATH)  # kb_index.py build 산출물
+KB_VECTORS_PATH = os.environ.get('KB_VECTORS_PATH', kb_vector.DEFAULT_VECTORS_PATH)  # kb_vector.py build 산출물
+KB_VECTORS_MANIFEST_PATH = os.environ.get('KB_VECTORS_MANIFEST_PATH', kb_vector.DEFAULT_MANIFEST_PATH)
+HYBRID_DEADLINE_MS = int(os.environ.get('HYBRID_DEADLINE_MS', '1500'))  # 늦은 검색 branch는 기다리지 않고 제외
+RRF_K = 60  # Reciprocal Rank Fusion 상수
+KB_VERSION_KEY = os.environ.get('KB_VERSION_KEY', 'kb_version.json')  # T0가 ingestion 시작 시 기록하는 버전 stamp
+KB_VERSION_TTL_SECONDS = int(os.environ.get('KB_VERSION_TTL_SECONDS', '60'))
+ANSWER_CACHE_SIZE = int(os.environ.get('ANSWER_CACHE_SIZE', answer_cache.DEFAULT_MAX_ENTRIES))
+ANSWER_CACHE_TTL_SECONDS = int(os.environ.get('ANSWER_CACHE_TTL_SECONDS', answer_cache.DEFAULT_TTL_SECONDS))
+ANSWER_CACHE_SIMILARITY = float(os.environ.get('ANSWER_CACHE_SIMILARITY', answer_cache.DEFAULT_SIMILARITY))
+RETRIEVAL_CACHE_SIZE = int(os.environ.get('RETRIEVAL_CACHE_SIZE', '512'))
+RETRIEVAL_CACHE_TTL_SECONDS = int(os.environ.get('RETRIEVAL_CACHE_TTL_SECONDS', '3600'))
+PARAMETER_RANGES_PATH = os.environ.get('PARAMETER_RANGES_PATH', kb_parameters.DEFAULT_INDEX_PATH)  # kb_parameters.py build 산출물
+BATCH_MAX_QUERIES = int(os.environ.get('BATCH_MAX_QUERIES', '20'))  # queries 모드 최대 질의 수
+BATCH_MAX_WORKERS = int(os.environ.get('BATCH_MAX_WORKERS', '8'))  # queries 모드 동시 검색 수
+BEDROCK_MAX_CONCURRENCY = int(os.environ.get('BEDROCK_MAX_CONCURRENCY', '4'))  # 동시 Claude 생성 호출 수
+RERANK_ENABLED = os.environ.get('RERANK_ENABLED', 'true').lower() == 'true'
+RERANK_TIME_BUDGET_MS = float(os.environ.get('RERANK_TIME_BUDGET_MS', kb_rerank.DEFAULT_TIME_BUDGET_MS))
+RERANK_CUTOFF = float(os.environ.get('RERANK_CUTOFF', kb_rerank.DEFAULT_CUTOFF))
+CATEGORY_FILTER = os.environ.get('CATEGORY_FILTER', 'true').lower() == 'true'  # 질의 카테고리 추론 후 필터 검색
+CATEGORY_MIN_RESULTS = int(os.environ.get('CATEGORY_MIN_RESULTS', '2'))  # 필터 결과가 이보다 적으면 필터 없이 재검색
+CONTEXT_TOKEN_BUDGET = int(os.environ.get('CONTEXT_TOKEN_BUDGET', context_packer.DEFAULT_TOKEN_BUDGET))  # 프롬프트 참고 문서 토큰 예산
+
+# 로컬 인덱스 (컨테이너당 1회 로드)
+local_index = None
+local_index_error = None  # 로드 실패 시 매 요청마다 재시도하지 않도록 기록
+vector_index = None
+vector_index_error = None
+parameter_index = None
+parameter_index_error = None
+
+# Hybrid 검색 branch 실행용 thread pool (컨테이너 재사용)
+# batch 모드의 모든 질의가 동시에 hybrid 검색해도 branch가 queue에서 deadline을 소모하지 않도록 질의당 2 branch 분량
+retrieval_executor = ThreadPoolExecutor(max_workers=2 * BATCH_MAX_WORKERS)
+
+# queries(batch) 모드 질의 실행용 thread pool (hybrid branch pool과 분리 - 중첩 submit으로 인한 교착 방지)
+batch_executor = ThreadPoolExecutor(max_workers=BATCH_MAX_WORKERS)
+bedrock_slots = threading.BoundedSemaphore(BEDROCK_MAX_CONCURRENCY)
+
+# 답변 / KB retrieve 결과 cache + KB 버전 (컨테이너 메모리, KB_VERSION_TTL_SECONDS마다 재확인)
+answers = answer_cache.AnswerCache(ANSWER_CACHE_SIZE, ANSWER_CACHE_TTL_SECONDS, ANSWER_CACHE_SIMILARITY)
+retrievals = answer_cache.TTLCache(RETRIEVAL_CACHE_SIZE, RETRIEVAL_CACHE_TTL_SECONDS)
+kb_version = None
+kb_version_checked_at = 0.0
 
 # Document categories in S3 (flat structure - all docs in root)
 DOCUMENT_PREFIXES = {
@@ -31,31 +103,35 @@ DOCUMENT_PREFIXES = {
     'quality': ''  # quality_standards.md, process_parameter_guidelines.md
 }
 
-# Document name patterns for category inference
-DOCUMENT_PATTERNS = {
-    'sop': ['sop', 'process'],
-    'equipment': ['machine', 'specs'],
-    'sensors': ['sensor'],
-    'troubleshooting': ['defect', 'troubleshooting', 'porosity'],
-    'quality': ['quality', 'parameter', 'guidelines'],
-    'safety': ['safety', 'regulations']
-}
+# Document name patterns for category inference (T0 metadata sidecar와 공유)
+DOCUMENT_PATTERNS = kb_categories.DOCUMENT_PATTERNS
 
 
-def retrieve_from_knowledge_base(query: str, max_results: int = 5) -> List[Dict]:
+def retrieve_from_knowledge_base(query: str, max_results: int = 5, category: str = None) -> List[Dict]:
     """
     Bedrock Knowledge Base에서 관련 문서 검색
+    - 같은 (정규화 질의, numberOfResults, 카테고리)는 KB 버전이 바뀔 때까지 cache 결과 반환
+    - category가 주어지면 T0가 기록한 category metadata로 filter
     """
+    cache_key = (answer_cache.normalize_query(query), max_results, category, get_kb_version())
+    cached = retrievals.get(cache_key)
+    if cached is not None:
+        return [dict(doc) for doc in cached]
+    
     try:
+        vector_search = {
+            'numberOfResults': max_results
+        }
+        if category:
+            vector_search['filter'] = kb_categories.retrieval_filter(category)
+        
         response = bedrock_agent_runtime.retrieve(
             knowledgeBaseId=KNOWLEDGE_BASE_ID,
             retrievalQuery={
                 'text': query
             },
             retrievalConfiguration={
-                'vectorSearchConfiguration': {
-                    'numberOfResults': max_results
-                }
+                'vectorSearchConfiguration': vector_search
             }
         )
         
@@ -76,8 +152,11 @@ def retrieve_from_knowledge_base(query: str, max_results: int = 5) -> List[Dict]
                 'metadata': metadata,
                 'source_type': metadata.get('x-amz-bedrock-kb-source-type', 'unknown'),
                 'document_id': metadata.get('x-amz-bedrock-kb-document-id', ''),
+                'chunk_id': metadata.get('x-amz-bedrock-kb-chunk-id', ''),
             })
         
+        if results:
+            retrievals.put(cache_key, [dict(doc) for doc in results])
         return results
     
     except Exception as e:
@@ -143,24 +222,328 @@ def retrieve_from_s3_direct(query: str, category: str = None) -> List[Dict]:
         return []
 
 
-def infer_category_from_query(query: str) -> str:
+def load_local_index():
     """
-    쿼리에서 카테고리 추론
+    사전 생성된 BM25 인덱스 로드 (Cold start 시 1회, 실패 시 재시도 안 함)
     """
-    query_lower = query.lower()
+    global local_index, local_index_error
     
-    if any(kw in query_lower for kw in ['불량', '원인', '문제', 'defect', 'issue', '포로시티', 'porosity']):
-        return 'troubleshooting'
-    elif any(kw in query_lower for kw in ['센서', 'sensor', '측정', '교정', 'calibration']):
-        return 'sensors'
-    elif any(kw in query_lower for kw in ['장비', 'equipment', '기계', 'machine', '스펙']):
-        return 'equipment'
-    elif any(kw in query_lower for kw in ['절차', 'sop', '프로세스', 'process', '공정']):
-        return 'sop'
-    elif any(kw in query_lower for kw in ['안전', 'safety', '규정']):
-        return 'safety'
-    else:
-        return 'quality'
+    if local_index is not None or local_index_error is not None:
+        return local_index
+    
+    try:
+        start = time.time()
+        local_index = kb_index.BM25Index.load(KB_INDEX_PATH)
+        print(f"✅ Local index loaded ({len(local_index.documents)} documents, {len(local_index.passages)} passages, "
+              f"{len(local_index.vocabulary)} terms, {(time.time() - start) * 1000:.1f} ms)")
+    except Exception as e:
+        print(f"⚠️ Local index not available: {e}")
+        local_index_error = str(e)
+    
+    return local_index
+
+
+def load_vector_index():
+    """
+    사전 생성된 passage embedding 행렬 memory-map 로드 (Cold start 시 1회, 실패 시 재시도 안 함)
+    """
+    global vector_index, vector_index_error
+    
+    if vector_index is not None or vector_index_error is not None:
+        return vector_index
+    
+    index = load_local_index()
+    if index is None:
+        vector_index_error = f"passage index unavailable: {local_index_error}"
+        return None
+    
+    try:
+        vector_index = kb_vector.VectorIndex.load(index, KB_VECTORS_PATH, KB_VECTORS_MANIFEST_PATH)
+        print(f"✅ Vector index loaded ({vector_index.embeddings.shape[0]} x {vector_index.embeddings.shape[1]}, "
+              f"embedder: {vector_index.embedder.name})")
+    except Exception as e:
+        print(f"⚠️ Vector index not available: {e}")
+        vector_index_error = str(e)
+    
+    return vector_index
+
+
+def passage_to_result(passage: Dict, source_type: str) -> Dict:
+    """
+    로컬 인덱스 검색 결과를 retrieve 결과 형식으로 변환
+    """
+    return {
+        'content': passage['text'],
+        'key': passage['key'],
+        'title': passage['title'],
+        'heading': passage['heading'],
+        'score': passage['score'],
+        'uri': f"s3://{BUCKET_NAME}/{passage['key']}",
+        'source_type': source_type,
+        'document_id': passage['path'],
+        'passage_id': passage['passage_id'],
+        'offsets': [passage['start'], passage['end']]
+    }
+
+
+def retrieve_from_local_index(query: str, category: str = None, max_results: int = 5) -> List[Dict]:
+    """
+    로컬 BM25 인덱스 passage 검색 (S3 호출 없음)
+    - 문서 전체가 아닌 가장 관련된 section(passage)만 반환
+    - 인덱스가 없으면 S3 직접 검색으로 대체
+    """
+    index = load_local_index()
+    if index is None:
+        return retrieve_from_s3_direct(query, category)
+    
+    mask = None
+    if category and category in DOCUMENT_PATTERNS:
+        mask = index.category_mask(DOCUMENT_PATTERNS[category])
+    
+    return [passage_to_result(passage, 'local_index') for passage in index.search(query, max_results, mask)]
+
+
+def generate_extractive_answer(query: str, category: str = None) -> Dict[str, Any]:
+    """
+    로컬 인덱스 기반 추출형 답변 (LLM 호출 없음)
+    
+    Returns:
+        {"answer", "units", "passages"} 또는 None (인덱스 없음 / 일치 내용 없음)
+    """
+    index = load_local_index()
+    if index is None:
+        return None
+    
+    mask = None
+    if category and category in DOCUMENT_PATTERNS:
+        mask = index.category_mask(DOCUMENT_PATTERNS[category])
+    
+    return kb_extractive.extract_answer(index, query, mask=mask)
+
+
+def load_parameter_index():
+    """
+    사전 생성된 파라미터 사양 인덱스 로드 (Cold start 시 1회, 실패 시 재시도 안 함)
+    """
+    global parameter_index, parameter_index_error
+    
+    if parameter_index is not None or parameter_index_error is not None:
+        return parameter_index
+    
+    try:
+        parameter_index = kb_parameters.ParameterIndex.load(PARAMETER_RANGES_PATH)
+        print(f"✅ Parameter index loaded ({len(parameter_index.parameters)} parameters)")
+    except Exception as e:
+        print(f"⚠️ Parameter index not available: {e}")
+        parameter_index_error = str(e)
+    
+    return parameter_index
+
+
+def generate_spec_answer(query: str) -> Dict[str, Any]:
+    """
+    파라미터 사양 인덱스 기반 답변 (검색 / LLM 호출 없음)
+    
+    Returns:
+        {"answer", "docs": 출처 문서 목록} 또는 None (사양 질문이 아니거나 인덱스에 없는 파라미터)
+    """
+    index = load_parameter_index()
+    result = index.answer(query) if index is not None else None
+    if result is None:
+        return None
+    
+    docs = {}
+    for feature, entries in result['parameters'].items():
+        for entry in entries:
+            key = os.path.basename(entry['source'])
+            doc = docs.setdefault((key, entry['heading']), {
+                'content': '', 'key': key, 'heading': entry['heading'], 'score': 1.0,
+                'uri': f"s3://{BUCKET_NAME}/{key}", 'source_type': 'parameter_index',
+                'document_id': entry['source']
+            })
+            doc['content'] += f"{feature} {entry['label']}: {kb_parameters.format_range(entry)}\n"
+    return {'answer': result['answer'], 'docs': list(docs.values())}
+
+
+def retrieve_from_vector_index(query: str, category: str = None, max_results: int = 5) -> List[Dict]:
+    """
+    로컬 vector 인덱스 cosine 검색 (Bedrock retrieve 대체, 네트워크 호출 없음 - hashing embedder 기준)
+    - 인덱스가 없으면 BM25 로컬 검색으로 대체
+    """
+    index = load_vector_index()
+    if index is None:
+        return retrieve_from_local_index(query, category, max_results)
+    
+    mask = None
+    if category and category in DOCUMENT_PATTERNS:
+        mask = index.passage_index.category_mask(DOCUMENT_PATTERNS[category])
+    
+    return [passage_to_result(passage, 'vector_index') for passage in index.search(query, max_results, mask)]
+
+
+def result_id(doc: Dict) -> str:
+    """
+    중복 제거용 chunk 식별자 (로컬 passage id / KB chunk id / uri + 본문 앞부분)
+    """
+    return doc.get('passage_id') or doc.get('chunk_id') or f"{doc.get('uri', '')}::{doc.get('content', '')[:200]}"
+
+
+def reciprocal_rank_fusion(rankings: Dict[str, List[Dict]], max_results: int = 5, k: int = RRF_K) -> List[Dict]:
+    """
+    검색기별 순위 결합: score = Σ 1 / (k + rank), chunk id 기준 중복 제거
+    
+    Args:
+        rankings: {retriever name: 점수순 결과 리스트}
+    """
+    fused = {}
+    for name, results in rankings.items():
+        for rank, doc in enumerate(results, start=1):
+            doc_id = result_id(doc)
+            entry = fused.get(doc_id)
+            if entry is None:
+                entry = dict(doc, score=0.0, retrievers=[], retriever_scores={})
+                fused[doc_id] = entry
+            entry['score'] += 1.0 / (k + rank)
+            entry['retrievers'].append(name)
+            entry['retriever_scores'][name] = doc.get('score', 0)
+    
+    return sorted(fused.values(), key=lambda d: d['score'], reverse=True)[:max_results]
+
+
+def retrieve_hybrid(query: str, category: str = None, max_results: int = 5,
+                    deadline_ms: int = HYBRID_DEADLINE_MS) -> Tuple[List[Dict], Dict[str, Any]]:
+    """
+    Bedrock KB 검색과 로컬 BM25 검색을 동시에 실행하고 RRF로 결합
+    - 전체 지연은 max(branch 지연), deadline 초과 branch는 결과에서 제외 (완료를 기다리지 않음)
+    
+    Returns:
+        (결합 결과, {"branches": {name: {"state", "time_ms", "count"}}})
+    """
+    start = time.time()
+    branches = {
+        'knowledge_base': lambda: retrieve_from_knowledge_base(query, max_results * 2, category),
+        'local': lambda: retrieve_from_local_index(query, category, max_results * 2)
+    }
+    
+    def timed(fn):
+        branch_start = time.time()
+        return fn(), (time.time() - branch_start) * 1000
+    
+    futures = {retrieval_executor.submit(timed, fn): name for name, fn in branches.items()}
+    done, _ = wait(futures, timeout=deadline_ms / 1000)
+    
+    rankings = {}
+    info = {}
+    for future, name in futures.items():
+        if future not in done:
+            info[name] = {'state': 'timeout', 'time_ms': None, 'count': 0}
+            continue
+        try:
+            results, elapsed_ms = future.result()
+            rankings[name] = results
+            info[name] = {'state': 'ok', 'time_ms': round(elapsed_ms, 2), 'count': len(results)}
+        except Exception as e:
+            print(f"Hybrid branch {name} error: {e}")
+            info[name] = {'state': 'error', 'time_ms': None, 'count': 0}
+    
+    fused = reciprocal_rank_fusion(rankings, max_results)
+    return fused, {'branches': info, 'time_ms': round((time.time() - start) * 1000, 2)}
+
+
+def retrieve_with_category(retrieve, category: str = None) -> Tuple[List[Dict], Dict[str, Any]]:
+    """
+    카테고리 필터 검색 후 결과가 부족하면 (recall 부족) 필터 없이 재검색
+    
+    Args:
+        retrieve: category(None이면 전체) -> 검색 결과 함수
+    
+    Returns:
+        (검색 결과, {"category", "filtered_count", "fallback"} 또는 None)
+    """
+    if not category:
+        return retrieve(None), None
+    
+    results = retrieve(category)
+    info = {'category': category, 'filtered_count': len(results), 'fallback': False}
+    if len(results) < CATEGORY_MIN_RESULTS:
+        print(f"Category filter '{category}' returned {len(results)} results, retrying without filter")
+        results = retrieve(None)
+        info['fallback'] = True
+    return results, info
+
+
+def rerank_results(query: str, docs: List[Dict]) -> Tuple[List[Dict], Dict[str, Any]]:
+    """
+    검색 결과 local rerank (feature 명칭은 파라미터 사양 인덱스의 FEATURE_NAMES 사용, 없으면 미사용)
+    """
+    index = load_parameter_index()
+    return kb_rerank.rerank(query, docs, index.alias_table if index is not None else None,
+                            RERANK_TIME_BUDGET_MS, RERANK_CUTOFF)
+
+
+def fetch_kb_version() -> str:
+    """
+    현재 KB 버전 = 최근 완료(COMPLETE)된 ingestion job id + T0 start_ingestion_job이 S3에 기록하는 버전 stamp
+    - stamp는 ingestion 시작 시점에 바뀌므로 완료를 기다리지 않고 cache 무효화, 완료 시 job id가 바뀌어 한 번 더 무효화
+    - 한쪽 조회가 실패하면 나머지 값만 사용, 둘 다 실패하면 예외 (get_kb_version이 이전 버전 유지)
+    """
+    parts, errors = [], 0
+    try:
+        response = bedrock_agent.list_ingestion_jobs(
+            knowledgeBaseId=KNOWLEDGE_BASE_ID,
+            dataSourceId=DATA_SOURCE_ID,
+            filters=[{'attribute': 'STATUS', 'operator': 'EQ', 'values': ['COMPLETE']}],
+            sortBy={'attribute': 'STARTED_AT', 'order': 'DESCENDING'},
+            maxResults=1
+        )
+        jobs = response.get('ingestionJobSummaries', [])
+        if jobs:
+            parts.append(jobs[0]['ingestionJobId'])
+    except Exception as e:
+        print(f"Ingestion job lookup error: {e}")
+        errors += 1
+    
+    try:
+        response = s3.get_object(Bucket=BUCKET_NAME, Key=KB_VERSION_KEY)
+        stamp = json.loads(response['Body'].read()).get('job_id')
+        if stamp and stamp not in parts:
+            parts.append(stamp)
+    except s3.exceptions.NoSuchKey:
+        pass
+    except Exception as e:
+        print(f"KB version stamp read error: {e}")
+        errors += 1
+    
+    if errors == 2:
+        raise RuntimeError('KB version lookup failed')
+    return '+'.join(parts) or 'initial'
+
+
+def get_kb_version() -> str:
+    """
+    KB 버전 조회 (fetch_kb_version)
+    - KB_VERSION_TTL_SECONDS 동안은 메모리 값 사용 (요청마다 API 호출하지 않음)
+    - 버전이 바뀌면 답변 / retrieve 결과 cache 전체 무효화
+    """
+    global kb_version, kb_version_checked_at
+    
+    now = time.time()
+    if kb_version is not None and now - kb_version_checked_at < KB_VERSION_TTL_SECONDS:
+        return kb_version
+    
+    try:
+        version = fetch_kb_version()
+    except Exception as e:
+        print(f"KB version check error: {e}")
+        version = kb_version or 'unknown'
+    
+    if kb_version is not None and version != kb_version:
+        print(f"KB version changed ({kb_version} -> {version}), clearing caches")
+        answers.clear()
+        retrievals.clear()
+    kb_version = version
+    kb_version_checked_at = now
+    return kb_version
 
 
 def generate_answer_with_bedrock(query: str, context: List[Dict], 
@@ -169,34 +552,67 @@ def generate_answer_with_bedrock(query: str, context: List[Dict],
     Bedrock Claude를 사용하여 답변 생성 (메타데이터 활용)
     """
     try:
-        # Context 문서 결합 (메타데이터 포함)
-        context_parts = []
-        for i, doc in enumerate(context[:3]):
-            doc_text = f"[문서 {i+1}]"
-            
-            # 문서 출처 정보 추가
-            if doc.get('uri'):
-                doc_text += f"\n출처: {doc['uri']}"
-            if doc.get('source_type'):
-                doc_text += f"\n유형: {doc['source_type']}"
-            
-            doc_text += f"\n관련도: {doc.get('score', 0):.2f}"
-            doc_text += f"\n\n{doc['content'][:500]}"
-            context_parts.append(doc_text)
-        
-        context_text = "\n\n".join(context_parts)
-        
-        # 추가 컨텍스트 (예측 결과 등)
-        extra_info = ""
-        if additional_context:
-            if 'last_prediction' in additional_context:
-                pred = additional_context['last_prediction']
-                extra_info += f"\n\n[최근 예측 결과]\n"
-                extra_info += f"- 예측: {pred['prediction']['class']}\n"
-                extra_info += f"- 확률: {pred['prediction']['probability']:.1%}\n"
-        
-        # 프롬프트 생성
-        prompt = f"""당신은 다이캐스팅 품질 관리 전문가입니다. 다음 문서들을 참고하여 질문에 답변해주세요.
+        return invoke_claude(build_answer_prompt(query, context, additional_context))
+    
+    except Exception as e:
+        print(f"Bedrock answer generation error: {e}")
+        return generate_fallback_answer(query)
+
+
+def generate_answer_cached(query: str, context: List[Dict],
+                           additional_context: Dict = None) -> Tuple[str, Dict[str, Any]]:
+    """
+    답변 cache 조회 후 miss일 때만 Bedrock Claude 호출
+    - 예측 결과 등 추가 컨텍스트가 있는 질의는 cache 사용 안 함
+    - Bedrock 오류로 생성된 fallback 답변은 cache에 저장하지 않음
+    
+    Returns:
+        (답변, {"status": "hit" | "miss" | "bypass", ...})
+    """
+    if additional_context:
+        return generate_answer_with_bedrock(query, context, additional_context), {'status': 'bypass'}
+    
+    version = get_kb_version()
+    chunk_ids = [result_id(doc) for doc in context]
+    cached = answers.get(query, chunk_ids, version)
+    if cached is not None:
+        return cached['answer'], {
+            'status': 'hit',
+            'match': cached['match'],
+            'similarity': cached['similarity'],
+            'kb_version': version
+        }
+    
+    try:
+        answer = invoke_claude(build_answer_prompt(query, context))
+    except Exception as e:
+        print(f"Bedrock answer generation error: {e}")
+        return generate_fallback_answer(query), {'status': 'miss', 'kb_version': version}
+    
+    answers.put(query, chunk_ids, version, answer)
+    return answer, {'status': 'miss', 'kb_version': version}
+
+
+def build_answer_prompt(query: str, context: List[Dict], additional_context: Dict = None) -> str:
+    """
+    검색 문서 + 추가 컨텍스트로 Claude 프롬프트 생성
+    """
+    # Context 문서 packing (점수 순, 토큰 예산 이내, 중복 passage 제거)
+    packed, pack_stats = context_packer.pack_context(context, CONTEXT_TOKEN_BUDGET)
+    context_text = context_packer.format_context(packed)
+    print(f"Context packing: {json.dumps(pack_stats)}")
+    
+    # 추가 컨텍스트 (예측 결과 등)
+    extra_info = ""
+    if additional_context:
+        if 'last_prediction' in additional_context:
+            pred = additional_context['last_prediction']
+            extra_info += f"\n\n[최근 예측 결과]\n"
+            extra_info += f"- 예측: {pred['prediction']['class']}\n"
+            extra_info += f"- 확률: {pred['prediction']['probability']:.1%}\n"
+    
+    # 프롬프트 생성
+    prompt = f"""당신은 다이캐스팅 품질 관리 전문가입니다. 다음 문서들을 참고하여 질문에 답변해주세요.
 
 [참고 문서]
 {context_text}
@@ -212,39 +628,130 @@ def generate_answer_with_bedrock(query: str, context: List[Dict],
 - 300자 이내로 간결하게 답변하세요
 
 답변:"""
-        
-        # Bedrock Claude 호출
-        body = json.dumps({
-            "anthropic_version": "bedrock-2023-05-31",
-            "max_tokens": 1000,
-            "messages": [
-                {
-                    "role": "user",
-                    "content": prompt
-                }
-            ],
-            "temperature": 0.7
-        })
-        
+    return prompt
+
+
+def invoke_claude(prompt: str) -> str:
+    """
+    Bedrock Claude 호출 (오류는 호출자가 처리)
+    - 동시 호출 수는 bedrock_slots로 제한 (batch 모드에서 여러 thread가 동시에 생성)
+    """
+    body = json.dumps({
+        "anthropic_version": "bedrock-2023-05-31",
+        "max_tokens": 1000,
+        "messages": [
+            {
+                "role": "user",
+                "content": prompt
+            }
+        ],
+        "temperature": 0.7
+    })
+    
+    with bedrock_slots:
         response = bedrock_runtime.invoke_model(
             modelId=MODEL_ID,
             body=body
         )
-        
         response_body = json.loads(response['body'].read())
-        answer = response_body['content'][0]['text']
+    answer = response_body['content'][0]['text']
+    
+    return answer.strip()
+
+
+def stream_claude(prompt: str):
+    """
+    Bedrock Claude streaming 호출 - text delta를 도착 순서대로 yield (오류는 호출자가 처리)
+    - stream을 끝까지 읽거나 generator가 닫힐 때까지 bedrock_slots 1개 점유 (invoke_claude와 같은 동시 호출 제한)
+    """
+    body = json.dumps({
+        "anthropic_version": "bedrock-2023-05-31",
+        "max_tokens": 1000,
+        "messages": [
+            {
+                "role": "user",
+                "content": prompt
+            }
+        ],
+        "temperature": 0.7
+    })
+    
+    with bedrock_slots:
+        response = bedrock_runtime.invoke_model_with_response_stream(
+            modelId=MODEL_ID,
+            body=body
+        )
         
-        return answer.strip()
+        for event in response['body']:
+            chunk = event.get('chunk')
+            if not chunk:
+                continue
+            payload = json.loads(chunk['bytes'])
+            if payload.get('type') == 'content_block_delta' and payload['delta'].get('type') == 'text_delta':
+                yield payload['delta']['text']
+
+
+def generate_answer_stream(query: str, context: List[Dict], additional_context: Dict = None,
+                           use_cache: bool = True):
+    """
+    Streaming 답변 생성 이벤트
+    - cache hit / Bedrock 오류 (첫 토큰 이전) 시 전체 답변을 delta 1개로 전송
+    - 첫 토큰 이후 오류는 error 이벤트 후 부분 답변으로 종료 (cache 저장 안 함)
+    
+    Yields:
+        {"type": "delta", "text": "..."} ..., {"type": "error", "message"}?, {"type": "done", "answer", "answer_cache"}
+    """
+    cache_enabled = use_cache and not additional_context
+    version = get_kb_version() if cache_enabled else None
+    chunk_ids = [result_id(doc) for doc in context]
     
+    if cache_enabled:
+        cached = answers.get(query, chunk_ids, version)
+        if cached is not None:
+            yield {'type': 'delta', 'text': cached['answer']}
+            yield {'type': 'done', 'answer': cached['answer'], 'answer_cache': {
+                'status': 'hit',
+                'match': cached['match'],
+                'similarity': cached['similarity'],
+                'kb_version': version
+            }}
+            return
+    
+    cache_info = {'status': 'miss', 'kb_version': version} if cache_enabled else {'status': 'bypass'}
+    parts = []
+    try:
+        for text in stream_claude(build_answer_prompt(query, context, additional_context)):
+            parts.append(text)
+            yield {'type': 'delta', 'text': text}
     except Exception as e:
-        print(f"Bedrock answer generation error: {e}")
-        return generate_fallback_answer(query)
+        print(f"Bedrock answer streaming error: {e}")
+        if not parts:
+            answer = generate_fallback_answer(query)
+            yield {'type': 'delta', 'text': answer}
+            yield {'type': 'done', 'answer': answer, 'answer_cache': cache_info}
+            return
+        yield {'type': 'error', 'message': str(e)}
+        yield {'type': 'done', 'answer': ''.join(parts).strip(), 'answer_cache': cache_info}
+        return
+    
+    answer = ''.join(parts).strip()
+    if cache_enabled:
+        answers.put(query, chunk_ids, version, answer)
+    yield {'type': 'done', 'answer': answer, 'answer_cache': cache_info}
 
 
 def generate_fallback_answer(query: str) -> str:
     """
     Bedrock 사용 불가 시 기본 답변
+    - 로컬 인덱스에서 추출한 문장/표 행 (출처 포함) 우선, 일치 내용이 없으면 키워드 기반 안내
     """
+    try:
+        extractive = generate_extractive_answer(query)
+        if extractive:
+            return extractive['answer']
+    except Exception as e:
+        print(f"Extractive answer error: {e}")
+    
     query_lower = query.lower()
     
     # 키워드 기반 답변
@@ -307,6 +814,261 @@ def generate_fallback_answer(query: str) -> str:
 구체적인 질문을 해주시면 더 자세히 답변드리겠습니다."""
 
 
+def build_sources(retrieved_docs: List[Dict]) -> List[Dict]:
+    """
+    응답용 출처 목록 (상위 3개)
+    """
+    return [
+        {
+            'content_preview': doc['content'][:200],
+            'score': doc.get('score', 0),
+            'uri': doc.get('uri', ''),
+            'source_type': doc.get('source_type', 'unknown'),
+            'title': doc.get('uri', '').split('/')[-1] if doc.get('uri') else 'N/A',
+            'heading': doc.get('heading')
+        }
+        for doc in retrieved_docs[:3]
+    ]
+
+
+def stream_response_lines(query: str, retrieved_docs: List[Dict], metadata: Dict[str, Any],
+                          additional_context: Dict = None, use_cache: bool = True, start_time: float = None,
+                          answer: str = None):
+    """
+    Streaming 응답 NDJSON 줄 (한 줄 = 이벤트 1개)
+    
+    sources -> delta ... -> done 순서, Bedrock delta가 도착할 때마다 한 줄씩 생성 (lazy generator).
+    t3_stream_server.py는 각 줄을 바로 chunk로 전송하고, handler 직접 invoke는 모두 모아 반환합니다.
+    answer가 주어지면 (추출형 답변) 생성 없이 delta 1개로 전송합니다.
+    """
+    start_time = start_time or time.time()
+    yield json.dumps(dict(metadata, type='sources'), ensure_ascii=False) + '\n'
+    
+    if answer is not None or not retrieved_docs:
+        answer = answer if answer is not None else generate_fallback_answer(query)
+        events = iter([
+            {'type': 'delta', 'text': answer},
+            {'type': 'done', 'answer': answer, 'answer_cache': {'status': 'bypass'}}
+        ])
+    else:
+        events = generate_answer_stream(query, retrieved_docs, additional_context, use_cache)
+    
+    first_token_ms = None
+    for event in events:
+        if event['type'] == 'delta' and first_token_ms is None:
+            first_token_ms = round((time.time() - start_time) * 1000, 2)
+        if event['type'] == 'done':
+            event['first_token_ms'] = first_token_ms
+            event['processing_time_ms'] = round((time.time() - start_time) * 1000, 2)
+        yield json.dumps(event, ensure_ascii=False) + '\n'
+
+
+def stream_query_lines(query: str, body: Dict[str, Any], start_time: float = None):
+    """
+    Streaming 요청 처리 - 검색 / rerank까지 수행한 뒤 (오류는 호출자에게 바로 전달)
+    답변 생성은 반환된 NDJSON 줄 generator를 읽는 동안 진행
+    """
+    start_time = start_time or time.time()
+    state = prepare_query(query, body)
+    retrieved_docs, direct = state['retrieved_docs'], state['direct']
+    metadata = {
+        'sources': build_sources(retrieved_docs),
+        'retriever': state['retriever'],
+        'answer_mode': state['answer_mode'],
+        'used_knowledge_base': state['used_knowledge_base']
+    }
+    if state['retrieval_info']:
+        metadata['retrieval'] = state['retrieval_info']
+    if state['category_info']:
+        metadata['category_filter'] = state['category_info']
+    if state['rerank_info']:
+        metadata['rerank'] = state['rerank_info']
+    return stream_response_lines(query, retrieved_docs, metadata, body.get('context'), body.get('use_cache', True),
+                                 start_time, direct['answer'] if direct else None)
+
+
+def prepare_query(query: str, body: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    답변 생성 전 단계: 사양 조회 / 추출형 답변 확인 후 문서 검색
+    
+    Returns:
+        {"query", "retriever", "answer_mode", "direct", "retrieved_docs", "retrieval_info",
+         "category_info", "rerank_info", "used_knowledge_base"}
+    """
+    use_knowledge_base = body.get('use_knowledge_base', True)
+    retriever = body.get('retriever', 'knowledge_base' if use_knowledge_base else 'local')
+    
+    # 사양 조회 / 추출형 답변 (단순 조회 질문용, 일치 내용이 없으면 생성형으로 진행)
+    answer_mode = body.get('answer_mode', 'generative')
+    direct = None
+    if answer_mode in ('spec', 'auto'):
+        direct = generate_spec_answer(query)
+        if direct:
+            answer_mode, retriever = 'spec', 'parameter_index'
+    elif answer_mode == 'extractive':
+        extractive = generate_extractive_answer(query)
+        if extractive:
+            retriever = 'local'
+            direct = {
+                'answer': extractive['answer'],
+                'docs': [passage_to_result(passage, 'local_index') for passage in extractive['passages']]
+            }
+    if not direct:
+        answer_mode = 'generative'
+    
+    # 문서 검색 (카테고리 필터, 결과가 부족하면 필터 없이 재검색)
+    retrieval_info = None
+    category_info = None
+    
+    def retrieve(category):
+        nonlocal retrieval_info
+        if retriever == 'hybrid':
+            results, retrieval_info = retrieve_hybrid(query, category)
+            return results
+        elif retriever == 'knowledge_base':
+            return retrieve_from_knowledge_base(query, category=category)
+        elif retriever == 's3':
+            return retrieve_from_s3_direct(query, category)
+        elif retriever == 'vector':
+            return retrieve_from_vector_index(query, category)
+        return retrieve_from_local_index(query, category)
+    
+    if direct:
+        retrieved_docs = direct['docs']
+    else:
+        category = body.get('category')
+        if category is None and CATEGORY_FILTER:
+            # 키워드로 추론된 경우만 필터 (기본 카테고리 추정으로 검색 범위를 줄이면 recall 손실)
+            category = kb_categories.infer_category_from_query(query, default=None)
+        retrieved_docs, category_info = retrieve_with_category(retrieve, category)
+    
+    # 생성형 답변은 rerank 후 cutoff를 통과한 passage만 프롬프트에 사용
+    rerank_info = None
+    if not direct and retrieved_docs and body.get('rerank', RERANK_ENABLED):
+        retrieved_docs, rerank_info = rerank_results(query, retrieved_docs)
+    
+    return {
+        'query': query,
+        'retriever': retriever,
+        'answer_mode': answer_mode,
+        'direct': direct,
+        'retrieved_docs': retrieved_docs,
+        'retrieval_info': retrieval_info,
+        'category_info': category_info,
+        'rerank_info': rerank_info,
+        'used_knowledge_base': any(
+            doc.get('source_type') not in ('local_index', 'vector_index') for doc in retrieved_docs
+        ) and retriever in ('knowledge_base', 'hybrid')
+    }
+
+
+def generate_for_query(state: Dict[str, Any], additional_context: Dict = None,
+                       use_cache: bool = True) -> Tuple[str, List[Dict], Dict[str, Any]]:
+    """
+    prepare_query 결과로 답변 생성
+    
+    Returns:
+        (answer, sources, answer_cache 정보)
+    """
+    query, retrieved_docs, direct = state['query'], state['retrieved_docs'], state['direct']
+    if direct:
+        return direct['answer'], build_sources(retrieved_docs), {'status': 'bypass'}
+    if not retrieved_docs:
+        return generate_fallback_answer(query), [], {'status': 'bypass'}
+    
+    if use_cache:
+        answer, cache_info = generate_answer_cached(query, retrieved_docs, additional_context)
+    else:
+        answer = generate_answer_with_bedrock(query, retrieved_docs, additional_context)
+        cache_info = {'status': 'bypass'}
+    return answer, build_sources(retrieved_docs), cache_info
+
+
+def answer_batch(queries: List[str], body: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    여러 질의를 한 번에 처리 (queries 모드)
+    - 같은 질의(정규화 기준)는 한 번만 실행, 질의별 검색은 batch_executor에서 동시 실행
+    - Claude 생성은 bedrock_slots로 동시 호출 수 제한 (invoke_claude)
+    - 여러 질의가 공유하는 passage는 sources에 한 번만 포함하고 결과는 source_ids로 참조
+    
+    Returns:
+        {"results": [입력 순서, 질의별 답변 + timings_ms], "sources": [...], "batch": {...}}
+    """
+    start_time = time.time()
+    additional_context = body.get('context')
+    use_cache = body.get('use_cache', True)
+    
+    def run(query):
+        query_start = time.time()
+        state = prepare_query(query, body)
+        retrieval_ms = (time.time() - query_start) * 1000
+        answer, _, cache_info = generate_for_query(state, additional_context, use_cache)
+        total_ms = (time.time() - query_start) * 1000
+        return state, answer, cache_info, {
+            'retrieval_ms': round(retrieval_ms, 2),
+            'generation_ms': round(total_ms - retrieval_ms, 2),
+            'total_ms': round(total_ms, 2)
+        }
+    
+    futures = {}
+    for query in queries:
+        key = answer_cache.normalize_query(query)
+        if key not in futures:
+            futures[key] = batch_executor.submit(run, query)
+    
+    results = []
+    sources = []
+    source_index = {}  # result_id -> sources 위치
+    seen = set()
+    for query in queries:
+        key = answer_cache.normalize_query(query)
+        try:
+            state, answer, cache_info, timings = futures[key].result()
+        except Exception as e:
+            print(f"Batch query error ({query}): {e}")
+            results.append({'query': query, 'error': str(e)})
+            continue
+        
+        source_ids = []
+        for doc, source in zip(state['retrieved_docs'], build_sources(state['retrieved_docs'])):
+            doc_id = result_id(doc)
+            if doc_id not in source_index:
+                source_index[doc_id] = len(sources)
+                sources.append(source)
+            source_ids.append(source_index[doc_id])
+        
+        result = {
+            'query': query,
+            'answer': answer,
+            'source_ids': source_ids,
+            'retriever': state['retriever'],
+            'answer_mode': state['answer_mode'],
+            'answer_cache': cache_info,
+            'timings_ms': timings
+        }
+        if state['category_info']:
+            result['category_filter'] = state['category_info']
+        if state['rerank_info']:
+            result['rerank'] = state['rerank_info']
+        if key in seen:
+            result['deduplicated'] = True  # 앞선 같은 질의의 결과 재사용
+        seen.add(key)
+        results.append(result)
+    
+    return {
+        'results': results,
+        'sources': sources,
+        'batch': {
+            'queries': len(queries),
+            'unique_queries': len(futures),
+            'unique_sources': len(sources),
+            'max_concurrent_generations': BEDROCK_MAX_CONCURRENCY
+        },
+        'processing_time_ms': round((time.time() - start_time) * 1000, 2),
+        'timestamp': datetime.utcnow().isoformat()
+    }
+
+
 def lambda_handler(event, context):
     """
     Lambda 핸들러
@@ -314,8 +1076,18 @@ def lambda_handler(event, context):
     Input:
         {
             "query": "불량의 주요 원인은?",
+            "queries": ["...", "..."],  # optional: batch 모드 (query 대신, 결과는 입력 순서대로 results에 반환)
             "use_knowledge_base": true,  # optional
-            "context": {...}  # optional (예측 결과 등)
+            "retriever": "knowledge_base",  # optional: "knowledge_base" | "local" (BM25) | "vector" (로컬 embedding)
+                                            #           | "hybrid" (KB + BM25 동시, RRF) | "s3" (S3 전체 스캔)
+            "context": {...},  # optional (예측 결과 등, 지정 시 답변 cache 미사용)
+            "category": "sensors",  # optional: 검색 카테고리 (미지정 시 질의에서 추론, ""이면 필터 없음)
+            "use_cache": true,  # optional: 답변 cache 사용 여부
+            "stream": false,  # optional: true면 NDJSON 이벤트 응답 (application/x-ndjson)
+            "rerank": true,  # optional: 검색 결과 local rerank + cutoff (기본 RERANK_ENABLED)
+            "answer_mode": "generative"  # optional: "extractive"면 로컬 인덱스 문장/표 행 추출 (LLM 미사용)
+                                         #           "spec"이면 파라미터 사양 인덱스 조회 (LLM 미사용)
+                                         #           "auto"면 사양 질문일 때만 사양 조회, 아니면 생성형
         }
     
     Output:
@@ -342,9 +1114,35 @@ def lambda_handler(event, context):
             body = body['body']
         
         query = body.get('query', '')
-        use_knowledge_base = body.get('use_knowledge_base', True)
         additional_context = body.get('context')
         
+        # Batch 모드 (stream 미지원)
+        queries = body.get('queries')
+        if queries is not None:
+            if not isinstance(queries, list) or not queries or not all(isinstance(q, str) and q for q in queries):
+                error = 'queries must be a non-empty list of strings'
+            elif len(queries) > BATCH_MAX_QUERIES:
+                error = f'Too many queries (max {BATCH_MAX_QUERIES})'
+            else:
+                error = None
+            if error:
+                return {
+                    'statusCode': 400,
+                    'headers': {
+                        'Content-Type': 'application/json'
+                    },
+                    'body': json.dumps({
+                        'error': error
+                    })
+                }
+            return {
+                'statusCode': 200,
+                'headers': {
+                    'Content-Type': 'application/json'
+                },
+                'body': json.dumps(answer_batch(queries, body), ensure_ascii=False)
+            }
+        
         if not query:
             return {
             'statusCode': 400,
@@ -356,28 +1154,25 @@ def lambda_handler(event, context):
             })
         }
         
-        # 문서 검색
-        if use_knowledge_base:
-            retrieved_docs = retrieve_from_knowledge_base(query)
-        else:
-            retrieved_docs = retrieve_from_s3_direct(query)
+        # Streaming 응답 (NDJSON: sources -> delta ... -> done)
+        # Function URL 요청은 t3_stream_server.py가 줄 단위로 전송 - 여기는 직접 invoke용 (응답 payload 1개)
+        if body.get('stream'):
+            return {
+                'statusCode': 200,
+                'headers': {
+                    'Content-Type': 'application/x-ndjson'
+                },
+                'body': ''.join(stream_query_lines(query, body, start_time))
+            }
+        
+        state = prepare_query(query, body)
+        retriever, answer_mode = state['retriever'], state['answer_mode']
+        retrieval_info, category_info = state['retrieval_info'], state['category_info']
+        rerank_info = state['rerank_info']
+        used_knowledge_base = state['used_knowledge_base']
         
         # 답변 생성
-        if retrieved_docs:
-            answer = generate_answer_with_bedrock(query, retrieved_docs, additional_context)
-            sources = [
-                {
-                    'content_preview': doc['content'][:200],
-                    'score': doc.get('score', 0),
-                    'uri': doc.get('uri', ''),
-                    'source_type': doc.get('source_type', 'unknown'),
-                    'title': doc.get('uri', '').split('/')[-1] if doc.get('uri') else 'N/A'
-                }
-                for doc in retrieved_docs[:3]
-            ]
-        else:
-            answer = generate_fallback_answer(query)
-            sources = []
+        answer, sources, cache_info = generate_for_query(state, additional_context, body.get('use_cache', True))
         
         # 처리 시간
         processing_time = (time.time() - start_time) * 1000
@@ -388,8 +1183,17 @@ def lambda_handler(event, context):
             'sources': sources,
             'processing_time_ms': round(processing_time, 2),
             'timestamp': datetime.utcnow().isoformat(),
-            'used_knowledge_base': use_knowledge_base and len(retrieved_docs) > 0
+            'used_knowledge_base': used_knowledge_base,
+            'retriever': retriever,
+            'answer_mode': answer_mode
         }
+        if retrieval_info:
+            response_body['retrieval'] = retrieval_info
+        if category_info:
+            response_body['category_filter'] = category_info
+        if rerank_info:
+            response_body['rerank'] = rerank_info
+        response_body['answer_cache'] = cache_info
         
         return {
             'statusCode': 200,
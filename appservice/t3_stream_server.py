@@ -0,0 +1,101 @@
+"""
+Lambda T3 HTTP 서버 (Lambda Web Adapter, RESPONSE_STREAM invoke mode)
+- 관리형 Python 런타임 handler는 응답을 한 번에 반환하므로, Function URL 요청은 Web Adapter가 이 서버로 전달
+- stream=true 요청: 검색 후 NDJSON 줄(sources -> delta ... -> done)을 Bedrock delta 도착 즉시 chunk로 전송
+- 그 외 요청 (일반 / batch / 오류): lambda_handler 결과를 그대로 HTTP 응답으로 변환
+- Function URL이 아닌 invoke event는 Web Adapter가 AWS_LWA_PASS_THROUGH_PATH로 POST - lambda_handler 결과 반환
+
+로컬 실행:
+    PORT=8080 python appservice/t3_stream_server.py
+"""
+
+import json
+import os
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import lambda_t3_rag as t3
+
+PORT = int(os.environ.get('AWS_LWA_PORT', os.environ.get('PORT', '8080')))
+READINESS_PATH = os.environ.get('AWS_LWA_READINESS_CHECK_PATH', '/health')
+PASS_THROUGH_PATH = os.environ.get('AWS_LWA_PASS_THROUGH_PATH', '/events')
+
+
+class T3RequestHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # chunked transfer encoding
+
+    def do_GET(self):
+        if self.path.split('?')[0] != READINESS_PATH:
+            self.send_json(404, {'error': 'Not found'})
+            return
+        self.send_json(200, {'status': 'ok'})
+
+    def do_POST(self):
+        start_time = time.time()
+        try:
+            length = int(self.headers.get('Content-Length') or 0)
+            body = json.loads(self.rfile.read(length) or b'{}')
+        except ValueError:
+            self.send_json(400, {'error': 'Invalid JSON body'})
+            return
+
+        if self.path.split('?')[0] == PASS_THROUGH_PATH:
+            self.send_json(200, t3.lambda_handler(body, None))
+            return
+
+        if isinstance(body, dict) and body.get('stream') and body.get('query') and body.get('queries') is None:
+            try:
+                lines = t3.stream_query_lines(body['query'], body, start_time)
+            except Exception as e:
+                print(f"Stream setup error: {e}")
+                self.send_json(500, {'error': 'Internal server error', 'message': str(e)})
+                return
+            self.send_stream(lines)
+            return
+
+        result = t3.lambda_handler({'body': body}, None)
+        self.send_response(result['statusCode'])
+        payload = result['body'].encode('utf-8')
+        for name, value in result.get('headers', {}).items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def send_json(self, status: int, data) -> None:
+        payload = json.dumps(data, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def send_stream(self, lines) -> None:
+        """
+        NDJSON 줄을 생성되는 대로 chunk 1개씩 전송 (클라이언트 연결이 끊기면 generator를 닫아 Bedrock stream 해제)
+        """
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/x-ndjson')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+        try:
+            for line in lines:
+                data = line.encode('utf-8')
+                self.wfile.write(f'{len(data):X}\r\n'.encode('ascii') + data + b'\r\n')
+                self.wfile.flush()
+            self.wfile.write(b'0\r\n\r\n')
+        except (BrokenPipeError, ConnectionResetError) as e:
+            print(f"Stream client disconnected: {e}")
+            self.close_connection = True
+        finally:
+            lines.close()
+
+
+def main():
+    server = ThreadingHTTPServer(('0.0.0.0', PORT), T3RequestHandler)
+    print(f"✅ T3 server listening on :{PORT}")
+    server.serve_forever()
+
+
+if __name__ == '__main__':
+    main()
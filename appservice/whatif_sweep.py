@@ -0,0 +1,155 @@
+"""
+What-if / counterfactual sweep
+- 불량 예측 shot에 대해 상위 k개 공정 파라미터를 가이드라인 범위 내에서 grid로 조정
+- 모든 후보를 한 번의 배치 (Scaling → AutoEncoder → GB) 평가로 채점
+- 예측을 뒤집는 후보 중 변화량(z-score 단위 L1 거리)이 가장 작은 설정 반환
+"""
+
+import itertools
+import re
+import time
+import numpy as np
+from typing import Callable, Dict, Any, List, Tuple
+
+# 가이드라인 범위 텍스트 패턴 (예: "650-680°C", "2.0-3.0 m/s")
+RANGE_PATTERN = re.compile(r'(\d+(?:\.\d+)?)\s*-\s*(\d+(?:\.\d+)?)')
+
+# 운전자가 직접 조정 가능한 설정값만 sweep 대상 (Sensor_* 는 측정값)
+CONTROLLABLE_PREFIX = 'Process_'
+
+DEFAULT_TOP_K = 3
+DEFAULT_STEPS = 11
+MAX_CANDIDATES = 50000
+FALLBACK_RANGE_STD = 2.0  # 가이드라인이 없는 feature: 현재값 ± 2σ (scaler 기준)
+
+
+def parse_guideline_ranges(descriptions: Dict[str, Dict[str, Any]]) -> Dict[str, Tuple[float, float]]:
+    """
+    장비 설명 텍스트에서 적정 범위 (min, max) 추출 (lambda_t2_importance.EQUIPMENT_DESCRIPTIONS)
+    """
+    ranges = {}
+    for name, desc in descriptions.items():
+        match = RANGE_PATTERN.search(desc.get('description', ''))
+        if match:
+            low, high = float(match.group(1)), float(match.group(2))
+            ranges[name] = (min(low, high), max(low, high))
+    return ranges
+
+
+def select_sweep_features(contributions: Dict[str, float], top_k: int = DEFAULT_TOP_K) -> List[str]:
+    """
+    불량 방향 기여도(phi > 0)가 큰 순서로 조정 가능한 feature 상위 k개 선택
+    """
+    candidates = [
+        (name, value) for name, value in contributions.items()
+        if name.startswith(CONTROLLABLE_PREFIX) and value > 0
+    ]
+    if not candidates:
+        # 불량 방향 기여가 없으면 |phi| 기준
+        candidates = [
+            (name, abs(value)) for name, value in contributions.items()
+            if name.startswith(CONTROLLABLE_PREFIX)
+        ]
+    return [name for name, _ in sorted(candidates, key=lambda x: x[1], reverse=True)[:top_k]]
+
+
+def build_grid(base: np.ndarray, feature_names: List[str], sweep_features: List[str],
+               ranges: Dict[str, Tuple[float, float]], scale: np.ndarray,
+               steps: int = DEFAULT_STEPS) -> Tuple[np.ndarray, Dict[str, Dict[str, Any]]]:
+    """
+    Sweep 대상 feature들의 full-factorial grid 생성 (나머지 feature는 현재값 고정)
+
+    Args:
+        base: (30,) 현재 raw features
+        scale: (30,) scaler.scale_ (가이드라인이 없는 feature의 범위 계산용)
+
+    Returns:
+        (candidates (n, 30), feature별 sweep 범위 정보)
+    """
+    axes = []
+    sweep_info = {}
+    for name in sweep_features:
+        idx = feature_names.index(name)
+        if name in ranges:
+            low, high = ranges[name]
+            source = 'guideline'
+        else:
+            low = base[idx] - FALLBACK_RANGE_STD * scale[idx]
+            high = base[idx] + FALLBACK_RANGE_STD * scale[idx]
+            source = 'scaler'
+        # 현재값도 후보에 포함 (해당 feature는 변경하지 않는 경우)
+        axes.append(np.unique(np.append(np.linspace(low, high, steps), base[idx])))
+        sweep_info[name] = {'min': float(low), 'max': float(high), 'source': source}
+
+    n_candidates = int(np.prod([len(axis) for axis in axes]))
+    if n_candidates > MAX_CANDIDATES:
+        raise ValueError(f"Too many sweep candidates ({n_candidates} > {MAX_CANDIDATES}), reduce top_k or steps")
+
+    grid = np.array(list(itertools.product(*axes)))
+    candidates = np.repeat(base[None, :], len(grid), axis=0)
+    candidates[:, [feature_names.index(name) for name in sweep_features]] = grid
+    return candidates, sweep_info
+
+
+def run_sweep(base: np.ndarray, feature_names: List[str], sweep_features: List[str],
+              predict_defect_proba: Callable[[np.ndarray], np.ndarray],
+              ranges: Dict[str, Tuple[float, float]], scale: np.ndarray,
+              steps: int = DEFAULT_STEPS, threshold: float = 0.5,
+              max_results: int = 3) -> Dict[str, Any]:
+    """
+    Grid 후보 전체를 한 번에 채점하고 예측이 뒤집히는 최소 변경 설정 반환
+
+    Args:
+        base: (30,) 현재 raw features
+        predict_defect_proba: (n, 30) raw features -> (n,) 불량 확률 (Scaling → AutoEncoder → GB 배치 평가)
+        threshold: 불량 판정 기준 확률
+        max_results: 반환할 최소 변경 후보 수
+
+    Returns:
+        sweep 결과 (counterfactuals: 변화량 오름차순)
+    """
+    sweep_start = time.time()
+    candidates, sweep_info = build_grid(base, feature_names, sweep_features, ranges, scale, steps)
+
+    scoring_start = time.time()
+    defect_proba = np.asarray(predict_defect_proba(candidates), dtype=np.float64)
+    scoring_time = (time.time() - scoring_start) * 1000
+
+    base_proba = float(defect_proba[np.all(candidates == base, axis=1)][0])
+    base_is_defect = base_proba >= threshold
+    flipped = (defect_proba >= threshold) != base_is_defect
+
+    # 변화량: z-score 단위 L1 거리 (단위가 다른 파라미터 간 비교 가능)
+    distance = np.abs((candidates - base) / scale).sum(axis=1)
+
+    counterfactuals = []
+    for i in np.flatnonzero(flipped)[np.argsort(distance[flipped], kind='stable')][:max_results]:
+        changes = [
+            {
+                'feature': name,
+                'from': float(base[idx]),
+                'to': float(candidates[i, idx]),
+                'delta': float(candidates[i, idx] - base[idx])
+            }
+            for name in sweep_features
+            for idx in [feature_names.index(name)]
+            if candidates[i, idx] != base[idx]
+        ]
+        counterfactuals.append({
+            'changes': changes,
+            'defect_proba': float(defect_proba[i]),
+            'distance': float(distance[i])
+        })
+
+    return {
+        'base_defect_proba': base_proba,
+        'base_class': 'defect' if base_is_defect else 'normal',
+        'target_class': 'normal' if base_is_defect else 'defect',
+        'sweep_features': sweep_info,
+        'n_candidates': int(len(candidates)),
+        'n_flipped': int(flipped.sum()),
+        'counterfactuals': counterfactuals,
+        'defect_proba_range': [float(defect_proba.min()), float(defect_proba.max())],
+        'scoring_time_ms': round(scoring_time, 2),
+        'sweep_time_ms': round((time.time() - sweep_start) * 1000, 2)
+    }
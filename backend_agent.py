@@ -35,6 +35,10 @@ LAMBDA_T0_URL = os.getenv("LAMBDA_T0_URL", "https://your-lambda-t0-url.lambda-ur
 LAMBDA_T1_URL = os.getenv("LAMBDA_T1_URL", "https://your-lambda-t1-url.lambda-url.us-east-1.on.aws/")
 LAMBDA_T2_URL = os.getenv("LAMBDA_T2_URL", "https://your-lambda-t2-url.lambda-url.us-east-1.on.aws/")
 LAMBDA_T3_URL = os.getenv("LAMBDA_T3_URL", "https://your-lambda-t3-url.lambda-url.us-east-1.on.aws/")
+LAMBDA_T12_URL = os.getenv("LAMBDA_T12_URL", "https://your-lambda-t12-url.lambda-url.us-east-1.on.aws/")
+# T3 답변을 SSE delta로 중계 (T3 Function URL은 Web Adapter + RESPONSE_STREAM으로 NDJSON 줄을 생성 즉시 전송)
+STREAM_KB_ANSWERS = os.getenv("STREAM_KB_ANSWERS", "true").lower() == "true"
+KB_ANSWER_MODE = os.getenv("KB_ANSWER_MODE", "auto")  # auto: 파라미터 사양 질문은 T3 사양 인덱스로 즉시 응답 (LLM 미사용)
 
 # Bedrock Client
 bedrock_runtime = boto3.client('bedrock-runtime', region_name='us-east-1')
@@ -120,6 +124,25 @@ TOOLS = [
             }
         }
     },
+    {
+        "name": "predict_and_explain",
+        "description": """품질 예측 + 원인 분석 통합 도구. 한 번의 호출로 예측 결과와 주요 영향 변수를 함께 반환합니다.
+사용 시점:
+- 불량 원인, 영향 요인을 물어볼 때 (predict_quality → analyze_feature_importance 순차 호출 대신 사용)
+- "왜 불량이야?", "어떤 변수가 영향을 미쳐?", "예측하고 원인도 알려줘" 등의 질문""",
+        "inputSchema": {
+            "json": {
+                "type": "object",
+                "properties": {
+                    "features": {
+                        "type": "object",
+                        "description": "공정 파라미터 딕셔너리 (센서값들)"
+                    }
+                },
+                "required": ["features"]
+            }
+        }
+    },
     {
         "name": "search_knowledge_base",
         "description": """공정 지식 검색 도구. Knowledge Base에서 관련 문서를 검색합니다.
@@ -151,10 +174,10 @@ SYSTEM_PROMPT = """당신은 다이캐스팅 제조 공정 AI 어시스턴트입
 1. **품질 예측 질문** → predict_quality 호출
    - "불량 가능성은?", "품질 예측해줘"
 
-2. **원인 분석 질문** → predict_quality 먼저 호출 → 결과 확인 후 → analyze_feature_importance 호출
+2. **원인 분석 질문** → predict_and_explain 한 번 호출
    - "왜 불량이야?", "어떤 변수가 영향을 미쳐?"
-   - **중요: 반드시 predict_quality를 먼저 호출하고, 그 결과의 latent_features를 받은 후에 analyze_feature_importance를 호출하세요**
-   - **두 도구를 동시에 호출하지 마세요. 순차적으로 호출해야 합니다.**
+   - 예측 결과와 주요 영향 변수가 함께 반환되므로 predict_quality / analyze_feature_importance를 추가로 호출하지 마세요
+   - 이미 predict_quality를 호출한 뒤라면 그 결과의 latent_features로 analyze_feature_importance를 호출하세요
 
 3. **공정 지식 질문** → search_knowledge_base 호출
    - "권장 범위", "스펙", "해결 방법"
@@ -162,7 +185,7 @@ SYSTEM_PROMPT = """당신은 다이캐스팅 제조 공정 AI 어시스턴트입
 ## 중요 규칙
 - **각 도구는 한 번만 호출하세요. 같은 도구를 여러 번 호출하지 마세요.**
 - **search_knowledge_base 도구를 호출하고 결과를 받으면, 즉시 답변을 종료하세요. 절대 추가 도구를 호출하지 마세요.**
-- analyze_feature_importance는 반드시 predict_quality 호출 후에만 사용하세요
+- analyze_feature_importance는 반드시 predict_quality 호출 후에만 사용하세요 (원인 분석은 predict_and_explain 우선)
 - predict_quality의 응답에서 latent_features 배열을 추출하여 analyze_feature_importance에 전달해야 합니다
 - 한 번에 하나의 도구만 호출하세요 (병렬 호출 금지)
 
@@ -196,6 +219,13 @@ def summarize_tool_result(tool_name: str, result: Dict[str, Any]) -> Dict[str, A
             "top_features": top_features,
             "top_features_percent": result.get("top_features_percent", [])[:10]
         }
+    elif tool_name == "predict_and_explain":
+        # 예측 + 상위 10개 feature만 전달 (latent, chart, equipment_descriptions 제거)
+        return {
+            "prediction": result.get("prediction"),
+            "top_features": result.get("top_features", [])[:10],
+            "top_features_percent": result.get("top_features_percent", [])[:10]
+        }
     elif tool_name == "search_knowledge_base":
         # 상위 3개 결과만 전달
         results = result.get("results", [])[:3]
@@ -237,8 +267,9 @@ def call_lambda_t1_sync(features: Dict[str, float]) -> Dict[str, Any]:
     except Exception as e:
         return {"error": str(e)}
 
-def call_lambda_t2_sync(features: Dict[str, float], latent: List[float]) -> Dict[str, Any]:
-    """Feature Importance Lambda 호출 (IAM 인증)"""
+def call_lambda_t2_sync(features: Dict[str, float], latent: List[float],
+                        prediction: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Feature Importance Lambda 호출 (IAM 인증) - T1 예측 결과가 있으면 함께 전달하여 재예측 생략"""
     if USE_MOCK:
         import random
         feature_names = list(features.keys())
@@ -248,7 +279,12 @@ def call_lambda_t2_sync(features: Dict[str, float], latent: List[float]) -> Dict
         }
     
     try:
-        payload = {"features": features, "latent_features": latent, "top_n": 10}
+        payload = {
+            "features": features, "latent_features": latent, "top_n": 10,
+            "attribution_mode": "shap", "chart_format": "data"
+        }
+        if prediction:
+            payload["prediction"] = prediction
         headers = sign_request(LAMBDA_T2_URL, 'POST', payload)
         response = requests.post(
             LAMBDA_T2_URL,
@@ -264,6 +300,30 @@ def call_lambda_t2_sync(features: Dict[str, float], latent: List[float]) -> Dict
     except Exception as e:
         return {"error": str(e)}
 
+def call_lambda_t12_sync(features: Dict[str, float]) -> Dict[str, Any]:
+    """품질 예측 + 원인 분석 통합 Lambda 호출 (IAM 인증) - T1/T2 이중 호출 대체"""
+    if USE_MOCK:
+        result = call_lambda_t1_sync(features)
+        result.update(call_lambda_t2_sync(features, result["latent_features"], result["prediction"]))
+        return result
+    
+    try:
+        payload = {"features": features, "top_n": 10}
+        headers = sign_request(LAMBDA_T12_URL, 'POST', payload)
+        response = requests.post(
+            LAMBDA_T12_URL,
+            json=payload,
+            headers=headers,
+            timeout=30
+        )
+        data = response.json()
+        body = data.get("body", data)
+        if isinstance(body, str):
+            body = json.loads(body)
+        return body
+    except Exception as e:
+        return {"error": str(e)}
+
 def call_lambda_t3_sync(query: str) -> Dict[str, Any]:
     """Knowledge Base 검색 Lambda 호출 (IAM 인증)"""
     if USE_MOCK:
@@ -273,7 +333,7 @@ def call_lambda_t3_sync(query: str) -> Dict[str, Any]:
         }
     
     try:
-        payload = {"query": query}
+        payload = {"query": query, "answer_mode": KB_ANSWER_MODE}
         headers = sign_request(LAMBDA_T3_URL, 'POST', payload)
         response = requests.post(
             LAMBDA_T3_URL,
@@ -297,43 +357,101 @@ def call_lambda_t3_sync(query: str) -> Dict[str, Any]:
         traceback.print_exc()
         return {"error": str(e)}
 
+def stream_lambda_t3(query: str):
+    """Knowledge Base 검색 Lambda streaming 호출 - T3 NDJSON 이벤트를 도착 순서대로 yield
+    (sources -> delta ... -> done, T3가 JSON 응답을 반환하면 done 이벤트 하나로 변환)"""
+    if USE_MOCK:
+        result = call_lambda_t3_sync(query)
+        yield {"type": "sources", "sources": result["sources"]}
+        for word in result["answer"].split(" "):
+            yield {"type": "delta", "text": word + " "}
+        yield dict(result, type="done")
+        return
+    
+    parts = []
+    try:
+        payload = {"query": query, "stream": True, "answer_mode": KB_ANSWER_MODE}
+        headers = sign_request(LAMBDA_T3_URL, 'POST', payload)
+        with requests.post(LAMBDA_T3_URL, json=payload, headers=headers, timeout=30, stream=True) as response:
+            print(f"🔍 Lambda T3 Stream Status: {response.status_code}")
+            if "ndjson" not in response.headers.get("Content-Type", ""):
+                data = response.json()
+                body = data.get("body", data)
+                if isinstance(body, str):
+                    body = json.loads(body)
+                yield dict(body, type="done")
+                return
+            
+            for line in response.iter_lines(decode_unicode=True):
+                if not line:
+                    continue
+                event = json.loads(line)
+                if event.get("type") == "delta":
+                    parts.append(event.get("text", ""))
+                yield event
+    except Exception as e:
+        print(f"❌ Lambda T3 Stream Error: {str(e)}")
+        yield {"type": "done", "answer": "".join(parts), "error": str(e)}
+
+async def iterate_in_executor(iterator, loop):
+    """동기 generator를 thread pool에서 한 항목씩 읽어 async로 전달"""
+    sentinel = object()
+    while True:
+        item = await loop.run_in_executor(None, next, iterator, sentinel)
+        if item is sentinel:
+            break
+        yield item
+
 # =============================================================================
 # Tool Execution
 # =============================================================================
-def execute_tool(tool_name: str, tool_input: Dict[str, Any], features: Dict[str, float]) -> Dict[str, Any]:
-    """도구 실행"""
+def add_prediction_percent(result: Dict[str, Any]) -> Dict[str, Any]:
+    """예측 확률을 %로 변환 (NaN 방지)"""
+    if "prediction" in result:
+        pred = result["prediction"]
+        if "probability" in pred and isinstance(pred["probability"], (int, float)):
+            pred["probability_percent"] = f"{pred['probability'] * 100:.1f}%"
+        else:
+            pred["probability_percent"] = "0.0%"
+        
+        if "class_probabilities" in pred and isinstance(pred["class_probabilities"], dict):
+            pred["class_probabilities_percent"] = {
+                k: f"{v * 100:.1f}%" if isinstance(v, (int, float)) else "0.0%"
+                for k, v in pred["class_probabilities"].items()
+            }
+    return result
+
+def add_importance_percent(result: Dict[str, Any]) -> Dict[str, Any]:
+    """Feature Importance를 %로 변환 (NaN 방지)"""
+    if "top_features" in result and isinstance(result["top_features"], list):
+        result["top_features_percent"] = [
+            [name, f"{importance * 100:.2f}%" if isinstance(importance, (int, float)) else "0.00%"]
+            for name, importance in result["top_features"]
+        ]
+    return result
+
+def execute_tool(tool_name: str, tool_input: Dict[str, Any], features: Dict[str, float],
+                 prior_results: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
+    """도구 실행 (prior_results: 같은 턴에서 앞서 실행된 도구 결과)"""
     if tool_name == "predict_quality":
         # features는 tool_input에서 가져오거나, 요청의 features 사용
         feat = tool_input.get("features", features)
-        result = call_lambda_t1_sync(feat)
-        
-        # 확률을 %로 변환 (NaN 방지)
-        if "prediction" in result:
-            pred = result["prediction"]
-            if "probability" in pred and isinstance(pred["probability"], (int, float)):
-                pred["probability_percent"] = f"{pred['probability'] * 100:.1f}%"
-            else:
-                pred["probability_percent"] = "0.0%"
-            
-            if "class_probabilities" in pred and isinstance(pred["class_probabilities"], dict):
-                pred["class_probabilities_percent"] = {
-                    k: f"{v * 100:.1f}%" if isinstance(v, (int, float)) else "0.0%"
-                    for k, v in pred["class_probabilities"].items()
-                }
-        return result
+        return add_prediction_percent(call_lambda_t1_sync(feat))
     
     elif tool_name == "analyze_feature_importance":
         feat = tool_input.get("features", features)
         latent = tool_input.get("latent_features", [])
-        result = call_lambda_t2_sync(feat, latent)
-        
-        # Feature Importance를 %로 변환 (NaN 방지)
-        if "top_features" in result and isinstance(result["top_features"], list):
-            result["top_features_percent"] = [
-                [name, f"{importance * 100:.2f}%" if isinstance(importance, (int, float)) else "0.00%"]
-                for name, importance in result["top_features"]
-            ]
-        return result
+        # 앞서 호출된 predict_quality 결과의 확률을 T2에 전달
+        prediction = None
+        for prior in reversed(prior_results or []):
+            if prior.get("tool") in ("predict_quality", "predict_and_explain"):
+                prediction = prior.get("result", {}).get("prediction")
+                break
+        return add_importance_percent(call_lambda_t2_sync(feat, latent, prediction))
+    
+    elif tool_name == "predict_and_explain":
+        feat = tool_input.get("features", features)
+        return add_importance_percent(add_prediction_percent(call_lambda_t12_sync(feat)))
     
     elif tool_name == "search_knowledge_base":
         query = tool_input.get("query", "")
@@ -431,7 +549,7 @@ def run_agent_loop(question: str, features: Dict[str, float], session_id: str =
                     tool_use_id = tool_use["toolUseId"]
                     
                     # 도구 실행
-                    result = execute_tool(tool_name, tool_input, features)
+                    result = execute_tool(tool_name, tool_input, features, tool_results)
                     tool_results.append({
                         "tool": tool_name,
                         "input": tool_input,
@@ -617,14 +735,28 @@ async def agent_event_stream(question: str, features: Dict[str, float], session_
                         yield f"data: {json.dumps({'type': 'tool_start', 'tool': tool_name, 'input': tool_input, 'elapsed': elapsed()}, ensure_ascii=False)}\n\n"
                         await asyncio.sleep(0.1)  # 이벤트 확실히 전송
 
-                        # 도구 실행 (동기)
-                        result = await loop.run_in_executor(
-                            None,
-                            execute_tool,
-                            tool_name,
-                            tool_input,
-                            features
-                        )
+                        # 도구 실행 (동기) - KB 답변은 T3 토큰을 SSE delta로 즉시 중계
+                        if tool_name == "search_knowledge_base" and STREAM_KB_ANSWERS:
+                            result = {}
+                            async for event in iterate_in_executor(stream_lambda_t3(tool_input.get("query", "")), loop):
+                                event_type = event.pop("type", None)
+                                if event_type == "delta":
+                                    yield f"data: {json.dumps({'type': 'ai_response_delta', 'data': {'text': event.get('text', '')}, 'elapsed': elapsed()}, ensure_ascii=False)}\n\n"
+                                elif event_type == "error":
+                                    print(f"❌ Lambda T3 Stream Error: {event.get('message')}")
+                                else:
+                                    result.update(event)
+                            if not result.get("answer"):
+                                result.pop("answer", None)
+                        else:
+                            result = await loop.run_in_executor(
+                                None,
+                                execute_tool,
+                                tool_name,
+                                tool_input,
+                                features,
+                                tool_results_data
+                            )
 
                         # ★ Tool 호출 완료 이벤트 전송
                         yield f"data: {json.dumps({'type': 'tool_end', 'tool': tool_name, 'result': result, 'elapsed': elapsed()}, ensure_ascii=False)}\n\n"
@@ -635,6 +767,10 @@ async def agent_event_stream(question: str, features: Dict[str, float], session_
                             yield f"data: {json.dumps({'type': 't1_result', 'data': result, 'elapsed': elapsed()}, ensure_ascii=False)}\n\n"
                         elif tool_name == "analyze_feature_importance":
                             yield f"data: {json.dumps({'type': 't2_result', 'data': result, 'elapsed': elapsed()}, ensure_ascii=False)}\n\n"
+                        elif tool_name == "predict_and_explain":
+                            # 통합 결과를 기존 T1/T2 카드로 각각 렌더링
+                            yield f"data: {json.dumps({'type': 't1_result', 'data': result, 'elapsed': elapsed()}, ensure_ascii=False)}\n\n"
+                            yield f"data: {json.dumps({'type': 't2_result', 'data': result, 'elapsed': elapsed()}, ensure_ascii=False)}\n\n"
                         elif tool_name == "search_knowledge_base":
                             yield f"data: {json.dumps({'type': 't3_result', 'data': result, 'elapsed': elapsed()}, ensure_ascii=False)}\n\n"
                             # KB 검색 결과는 즉시 반환
@@ -211,8 +211,14 @@
           features,
           latent_features: latentFeatures || [],
           top_n: 10,
-          generate_chart: false
+          generate_chart: true,
+          chart_format: 'data',
+          attribution_mode: 'shap'
         };
+        // T1 예측 결과가 있으면 전달 (T2 재예측 생략)
+        if (lastT1Result && lastT1Result.prediction) {
+          payload.prediction = lastT1Result.prediction;
+        }
         console.log('Calling Lambda T2:', LAMBDA_T2);
         const res = await fetch(LAMBDA_T2, {
           method: 'POST',
@@ -699,7 +705,11 @@
     }
 
     function renderXaiCard(t2Data) {
-      const topFeatures = (t2Data.top_features || []);
+      // chart_format=data 응답이면 bar 데이터를 그대로 사용 (서버 측 이미지 렌더링 없음)
+      const chartData = t2Data.chart_data;
+      const topFeatures = chartData
+        ? chartData.labels.map((name, idx) => [name, chartData.values[idx]])
+        : (t2Data.top_features || []);
       if (!topFeatures.length) return '';
 
       const maxVal = topFeatures[0][1];
@@ -992,6 +1002,10 @@
                   t3Result = data.data;
                   updateStep('search', 'completed', 'Knowledge Base 검색 완료', msgId);
                   renderLiveT3Result(t3Result, msgId);
+                } else if (data.type === 'ai_response_delta') {
+                  // KB 답변 토큰 streaming (최종 ai_response가 전체 답변으로 교체)
+                  aiSummary += data.data?.text || '';
+                  renderLiveAIResponse(aiSummary, msgId);
                 } else if (data.type === 'ai_response') {
                   aiSummary = data.data?.answer || '';
                   renderLiveAIResponse(aiSummary, msgId);
@@ -1053,6 +1067,12 @@
         desc: 'Feature Importance를 분석합니다',
         icon: '<svg width="14" height="14" viewBox="0 0 16 16" fill="none"><path d="M2 12h2V6H2v6zm4 0h2V4H6v8zm4 0h2V8h-2v4zm4 0h2V2h-2v10z" fill="currentColor"/></svg>'
       },
+      'predict_and_explain': {
+        id: 'predict-explain',
+        title: '예측 + 원인 분석 (Lambda T1+T2)',
+        desc: '품질 예측과 Feature Importance를 한 번에 분석합니다',
+        icon: '<svg width="14" height="14" viewBox="0 0 16 16" fill="none"><path d="M2 12h2V6H2v6zm4 0h2V4H6v8zm4 0h2V8h-2v4zm4 0h2V2h-2v10z" fill="currentColor"/></svg>'
+      },
       'search_knowledge_base': {
         id: 'search',
         title: '지식 검색 (Lambda T3)',
@@ -1099,6 +1119,8 @@
         inputSummary = `<div class="tool-input">📊 공정 파라미터 ${Object.keys(input.features || {}).length}개 전송</div>`;
       } else if (toolName === 'analyze_feature_importance') {
         inputSummary = `<div class="tool-input">🔍 Latent Features 24개 분석</div>`;
+      } else if (toolName === 'predict_and_explain') {
+        inputSummary = `<div class="tool-input">📊 공정 파라미터 ${Object.keys(input.features || {}).length}개 예측 + 원인 분석</div>`;
       } else if (toolName === 'search_knowledge_base') {
         inputSummary = `<div class="tool-input">🔎 검색어: "${input.query}"</div>`;
       }
@@ -1206,6 +1228,11 @@
         } else if (toolName === 'analyze_feature_importance') {
           const topN = (result.top_features || []).length;
           resultSummary = `<span class="tool-badge">✅ 완료</span> <span class="step-time">${elapsed}s</span><br/><span class="result-summary">상위 ${topN}개 변수 분석</span>`;
+        } else if (toolName === 'predict_and_explain') {
+          const pred = result.prediction || {};
+          const probPercent = pred.probability_percent || `${(pred.probability * 100).toFixed(1)}%`;
+          const topN = (result.top_features || []).length;
+          resultSummary = `<span class="tool-badge">✅ 완료</span> <span class="step-time">${elapsed}s</span><br/><span class="result-summary">${pred.class === 'defect' ? '불량' : '양품'} 확률 ${probPercent} · 상위 ${topN}개 변수 분석</span>`;
         } else if (toolName === 'search_knowledge_base') {
           const sources = (result.sources || []).length;
           resultSummary = `<span class="tool-badge">✅ 완료</span> <span class="step-time">${elapsed}s</span><br/><span class="result-summary">${sources}개 문서 검색</span>`;
@@ -0,0 +1,156 @@
+"""
+Partial Dependence / ICE 테이블 사전 생성 스크립트
+- 30개 공정 파라미터 각각에 대해 background 샘플 기반 PD/ICE 곡선 계산
+- Scaler → AutoEncoder → Gradient Boosting 전체 경로를 feature별 1회 배치 평가
+- 모델 버전별 JSON artifact로 저장하여 Lambda T2가 요청 시 조회만 하도록 함 (요청별 model sweep 없음)
+
+사용법:
+    python modeloptim/create_partial_dependence.py --model-version v1.4 \
+        --background data/background.csv --upload
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'appservice'))
+
+BUCKET_NAME = 'diecasting-models'
+PARTIAL_DEPENDENCE_KEY = 'models/partial_dependence/{model_version}.json'  # Lambda T2와 동일
+
+
+def compute_partial_dependence(predict_defect_proba, background, feature_names,
+                               grid_points=20, n_ice=20, percentiles=(5, 95)):
+    """
+    Feature별 PD/ICE 테이블 계산
+
+    Args:
+        predict_defect_proba: (n, 30) raw features -> (n,) 불량 확률
+        background: (n_background, 30) raw features
+        grid_points: feature별 grid 점 수 (background 분위수 구간)
+        n_ice: artifact에 저장할 ICE 곡선 수
+
+    Returns:
+        {feature_name: {"grid", "pd", "ice", "pd_range"}}
+    """
+    n_background = len(background)
+    ice_rows = np.linspace(0, n_background - 1, min(n_ice, n_background)).astype(int)
+    tables = {}
+
+    for idx, name in enumerate(feature_names):
+        low, high = np.percentile(background[:, idx], percentiles)
+        grid = np.unique(np.linspace(low, high, grid_points))
+
+        # (grid, background, 30): grid 점마다 background 전체의 해당 feature를 치환 -> 한 번에 평가
+        candidates = np.repeat(background[None, :, :], len(grid), axis=0)
+        candidates[:, :, idx] = grid[:, None]
+        proba = predict_defect_proba(candidates.reshape(-1, background.shape[1])).reshape(len(grid), n_background)
+
+        pd_curve = proba.mean(axis=1)
+        tables[name] = {
+            'grid': np.round(grid, 6).tolist(),
+            'pd': np.round(pd_curve, 6).tolist(),
+            'ice': np.round(proba[:, ice_rows].T, 4).tolist(),
+            'pd_range': round(float(pd_curve.max() - pd_curve.min()), 6)
+        }
+    return tables
+
+
+def load_pipeline(model_dir):
+    """
+    로컬 배포 모델 (deployment_models/)로 배치 불량 확률 함수 생성
+    """
+    import torch
+    from predict_quality import QualityPredictor
+
+    predictor = QualityPredictor(model_dir=model_dir)
+
+    def predict_defect_proba(features, batch_size=20000):
+        proba = []
+        for start in range(0, len(features), batch_size):
+            features_scaled = predictor.scaler.transform(features[start:start + batch_size])
+            with torch.no_grad():
+                latent, _ = predictor.autoencoder.encode(torch.FloatTensor(features_scaled).to(predictor.device))
+            combined = np.hstack([features_scaled, latent.cpu().numpy()])
+            proba.append(predictor.gb_model.predict_proba(combined)[:, 1])
+        return np.concatenate(proba)
+
+    return predictor, predict_defect_proba
+
+
+def load_background(predictor, path, n_background, seed):
+    """
+    Background 샘플 로드 (CSV가 없으면 scaler 분포에서 샘플링)
+    """
+    rng = np.random.default_rng(seed)
+    if path:
+        import pandas as pd
+        background = np.nan_to_num(pd.read_csv(path)[predictor.feature_names].values.astype(np.float64))
+        if len(background) > n_background:
+            background = background[rng.choice(len(background), n_background, replace=False)]
+        return background
+
+    print("⚠️ Background CSV not given, sampling from scaler mean/scale")
+    return predictor.scaler.mean_ + rng.standard_normal((n_background, 30)) * predictor.scaler.scale_
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Partial Dependence / ICE 테이블 생성')
+    parser.add_argument('--model-dir', type=str, default='deployment_models', help='모델 디렉토리 경로')
+    parser.add_argument('--model-version', type=str, default=os.environ.get('MODEL_VERSION', 'v1.4'))
+    parser.add_argument('--background', type=str, help='Background 샘플 CSV (30개 feature 컬럼)')
+    parser.add_argument('--n-background', type=int, default=500)
+    parser.add_argument('--grid-points', type=int, default=20)
+    parser.add_argument('--n-ice', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', type=str, help='결과 저장 경로 (기본: deployment_models/partial_dependence_<version>.json)')
+    parser.add_argument('--upload', action='store_true', help='S3 업로드')
+    args = parser.parse_args()
+
+    predictor, predict_defect_proba = load_pipeline(args.model_dir)
+    background = load_background(predictor, args.background, args.n_background, args.seed)
+
+    print(f"Computing PD/ICE for {len(predictor.feature_names)} features "
+          f"({len(background)} background samples x {args.grid_points} grid points)...")
+    start = time.time()
+    tables = compute_partial_dependence(
+        predict_defect_proba, background, predictor.feature_names, args.grid_points, args.n_ice
+    )
+    print(f"✅ Done in {time.time() - start:.1f}s")
+
+    artifact = {
+        'model_version': args.model_version,
+        'created_at': datetime.utcnow().isoformat(),
+        'n_background': int(len(background)),
+        'grid_points': args.grid_points,
+        'target': 'defect_probability',
+        'features': tables
+    }
+
+    output_path = args.output or os.path.join(args.model_dir, f'partial_dependence_{args.model_version}.json')
+    with open(output_path, 'w', encoding='utf-8') as f:
+        json.dump(artifact, f, separators=(',', ':'))
+    print(f"Saved to {output_path} ({os.path.getsize(output_path) / 1024:.1f} KB)")
+
+    # PD 변화 폭이 큰 feature (모델 반응이 큰 파라미터)
+    print("\nTop response ranges:")
+    for name, table in sorted(tables.items(), key=lambda x: x[1]['pd_range'], reverse=True)[:10]:
+        print(f"  {name:30s} {table['pd_range']:.4f}")
+
+    s3_key = PARTIAL_DEPENDENCE_KEY.format(model_version=args.model_version)
+    if args.upload:
+        import boto3
+        boto3.client('s3').upload_file(output_path, BUCKET_NAME, s3_key)
+        print(f"\n✅ Uploaded to s3://{BUCKET_NAME}/{s3_key}")
+    else:
+        print("\nNext steps:")
+        print(f"   aws s3 cp {output_path} s3://{BUCKET_NAME}/{s3_key}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,41 @@
+"""
+공용 pytest fixture
+"""
+
+import json
+import os
+import sys
+
+import numpy as np
+import pytest
+
+os.environ.setdefault('AWS_DEFAULT_REGION', 'us-east-1')
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'appservice'))
+
+MAPPING_PATH = os.path.join(os.path.dirname(__file__), '..', 'config', 'equipment_sensor_mapping.json')
+
+
+@pytest.fixture(scope='module')
+def t2_local_models():
+    """
+    Lambda T2를 로컬 학습 모델로 구성 (S3 불필요)
+    - 42D (30D scaled + 12D latent) GradientBoosting, 장비 mapping, global cache, SHAP explainer
+    """
+    from sklearn.ensemble import GradientBoostingClassifier
+    from sklearn.preprocessing import StandardScaler
+
+    import lambda_t2_importance as t2
+
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(1000, 42))
+    y = (X[:, 0] + X[:, 5] - X[:, 33] > 0).astype(int)
+    t2.gb_model = GradientBoostingClassifier(n_estimators=30, random_state=0).fit(X, y)
+    t2.scaler = StandardScaler().fit(rng.normal(size=(200, 30)))
+    with open(MAPPING_PATH, encoding='utf-8') as f:
+        t2.equipment_mapping = json.load(f)
+    t2.shap_explainer = None
+    t2.shap_explainer_error = None
+    t2.compile_equipment_matrix(t2.equipment_mapping)
+    t2.build_global_cache()
+    t2.load_explainer()
+    return t2
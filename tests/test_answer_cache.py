@@ -0,0 +1,188 @@
+"""
+Lambda T3 답변 cache 테스트
+"""
+
+import json
+import os
+import sys
+import threading
+
+os.environ.setdefault('AWS_DEFAULT_REGION', 'us-east-1')
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'appservice'))
+
+import answer_cache
+import lambda_t3_rag as t3
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_exact_and_near_duplicate_hits():
+    cache = answer_cache.AnswerCache(similarity=0.75)
+    cache.put('불량의 주요 원인은?', ['a#0-10', 'b#5-20'], 'job-1', '기공과 냉각 불량')
+
+    exact = cache.get('  불량의 주요  원인은 ', ['b#5-20', 'a#0-10'], 'job-1')
+    assert exact['match'] == 'exact' and exact['answer'] == '기공과 냉각 불량'
+
+    near = cache.get('불량 주요 원인은?', ['a#0-10', 'b#5-20'], 'job-1')
+    assert near['match'] == 'similar' and near['similarity'] == 0.8
+
+    assert cache.get('센서 교정 주기는?', ['a#0-10', 'b#5-20'], 'job-1') is None
+    assert cache.get('불량의 주요 원인은?', ['a#0-10'], 'job-1') is None  # 다른 검색 결과
+    assert cache.get('불량의 주요 원인은?', ['a#0-10', 'b#5-20'], 'job-2') is None  # 새 ingestion
+
+
+def test_ttl_and_lru_eviction():
+    clock = FakeClock()
+    cache = answer_cache.AnswerCache(max_entries=2, ttl_seconds=10, clock=clock)
+    cache.put('q1', ['a'], 'v', 'A1')
+    cache.put('q2', ['a'], 'v', 'A2')
+    cache.get('q1', ['a'], 'v')  # q1 최근 사용
+    cache.put('q3', ['a'], 'v', 'A3')  # q2 제거
+
+    assert [key[2] for key in cache.entries] == ['q1', 'q3']
+
+    clock.now = 11
+    assert cache.get('q1', ['a'], 'v') is None
+    assert len(cache.entries) == 0
+
+
+def test_caches_are_thread_safe():
+    # batch 모드처럼 여러 thread가 같은 cache를 조회/저장/제거 (작은 max_entries로 eviction 경합 유발)
+    answers = answer_cache.AnswerCache(max_entries=4, ttl_seconds=0.001)
+    retrievals = answer_cache.TTLCache(max_entries=4, ttl_seconds=0.001)
+    errors = []
+
+    def hammer(worker):
+        try:
+            for i in range(2000):
+                query = f'불량 원인 {(worker + i) % 7}'
+                answers.put(query, ['a'], 'v', 'A')
+                answers.get(query, ['a'], 'v')
+                answers.get(f'불량 원인 {i % 5}', ['a'], 'v')
+                retrievals.put(i % 9, 'R')
+                retrievals.get((worker + i) % 9)
+                if i % 500 == 0:
+                    answers.clear()
+                    retrievals.clear()
+        except Exception as e:
+            errors.append(e)
+
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)  # thread 전환을 자주 일으켜 경합 구간 노출
+    try:
+        threads = [threading.Thread(target=hammer, args=(worker,)) for worker in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        sys.setswitchinterval(interval)
+
+    assert errors == []
+    assert len(answers.entries) <= 4 and len(retrievals.entries) <= 4
+
+
+def test_handler_skips_bedrock_on_cache_hit(monkeypatch):
+    calls = []
+
+    def fake_claude(prompt):
+        calls.append(prompt)
+        return '냉각 시간은 15-20초입니다.'
+
+    monkeypatch.setattr(t3, 'invoke_claude', fake_claude)
+    monkeypatch.setattr(t3, 'get_kb_version', lambda: 'job-1')
+    t3.answers.clear()
+
+    event = {'body': {'query': '냉각 시간 기준은?', 'retriever': 'local'}}
+    first = t3.lambda_handler(event, None)
+    second = t3.lambda_handler({'body': {'query': '냉각 시간 기준은', 'retriever': 'local'}}, None)
+
+    assert json.loads(first['body'])['answer_cache']['status'] == 'miss'
+    body = json.loads(second['body'])
+    assert body['answer_cache']['status'] == 'hit'
+    assert body['answer'] == '냉각 시간은 15-20초입니다.'
+    assert len(calls) == 1
+
+
+def test_kb_version_change_clears_cache(monkeypatch):
+    versions = iter(['job-1', 'job-2'])
+
+    class FakeBody:
+        def read(self):
+            return ('{"job_id": "%s"}' % next(versions)).encode()
+
+    def no_job_access(**kwargs):
+        raise RuntimeError('AccessDenied')
+
+    monkeypatch.setattr(t3.bedrock_agent, 'list_ingestion_jobs', no_job_access)
+    monkeypatch.setattr(t3.s3, 'get_object', lambda **kwargs: {'Body': FakeBody()})
+    monkeypatch.setattr(t3, 'KB_VERSION_TTL_SECONDS', 0)
+    monkeypatch.setattr(t3, 'kb_version', None)
+
+    assert t3.get_kb_version() == 'job-1'
+    t3.answers.put('q', ['a'], 'job-1', 'A')
+    assert t3.get_kb_version() == 'job-2'
+    assert len(t3.answers.entries) == 0
+
+
+def test_kb_retrieval_cached_until_new_ingestion(monkeypatch):
+    calls = []
+
+    def fake_retrieve(**kwargs):
+        calls.append(kwargs)
+        return {'retrievalResults': [{
+            'content': {'text': '냉각수 유량 22-28 L/min'},
+            'score': 0.8,
+            'location': {'s3Location': {'uri': 's3://bucket/cooling.md'}},
+            'metadata': {'x-amz-bedrock-kb-chunk-id': 'c1'}
+        }]}
+
+    jobs = {'id': 'job-1'}
+    monkeypatch.setattr(t3.bedrock_agent_runtime, 'retrieve', fake_retrieve)
+    monkeypatch.setattr(t3.bedrock_agent, 'list_ingestion_jobs',
+                        lambda **kwargs: {'ingestionJobSummaries': [{'ingestionJobId': jobs['id']}]})
+    monkeypatch.setattr(t3, 'KB_VERSION_TTL_SECONDS', 0)
+    monkeypatch.setattr(t3, 'kb_version', None)
+    t3.retrievals.clear()
+
+    first = t3.retrieve_from_knowledge_base('냉각수 유량은?')
+    first[0]['content'] = 'mutated'
+    second = t3.retrieve_from_knowledge_base('  냉각수 유량은 ')
+    assert len(calls) == 1 and second[0]['content'] == '냉각수 유량 22-28 L/min'
+
+    t3.retrieve_from_knowledge_base('냉각수 유량은?', max_results=10)
+    assert len(calls) == 2
+
+    jobs['id'] = 'job-2'  # 새 ingestion 완료
+    t3.retrieve_from_knowledge_base('냉각수 유량은?')
+    assert len(calls) == 3
+
+
+def test_ingestion_start_and_completion_change_kb_version(monkeypatch):
+    state = {'complete': 'job-1', 'stamp': 'job-1'}
+
+    class FakeBody:
+        def read(self):
+            return json.dumps({'job_id': state['stamp']}).encode()
+
+    monkeypatch.setattr(t3.bedrock_agent, 'list_ingestion_jobs',
+                        lambda **kwargs: {'ingestionJobSummaries': [{'ingestionJobId': state['complete']}]})
+    monkeypatch.setattr(t3.s3, 'get_object', lambda **kwargs: {'Body': FakeBody()})
+    monkeypatch.setattr(t3, 'KB_VERSION_TTL_SECONDS', 0)
+    monkeypatch.setattr(t3, 'kb_version', None)
+
+    assert t3.get_kb_version() == 'job-1'
+
+    state['stamp'] = 'job-2'  # T0가 ingestion 시작 (아직 COMPLETE 아님)
+    t3.answers.put('q', ['a'], 'job-1', 'A')
+    assert t3.get_kb_version() == 'job-1+job-2'
+    assert len(t3.answers.entries) == 0
+
+    state['complete'] = 'job-2'  # ingestion 완료
+    assert t3.get_kb_version() == 'job-2'
@@ -0,0 +1,50 @@
+"""
+RAG 프롬프트 context packer 테스트
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'appservice'))
+
+import context_packer
+
+
+def passage(doc_id, start, end, score, text, heading='가이드 > 냉각'):
+    return {'content': text, 'score': score, 'key': doc_id, 'document_id': doc_id,
+            'heading': heading, 'offsets': [start, end]}
+
+
+def test_estimate_tokens_counts_hangul_and_ascii():
+    assert context_packer.estimate_tokens('냉각 시간') == 4 + 1
+    assert context_packer.estimate_tokens('Process_CoolingTime') == 5
+
+
+def test_packs_by_score_and_drops_overlap():
+    docs = [
+        passage('a.md', 0, 100, 1.0, '### 냉각\n냉각 시간은 15-20초'),
+        passage('a.md', 10, 100, 3.0, '냉각수 유량 22-28 L/min'),  # 최고 점수
+        passage('a.md', 20, 90, 2.0, '냉각수 유량 22-28 L/min 유지'),  # 위 passage와 대부분 겹침
+        {'content': '금형 온도 180-220°C', 'score': 0.5, 'uri': 's3://bucket/mold.md'},
+    ]
+
+    packed, stats = context_packer.pack_context(docs, token_budget=500)
+
+    assert [item['doc']['score'] for item in packed] == [3.0, 0.5]
+    assert stats['duplicates'] == 2  # offset 중복 1 + 내용 포함 관계 1
+    assert packed[1]['label'] == 'mold.md'
+
+    text = context_packer.format_context(packed)
+    assert text.startswith('[1] a.md › 가이드 > 냉각\n냉각수 유량')
+    assert 's3://' not in text and '관련도' not in text
+
+
+def test_respects_budget_with_truncation():
+    long_text = '\n'.join(f'{i}. 사출 속도 점검 항목 설명' for i in range(100))
+    docs = [passage('b.md', 0, 10, 2.0, '짧은 문서'), passage('c.md', 0, len(long_text), 1.0, long_text)]
+
+    packed, stats = context_packer.pack_context(docs, token_budget=200)
+
+    assert stats['used_tokens'] <= 200
+    assert stats['truncated'] == 1 and packed[1]['truncated']
+    assert long_text.startswith(packed[1]['text'])
@@ -0,0 +1,53 @@
+"""
+Knowledge Base 검색 benchmark (offline) 테스트
+"""
+
+import json
+import os
+import sys
+
+os.environ.setdefault('AWS_DEFAULT_REGION', 'us-east-1')
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'appservice'))
+
+import kb_benchmark
+import lambda_t3_rag as t3
+
+DOCS_DIR = os.path.join(os.path.dirname(__file__), '..', 'knowledge_base_docs')
+
+
+def test_evaluate_recall_and_reciprocal_rank():
+    results = [
+        {'key': 'other.md', 'heading': '개요'},
+        {'key': 'guide.md', 'heading': '가이드 > 냉각'},
+        {'key': 'spec.md'}  # 문서 단위 결과 (heading 없음)
+    ]
+    targets = [{'document': 'sop/guide.md', 'section': '냉각'}, {'document': 'sensors/spec.md', 'section': '유량'}]
+
+    metrics = kb_benchmark.evaluate(results, targets, ks=(1, 2, 3))
+
+    assert metrics == {'recall@1': 0.0, 'recall@2': 0.5, 'recall@3': 1.0, 'rr': 0.5}
+
+
+def test_offline_benchmark_report(monkeypatch):
+    # offline_retrievers가 교체하는 T3 전역은 테스트 후 복원
+    monkeypatch.setattr(t3, 's3', t3.s3)
+    monkeypatch.setattr(t3, 'retrieve_from_knowledge_base', t3.retrieve_from_knowledge_base)
+
+    with open(kb_benchmark.DEFAULT_GOLD_PATH, 'r', encoding='utf-8') as f:
+        questions = json.load(f)['questions']
+    assert {q['lang'] for q in questions} == {'ko', 'en'}
+
+    retrievers = kb_benchmark.offline_retrievers(DOCS_DIR)
+    assert set(retrievers) == set(kb_benchmark.RETRIEVERS)
+
+    report = kb_benchmark.run_benchmark(questions[:6], retrievers)
+
+    for name in kb_benchmark.RETRIEVERS:
+        summary = report[name]['summary']
+        assert summary['recall@5'] > 0.5 and 0 < summary['mrr'] <= 1
+        assert len(report[name]['queries']) == 6
+    assert report['s3']['queries'][0]['top'][0].endswith('.md')  # S3 직접 검색은 문서 단위
+
+    lines = kb_benchmark.compare_reports({'commit': 'b', 'retrievers': report},
+                                         {'commit': 'a', 'retrievers': report})
+    assert '(+0.000)' in lines[1]
@@ -0,0 +1,103 @@
+"""
+Knowledge Base 카테고리 metadata / 카테고리 필터 검색 테스트
+"""
+
+import io
+import json
+import os
+import sys
+
+os.environ.setdefault('AWS_DEFAULT_REGION', 'us-east-1')
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'appservice'))
+
+import kb_categories
+import lambda_t0_ingest as t0
+import lambda_t3_rag as t3
+
+
+class FakePaginator:
+    def __init__(self, keys):
+        self.keys = keys
+
+    def paginate(self, Bucket):
+        yield {'Contents': [{'Key': key} for key in self.keys]}
+
+
+def test_document_categories_and_sidecar():
+    assert kb_categories.document_categories('process_parameter_guidelines.md') == ['sop', 'quality']
+    assert kb_categories.document_categories('금형온도센서_스펙_가이드.md') == ['sensors']
+    assert kb_categories.metadata_sidecar('defect_analysis.md') == {
+        'metadataAttributes': {'category': ['troubleshooting']}
+    }
+
+
+def test_t0_writes_metadata_sidecars(monkeypatch):
+    written = {}
+    keys = ['sensor_specifications.md', 'kb_version.json', 'notes.md']
+    monkeypatch.setattr(t0.s3, 'get_paginator', lambda name: FakePaginator(keys))
+    monkeypatch.setattr(t0.s3, 'put_object', lambda **kwargs: written.update({kwargs['Key']: kwargs['Body']}))
+
+    assert t0.write_category_metadata() == 1
+    assert json.loads(written['sensor_specifications.md.metadata.json']) == {
+        'metadataAttributes': {'category': ['sensors']}
+    }
+
+
+def test_t0_merges_existing_metadata_sidecars(monkeypatch):
+    existing = {
+        'defect_analysis.md.metadata.json': {'metadataAttributes': {'owner': 'qa', 'revision': 3}},
+        'sensor_specifications.md.metadata.json': {'metadataAttributes': {'category': ['sensors', 'equipment']}}
+    }
+    keys = ['defect_analysis.md', 'sensor_specifications.md'] + list(existing)
+    written = {}
+    monkeypatch.setattr(t0.s3, 'get_paginator', lambda name: FakePaginator(keys))
+    monkeypatch.setattr(t0.s3, 'get_object', lambda Bucket, Key: {
+        'Body': io.BytesIO(json.dumps(existing[Key]).encode('utf-8'))
+    })
+    monkeypatch.setattr(t0.s3, 'put_object', lambda **kwargs: written.update({kwargs['Key']: kwargs['Body']}))
+
+    assert t0.write_category_metadata() == 1
+    assert json.loads(written['defect_analysis.md.metadata.json']) == {
+        'metadataAttributes': {'owner': 'qa', 'revision': 3, 'category': ['troubleshooting']}
+    }
+    assert 'sensor_specifications.md.metadata.json' not in written  # 수동 category 유지
+
+
+def test_kb_retrieve_passes_category_filter(monkeypatch):
+    calls = []
+
+    def fake_retrieve(**kwargs):
+        calls.append(kwargs['retrievalConfiguration']['vectorSearchConfiguration'])
+        return {'retrievalResults': []}
+
+    monkeypatch.setattr(t3.bedrock_agent_runtime, 'retrieve', fake_retrieve)
+    monkeypatch.setattr(t3, 'get_kb_version', lambda: 'v1')
+
+    t3.retrieve_from_knowledge_base('센서 교정 주기', category='sensors')
+
+    assert calls[0]['filter'] == {'listContains': {'key': 'category', 'value': 'sensors'}}
+
+
+def test_category_filter_falls_back_when_recall_is_low():
+    calls = []
+
+    def retrieve(category):
+        calls.append(category)
+        return [] if category else [{'content': 'x'}, {'content': 'y'}]
+
+    results, info = t3.retrieve_with_category(retrieve, 'safety')
+
+    assert calls == ['safety', None] and len(results) == 2
+    assert info == {'category': 'safety', 'filtered_count': 0, 'fallback': True}
+
+
+def test_local_prefilter_shrinks_candidates():
+    index = t3.load_local_index()
+    mask = index.category_mask(t3.DOCUMENT_PATTERNS['sensors'])
+
+    filtered = index.score('온도 범위', mask)
+    unfiltered = index.score('온도 범위')
+
+    assert 0 < (filtered > 0).sum() < (unfiltered > 0).sum()
+    assert not filtered[~mask].any()
+    assert all('sensor' in p['key'] or '센서' in p['key'] for p in index.search('온도 범위', 5, mask))
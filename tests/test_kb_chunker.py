@@ -0,0 +1,50 @@
+"""
+Knowledge Base markdown chunker 테스트
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'appservice'))
+
+import kb_chunker
+
+DOCS_DIR = os.path.join(os.path.dirname(__file__), '..', 'knowledge_base_docs')
+
+TABLE = '| 파라미터 | 최소값 | 최대값 |\n|---|---|---|\n' + ''.join(f'| 항목{i} | {i} | {i + 10} |\n' for i in range(8))
+
+
+def test_sections_keep_heading_breadcrumb():
+    text = '# 문서\n\n## 1. 온도\n### 1.1 용탕\n650-680°C\n\n## 2. 압력\n120 MPa\n'
+    passages = kb_chunker.chunk_document(text)
+
+    assert [p['heading'] for p in passages] == ['문서 > 1. 온도 > 1.1 용탕', '문서 > 2. 압력']
+    assert text[passages[0]['start']:passages[0]['end']] == '### 1.1 용탕\n650-680°C\n'
+
+
+def test_table_kept_whole_within_budget():
+    text = '## 표\n설명 문장입니다.\n\n' + TABLE
+    passages = kb_chunker.chunk_document(text, max_chars=len(TABLE) + 5, overlap_chars=0)
+
+    assert any(text[p['start']:p['end']] == TABLE for p in passages)
+
+
+def test_size_budget_and_line_overlap():
+    text = '## 긴 섹션\n' + ''.join(f'{i:02d}번째 줄의 내용입니다.\n' for i in range(40))
+    passages = kb_chunker.chunk_document(text, max_chars=200, overlap_chars=60)
+
+    assert len(passages) > 1
+    assert all(p['end'] - p['start'] <= 200 for p in passages)
+    # 연속 chunk는 겹치고, 전체 본문을 빠짐없이 덮음
+    for prev, nxt in zip(passages, passages[1:]):
+        assert nxt['start'] < prev['end'] and nxt['start'] > prev['start']
+    assert passages[0]['start'] == 0 and passages[-1]['end'] == len(text)
+
+
+def test_real_docs_reach_deep_sections():
+    with open(os.path.join(DOCS_DIR, 'regulations', 'safety_regulations.md'), encoding='utf-8') as f:
+        text = f.read()
+    passages = kb_chunker.chunk_document(text)
+
+    assert all(p['end'] - p['start'] <= kb_chunker.DEFAULT_MAX_CHARS for p in passages)
+    assert passages[-1]['end'] >= len(text.rstrip())
@@ -0,0 +1,76 @@
+"""
+Knowledge Base 추출형 답변 테스트
+"""
+
+import json
+import os
+import sys
+
+os.environ.setdefault('AWS_DEFAULT_REGION', 'us-east-1')
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'appservice'))
+
+import kb_extractive
+import kb_index
+import lambda_t3_rag as t3
+
+TEXT = """# 공정 가이드
+
+## 온도 파라미터
+
+| 파라미터 | 최소값 | 최대값 | 단위 |
+|----------|--------|--------|------|
+| 금형 온도 (Temperature2) | 150 | 220 | °C |
+| 용탕 온도 (Temperature1) | 650 | 700 | °C |
+
+## 균열 (Crack)
+
+**원인**:
+- 금형 온도 과다
+- 취출 시기 부적절
+
+## 냉각
+
+냉각 시간은 15-20초가 적정합니다. 냉각수 유량은 별도 관리합니다.
+"""
+
+
+def build_index():
+    return kb_index.BM25Index.build([{'key': 'guide.md', 'path': 'guide.md', 'category': 'test',
+                                      'title': '공정 가이드', 'text': TEXT}])
+
+
+def test_extract_units_tables_lists_sentences():
+    units = kb_extractive.extract_units(TEXT)
+
+    assert '금형 온도 (Temperature2) — 최소값 150, 최대값 220, 단위 °C' in units
+    assert '원인 › 금형 온도 과다' in units
+    assert '냉각 시간은 15-20초가 적정합니다.' in units
+    assert '냉각수 유량은 별도 관리합니다.' in units
+
+
+def test_strip_particles():
+    assert kb_extractive.strip_particles('불량의 주요 원인은?') == '불량 주요 원인?'
+
+
+def test_extract_answer_cites_sources():
+    result = kb_extractive.extract_answer(build_index(), '금형 온도 최대값은?', max_units=1)
+
+    assert result['units'][0]['text'].startswith('금형 온도 (Temperature2)')
+    assert result['answer'].splitlines()[2].endswith('[1]')
+    assert '[1] guide.md › 공정 가이드 > 온도 파라미터' in result['answer']
+    assert kb_extractive.extract_answer(build_index(), '존재하지않는질문') is None
+
+
+def test_handler_extractive_mode_skips_bedrock(monkeypatch):
+    def fail(*args, **kwargs):
+        raise AssertionError('Bedrock should not be called')
+
+    monkeypatch.setattr(t3, 'invoke_claude', fail)
+    monkeypatch.setattr(t3, 'retrieve_from_knowledge_base', fail)
+
+    result = t3.lambda_handler({'body': {'query': '금형 온도 권장값', 'answer_mode': 'extractive'}}, None)
+    body = json.loads(result['body'])
+
+    assert body['answer_mode'] == 'extractive' and body['retriever'] == 'local'
+    assert '금형 온도 (Temperature2)' in body['answer']
+    assert body['sources'][0]['source_type'] == 'local_index'
@@ -0,0 +1,75 @@
+"""
+Knowledge Base 로컬 BM25 인덱스 테스트
+"""
+
+import math
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'appservice'))
+
+import kb_index
+
+DOCS_DIR = os.path.join(os.path.dirname(__file__), '..', 'knowledge_base_docs')
+
+DOCUMENTS = [
+    {'key': 'cooling.md', 'text': '# 냉각 가이드\n냉각 시간은 15-20초가 적정합니다. Process_CoolingTime'},
+    {'key': 'sensor.md', 'text': '# 센서 사양\nSensor_Temperature1 정확도 ±2°C, 교정 주기 월 1회'},
+    {'key': 'safety.md', 'text': '# 안전 규정\n보호구 착용 필수. 용탕 취급 시 안전 수칙 준수'},
+]
+for doc in DOCUMENTS:
+    doc.update(path=doc['key'], category='test', title=doc['text'].splitlines()[0][2:])
+
+
+def test_tokenize_korean_bigrams_and_english_words():
+    assert kb_index.tokenize('냉각시간 Process_CoolingTime 2.5') == ['냉각', '각시', '시간', 'process', 'coolingtime', '2.5']
+    assert kb_index.tokenize('온도 및') == ['온도', '및']
+
+
+def test_bm25_scores_match_formula():
+    index = kb_index.BM25Index.build(DOCUMENTS)
+    scores = index.score('냉각')
+
+    n_docs, df = 3, 1
+    idf = math.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+    tf = kb_index.tokenize(kb_index.passage_index_text(DOCUMENTS[0], index.passages[0])).count('냉각')
+    assert tf == 3  # heading breadcrumb 포함
+    dl, avgdl = index.doc_lengths[0], index.avg_doc_length
+    expected = idf * tf * (1.2 + 1) / (tf + 1.2 * (1 - 0.75 + 0.75 * dl / avgdl))
+
+    assert math.isclose(scores[0], expected)
+    assert scores[1] == scores[2] == 0
+
+
+def test_search_ranking_and_category_mask():
+    index = kb_index.BM25Index.build(DOCUMENTS)
+
+    assert [r['key'] for r in index.search('센서 교정 주기')] == ['sensor.md']
+    assert index.search('용탕 안전', top_k=1)[0]['key'] == 'safety.md'
+    assert index.search('센서', mask=index.category_mask(['safety'])) == []
+    assert index.search('없는단어') == []
+
+
+def test_save_load_roundtrip(tmp_path):
+    index = kb_index.BM25Index.build(DOCUMENTS)
+    path = str(tmp_path / 'index.json')
+    index.save(path)
+
+    loaded = kb_index.BM25Index.load(path)
+    assert loaded.search('냉각 시간') == index.search('냉각 시간')
+
+
+def test_prebuilt_index_matches_docs():
+    """appservice/kb_index.json이 knowledge_base_docs/와 동기화되어 있는지 확인 (kb_index.py build 재실행 필요 여부)"""
+    prebuilt = kb_index.BM25Index.load(kb_index.DEFAULT_INDEX_PATH)
+    rebuilt = kb_index.BM25Index.build(kb_index.load_documents(DOCS_DIR))
+    assert prebuilt.to_dict() == rebuilt.to_dict()
+
+
+def test_search_returns_best_section_passage():
+    text = '# 매뉴얼\n\n## 1. 개요\n일반 설명입니다.\n\n## 2. 냉각\n냉각수 유량은 22-28 L/min\n\n## 3. 안전\n보호구 착용\n'
+    index = kb_index.BM25Index.build([{'key': 'm.md', 'path': 'm.md', 'category': 'test', 'title': '매뉴얼', 'text': text}])
+
+    result = index.search('냉각수 유량')[0]
+    assert result['heading'] == '매뉴얼 > 2. 냉각'
+    assert result['text'] == text[result['start']:result['end']] == '## 2. 냉각\n냉각수 유량은 22-28 L/min\n'
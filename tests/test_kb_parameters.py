@@ -0,0 +1,139 @@
+"""
+Knowledge Base 파라미터 사양 인덱스 테스트
+"""
+
+import json
+import os
+import sys
+
+os.environ.setdefault('AWS_DEFAULT_REGION', 'us-east-1')
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'appservice'))
+
+import kb_index
+import kb_parameters
+import lambda_t3_rag as t3
+from feature_names import FEATURE_NAMES
+
+DOCS_DIR = os.path.join(os.path.dirname(__file__), '..', 'knowledge_base_docs')
+
+TEXT = """# 가이드
+
+## 온도 파라미터
+
+| 파라미터 | 최소값 | 권장값 | 최대값 | 단위 |
+|----------|--------|--------|--------|------|
+| 금형 온도 (Temperature2) | 150 | 180 | 220 | °C |
+
+## 권장 금형 온도
+
+| 부위 | 온도 범위 | 비고 |
+|------|----------|------|
+| 고정측 | 180-220°C | 주 캐비티 |
+
+### 1.1 Sensor_Temperature1 (용탕 온도)
+- **측정 범위**: 600-750°C
+- **정확도**: ±2°C
+- 온도 편차: ±5°C
+"""
+
+
+def build_index():
+    return kb_parameters.build_parameter_index([{'path': 'guide.md', 'text': TEXT}], FEATURE_NAMES)
+
+
+def test_parses_tables_and_spec_lists():
+    parameters = build_index()['parameters']
+
+    guideline, normal = parameters['Process_MoldTemperature']
+    assert guideline == {'kind': 'guideline', 'min': 150.0, 'max': 220.0, 'unit': '°C', 'recommended': 180.0,
+                         'label': '금형 온도 (Temperature2)', 'source': 'guide.md', 'heading': '가이드 > 온도 파라미터'}
+    assert (normal['kind'], normal['min'], normal['max'], normal['label']) == ('normal', 180.0, 220.0, '고정측')
+
+    kinds = {entry['kind']: (entry['min'], entry['max']) for entry in parameters['Sensor_Temperature1']}
+    assert kinds == {'measurement': (600.0, 750.0), 'accuracy': (-2.0, 2.0)}  # 허용 편차(±5)는 제외
+
+
+def test_answer_and_ranges():
+    index = kb_parameters.ParameterIndex(build_index())
+
+    result = index.answer('금형 온도 권장 범위는?')
+    assert list(result['parameters']) == ['Process_MoldTemperature']
+    assert '150-220 °C, 권장 180 °C — guide.md › 온도 파라미터' in result['answer']
+
+    assert '±2 °C' in index.answer('Sensor_Temperature1 정확도')['answer']
+    assert index.answer('금형 온도가 높으면 어떤 불량이 생기나요?') is None
+    assert kb_parameters.is_spec_query('금형 표면 온도 권장 범위')  # 명사 '표면'은 조건 표현 아님
+    assert index.ranges()['Process_MoldTemperature'] == (150.0, 220.0)
+
+
+def test_causal_questions_are_not_spec_lookups():
+    index = kb_parameters.ParameterIndex(build_index())
+
+    for query in ['금형 온도가 기준보다 높으면 어떤 불량이 생기나요?', '용탕 온도를 몇 도 낮추면 포로시티가 줄어드나요?',
+                  '사출 속도 범위를 벗어나면 왜 기공이 생기나요?', '금형 온도 범위를 넘으면?']:
+        assert not kb_parameters.is_spec_query(query), query
+        assert index.answer(query) is None
+    assert kb_parameters.is_spec_query('냉각수 유량 정상 범위')
+
+
+def test_natural_language_sensor_and_english_queries():
+    index = kb_parameters.ParameterIndex.load(kb_parameters.DEFAULT_INDEX_PATH)
+
+    for query in ['Temperature1 센서 정확도', 'Temperature1 정확도', '온도 센서 1 정확도', '용탕 온도 센서 정확도는?',
+                  'accuracy of temperature sensor 1']:
+        result = index.answer(query)
+        assert list(result['parameters']) == ['Sensor_Temperature1'], query
+        assert all(entry['kind'] == 'accuracy' for entry in result['parameters']['Sensor_Temperature1'])
+        assert '±2 °C' in result['answer']
+
+    result = index.answer('recommended mold temperature range')
+    assert list(result['parameters']) == ['Process_MoldTemperature']
+    assert index.answer('Cooling Time range') is not None  # 대소문자 무시
+
+    for query in ['Why does mold temperature out of range cause defects?',
+                  'If mold temperature exceeds the recommended range, what happens?']:
+        assert index.answer(query) is None, query
+
+
+def test_sensor_sections_keyed_to_sensor_features():
+    parameters = kb_parameters.ParameterIndex.load(kb_parameters.DEFAULT_INDEX_PATH).parameters
+
+    # "Temperature1 - 용탕 온도 센서" section의 정확도는 센서 항목 (공정 파라미터 용탕 온도가 아님)
+    assert not any(entry['kind'] == 'accuracy' for name in ('Process_Temperature', 'Process_MeltTemperature')
+                   for entry in parameters[name])
+    assert any(entry['heading'].endswith('Temperature1 - 용탕 온도 센서') for entry in parameters['Sensor_Temperature1'])
+
+
+def test_committed_index_matches_documents():
+    documents = kb_index.load_documents(DOCS_DIR)
+    with open(kb_parameters.DEFAULT_INDEX_PATH, 'r', encoding='utf-8') as f:
+        committed = json.load(f)
+
+    assert committed == kb_parameters.build_parameter_index(documents, FEATURE_NAMES)
+
+
+def test_handler_spec_mode_skips_retrieval(monkeypatch):
+    def fail(*args, **kwargs):
+        raise AssertionError('retrieval / Bedrock should not be called')
+
+    monkeypatch.setattr(t3, 'invoke_claude', fail)
+    monkeypatch.setattr(t3, 'retrieve_from_knowledge_base', fail)
+
+    result = t3.lambda_handler({'body': {'query': '냉각 시간 적정 범위', 'answer_mode': 'auto'}}, None)
+    body = json.loads(result['body'])
+
+    assert body['answer_mode'] == 'spec' and body['retriever'] == 'parameter_index'
+    assert 'Process_CoolingTime' in body['answer']
+    assert body['sources'][0]['source_type'] == 'parameter_index'
+
+
+def test_handler_auto_mode_generates_causal_answers(monkeypatch):
+    monkeypatch.setattr(t3, 'invoke_claude', lambda prompt: '생성형 답변')
+    monkeypatch.setattr(t3, 'get_kb_version', lambda: 'job-1')
+
+    body = {'query': '사출 속도 범위를 벗어나면 왜 기공이 생기나요?', 'answer_mode': 'auto', 'retriever': 'local',
+            'use_cache': False}
+    result = json.loads(t3.lambda_handler({'body': body}, None)['body'])
+
+    assert result['answer_mode'] == 'generative' and result['retriever'] == 'local'
+    assert result['answer'] == '생성형 답변'
@@ -0,0 +1,104 @@
+"""
+검색 결과 local rerank 테스트
+"""
+
+import io
+import json
+import os
+import sys
+
+os.environ.setdefault('AWS_DEFAULT_REGION', 'us-east-1')
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'appservice'))
+
+import context_packer
+import kb_parameters
+import kb_rerank
+import lambda_t3_rag as t3
+
+ALIAS_TABLE = kb_parameters.build_alias_table(['Process_Temperature', 'Sensor_Flow'])
+
+
+def test_min_window():
+    positions = [(0, 'a'), (3, 'b'), (10, 'a'), (11, 'c'), (12, 'b')]
+
+    assert kb_rerank.min_window(positions, 3) == 3
+    assert kb_rerank.min_window(positions, 2) == 2
+    assert kb_rerank.min_window([], 2) == 0
+
+
+def test_rerank_promotes_heading_and_feature_match():
+    docs = [
+        {'content': '작업 일지 양식과 보고 절차', 'heading': '문서 관리'},
+        {'content': '냉각수 유량은 8-12 L/min 범위로 관리한다', 'heading': '센서 사양 > 냉각수 유량'},
+        {'content': '금형 교체 후 예열 절차', 'heading': '금형 관리'}
+    ]
+
+    ranked, stats = kb_rerank.rerank('냉각수 유량 정상 범위', docs, ALIAS_TABLE, cutoff=0)
+
+    assert ranked[0]['heading'] == '센서 사양 > 냉각수 유량'
+    assert ranked[0]['rerank_score'] > ranked[1]['rerank_score']
+    assert stats['candidates'] == stats['scored'] == stats['kept'] == 3 and not stats['budget_exceeded']
+
+
+def test_rerank_cutoff_keeps_minimum():
+    docs = [{'content': '관련 없는 내용', 'heading': '기타'}, {'content': '다른 내용', 'heading': '부록'}]
+
+    ranked, stats = kb_rerank.rerank('냉각수 유량', docs, cutoff=0.9)
+    assert len(ranked) == 1 and stats['dropped'] == 1
+
+    ranked, stats = kb_rerank.rerank('냉각수 유량', docs, cutoff=0.9, min_keep=0)
+    assert ranked == [] and stats['kept'] == 0
+
+
+def test_rerank_time_budget_keeps_unscored_in_order():
+    ticks = iter(range(0, 1000, 5))  # 호출마다 5 ms 경과
+    docs = [{'content': f'문서 {i}', 'heading': f'{i}'} for i in range(5)]
+
+    ranked, stats = kb_rerank.rerank('문서', docs, time_budget_ms=12, cutoff=0,
+                                     clock=lambda: next(ticks) / 1000)
+
+    assert stats['budget_exceeded'] and stats['scored'] == 2 and stats['kept'] == 5
+    assert [doc['heading'] for doc in ranked[2:]] == ['2', '3', '4']
+    assert 'rerank_score' not in ranked[-1]
+
+
+class FakeBedrock:
+    def __init__(self):
+        self.prompts = []
+
+    def invoke_model(self, modelId, body):
+        self.prompts.append(json.loads(body)['messages'][0]['content'])
+        answer = {'content': [{'text': '답변'}]}
+        return {'body': io.BytesIO(json.dumps(answer).encode('utf-8'))}
+
+
+def test_handler_reranks_before_generation(monkeypatch):
+    client = FakeBedrock()
+    monkeypatch.setattr(t3, 'bedrock_runtime', client)
+    monkeypatch.setattr(t3, 'get_kb_version', lambda: 'job-1')
+    t3.answers.clear()
+
+    def call(**body):
+        result = t3.lambda_handler({'body': dict(query='용해로 권장 운전 조건', retriever='local', use_cache=False, **body)},
+                                   None)
+        return json.loads(result['body'])
+
+    reranked, plain = call(), call(rerank=False)
+
+    assert 'rerank' not in plain
+    assert reranked['rerank']['scored'] == reranked['rerank']['candidates']
+    assert reranked['rerank']['dropped'] > 0
+    assert '권장 운전 조건' in reranked['sources'][0]['heading']
+    assert len(client.prompts[0]) < len(client.prompts[1])  # 생성 모델에 더 적은 passage 전달
+
+
+def test_rerank_order_survives_context_packing():
+    query = '금형 온도 권장 범위'
+    docs = t3.retrieve_from_local_index(query)
+
+    reranked, _ = t3.rerank_results(query, docs)
+    packed, _ = context_packer.pack_context(reranked, token_budget=100000)
+
+    assert [item['doc']['rerank_score'] for item in packed] == [doc['rerank_score'] for doc in reranked]
+    assert [item['doc'].get('heading') for item in packed] != [doc.get('heading') for doc in
+                                                                sorted(docs, key=lambda d: d['score'], reverse=True)]
@@ -0,0 +1,67 @@
+"""
+Knowledge Base 로컬 vector 인덱스 테스트
+"""
+
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'appservice'))
+
+import kb_index
+import kb_vector
+
+DOCS_DIR = os.path.join(os.path.dirname(__file__), '..', 'knowledge_base_docs')
+
+
+def make_passage_index():
+    documents = [
+        {'key': 'a.md', 'path': 'a.md', 'category': 'test', 'title': 'A',
+         'text': '# 냉각\n냉각수 유량과 냉각 시간 관리\n\n# 안전\n보호구 착용 규정\n'},
+        {'key': 'b.md', 'path': 'b.md', 'category': 'test', 'title': 'B',
+         'text': '# 센서\nSensor_Temperature1 교정 절차\n'},
+    ]
+    return kb_index.BM25Index.build(documents)
+
+
+def test_hashing_embedder_is_deterministic_and_normalized():
+    embedder = kb_vector.HashingEmbedder(dim=64)
+    vectors = embedder.embed(['냉각 시간', '냉각 시간', ''])
+
+    np.testing.assert_array_equal(vectors[0], vectors[1])
+    assert vectors.dtype == np.float32
+    assert np.isclose(np.linalg.norm(vectors[0]), 1.0)
+    assert not vectors[2].any()
+
+
+def test_search_matches_bruteforce_cosine():
+    passage_index = make_passage_index()
+    index = kb_vector.VectorIndex.build(passage_index, kb_vector.HashingEmbedder(dim=128))
+
+    query = '냉각수 유량'
+    expected = index.embeddings @ index.embedder.embed([query])[0]
+    results = index.search(query, top_k=2)
+
+    assert results[0]['heading'] == '냉각'
+    assert [r['score'] for r in results] == sorted(expected[expected > 0], reverse=True)[:2]
+
+
+def test_save_load_memory_maps(tmp_path):
+    passage_index = make_passage_index()
+    index = kb_vector.VectorIndex.build(passage_index, kb_vector.HashingEmbedder(dim=128))
+    vectors_path, manifest_path = str(tmp_path / 'v.npy'), str(tmp_path / 'v.json')
+    index.save(vectors_path, manifest_path)
+
+    loaded = kb_vector.VectorIndex.load(passage_index, vectors_path, manifest_path)
+    assert isinstance(loaded.embeddings, np.memmap)
+    assert loaded.embedder.dim == 128
+    assert loaded.search('보호구') == index.search('보호구')
+
+
+def test_prebuilt_vectors_match_index():
+    """appservice/kb_vectors.npy가 kb_index.json passage와 동기화되어 있는지 확인 (kb_vector.py build 재실행 필요 여부)"""
+    passage_index = kb_index.BM25Index.load(kb_index.DEFAULT_INDEX_PATH)
+    prebuilt = kb_vector.VectorIndex.load(passage_index)
+    rebuilt = kb_vector.VectorIndex.build(passage_index, prebuilt.embedder)
+    np.testing.assert_allclose(prebuilt.embeddings, rebuilt.embeddings, atol=1e-6)
@@ -0,0 +1,65 @@
+"""
+Partial Dependence artifact 생성 및 Lambda T2 조회 테스트
+"""
+
+import io
+import json
+import os
+import sys
+
+import numpy as np
+
+os.environ.setdefault('AWS_DEFAULT_REGION', 'us-east-1')
+ROOT = os.path.join(os.path.dirname(__file__), '..')
+sys.path.insert(0, os.path.join(ROOT, 'appservice'))
+sys.path.insert(0, os.path.join(ROOT, 'modeloptim'))
+
+from create_partial_dependence import compute_partial_dependence
+
+import lambda_t2_importance as t2
+
+
+def linear_proba(features):
+    return 1.0 / (1.0 + np.exp(-(features[:, 0] - features[:, 1])))
+
+
+def test_pd_matches_bruteforce_mean():
+    background = np.random.default_rng(0).normal(size=(50, 30))
+    tables = compute_partial_dependence(linear_proba, background, t2.FEATURE_NAMES, grid_points=7, n_ice=5)
+
+    table = tables['Process_Temperature']
+    assert len(table['grid']) == 7 and len(table['ice']) == 5
+    for value, pd_value in zip(table['grid'], table['pd']):
+        replaced = background.copy()
+        replaced[:, 0] = value
+        assert pd_value == np.round(linear_proba(replaced).mean(), 6)
+    # 모델이 사용하지 않는 feature는 평탄한 곡선
+    assert tables['Sensor_Voltage']['pd_range'] == 0.0
+
+
+def test_t2_serves_artifact_lookup(monkeypatch):
+    background = np.random.default_rng(1).normal(size=(20, 30))
+    artifact = {
+        'model_version': t2.MODEL_VERSION,
+        'n_background': 20,
+        'features': compute_partial_dependence(linear_proba, background, t2.FEATURE_NAMES, grid_points=5, n_ice=3)
+    }
+    requested = []
+
+    def get_object(Bucket, Key):
+        requested.append(Key)
+        return {'Body': io.BytesIO(json.dumps(artifact).encode())}
+
+    monkeypatch.setattr(t2.s3, 'get_object', get_object)
+    monkeypatch.setattr(t2, 'partial_dependence', None)
+    monkeypatch.setattr(t2, 'partial_dependence_error', None)
+
+    for _ in range(2):
+        result = t2.lambda_handler({'body': {'action': 'partial_dependence',
+                                             'features': ['Process_Temperature', 'Unknown']}}, None)
+        body = json.loads(result['body'])
+
+    assert requested == [f'models/partial_dependence/{t2.MODEL_VERSION}.json']
+    assert body['available'] and list(body['curves']) == ['Process_Temperature']
+    assert 'ice' not in body['curves']['Process_Temperature']
+    assert body['missing_features'] == ['Unknown']
@@ -0,0 +1,94 @@
+"""
+Lambda T12 (predict-and-explain) 테스트 - 로컬 모델 사용, T1 예측 / T2 attribution과 결과 비교
+(AutoEncoder는 PyTorch 필요 - 미설치 환경에서는 skip)
+"""
+
+import json
+import os
+import shutil
+import sys
+
+import numpy as np
+import pytest
+
+pytest.importorskip('torch')
+
+os.environ.setdefault('AWS_DEFAULT_REGION', 'us-east-1')
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'appservice'))
+
+from sklearn.ensemble import GradientBoostingClassifier
+from sklearn.preprocessing import StandardScaler
+
+import lambda_t12_predict_explain as t12
+import lambda_t1_predict as t1
+import lambda_t2_importance as t2
+from autoencoder_model_lambda import AutoEncoder
+
+ROOT = os.path.join(os.path.dirname(__file__), '..')
+LOCAL_OBJECTS = {
+    t2.EQUIPMENT_MAPPING_KEY: os.path.join(ROOT, 'config', 'equipment_sensor_mapping.json'),
+    t2.PARAMETER_RANGES_KEY: os.path.join(ROOT, 'appservice', 'parameter_ranges.json')
+}
+
+
+class LocalS3:
+    """T2 설정 파일 download_file을 저장소 파일 복사로 대체"""
+
+    def download_file(self, Bucket, Key, Filename):
+        shutil.copyfile(LOCAL_OBJECTS[Key], Filename)
+
+
+@pytest.fixture(scope='module', autouse=True)
+def local_models():
+    rng = np.random.default_rng(0)
+    X = rng.normal(loc=100.0, scale=10.0, size=(500, 30))
+    scaler = StandardScaler().fit(X)
+    autoencoder = AutoEncoder(input_dim=30, latent_dim=12)
+    autoencoder.eval()
+
+    t1.autoencoder_model, t1.scaler = autoencoder, scaler
+    latent, scaled = t1.generate_latent_features(X)
+    combined = np.concatenate([scaled, latent], axis=1)
+    y = (scaled[:, 0] + scaled[:, 6] > 0).astype(int)
+    t1.gb_model = GradientBoostingClassifier(n_estimators=30, random_state=0).fit(combined, y)
+
+    # T2 Lambda도 같은 모델/scaler로 구성 (T1 → T2 경로 비교용)
+    t2.s3 = LocalS3()
+    t2.gb_model, t2.scaler = t1.gb_model, scaler
+    t2.shap_explainer, t2.shap_explainer_error = None, None
+    t2.load_explainer()
+    t12.explainer = None
+    t12.load_models()
+    return X
+
+
+def call(handler, body):
+    result = handler({'body': body}, None)
+    assert result['statusCode'] == 200
+    return json.loads(result['body'])
+
+
+def test_fused_response_matches_t1_and_t2(local_models):
+    features = dict(zip(t2.FEATURE_NAMES, local_models[0].tolist()))
+
+    fused = call(t12.lambda_handler, {'features': features, 'top_n': 5})
+
+    predicted = call(t1.lambda_handler, {'features': features})
+    assert fused['prediction']['probability'] == pytest.approx(predicted['prediction']['probability'])
+
+    explained = call(t2.lambda_handler, {
+        'features': features, 'latent_features': fused['latent_features'], 'attribution_mode': 'shap',
+        'prediction_proba': [1 - fused['prediction']['probability'], fused['prediction']['probability']],
+        'generate_chart': False, 'top_n': 5
+    })
+    assert [name for name, _ in fused['top_features']] == [name for name, _ in explained['top_features']]
+    for name, value in explained['feature_contributions'].items():
+        assert fused['feature_contributions'][name] == pytest.approx(value, abs=1e-6)
+    assert fused['equipment_ranking'] == explained['equipment_ranking']
+
+
+def test_fused_response_includes_equipment_groups(local_models):
+    fused = call(t12.lambda_handler, {'features': local_models[1].tolist(), 'top_n': 30})
+
+    assert any(desc['equipment_groups'] for desc in fused['equipment_descriptions'] if 'equipment_groups' in desc)
+    assert fused['equipment_ranking'] and fused['equipment_ranking'][0]['score'] > 0
@@ -0,0 +1,60 @@
+"""
+Lambda T2 attribution 테스트 (로컬 학습 모델 사용, S3 불필요)
+- attribution_mode='shap': base_value + sum(phi)로 계산한 확률과 predict_proba 일치, latent 누락 시 0으로 채움
+"""
+
+import json
+import os
+import sys
+
+import numpy as np
+import pytest
+
+os.environ.setdefault('AWS_DEFAULT_REGION', 'us-east-1')
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'appservice'))
+
+import lambda_t2_importance as t2
+
+pytestmark = pytest.mark.usefixtures('t2_local_models')
+
+
+def call(**body):
+    result = t2.lambda_handler({'body': body}, None)
+    assert result['statusCode'] == 200
+    return json.loads(result['body'])
+
+
+def sample(seed=1):
+    rng = np.random.default_rng(seed)
+    return dict(zip(t2.FEATURE_NAMES, rng.normal(size=30).tolist())), rng.normal(size=12).tolist()
+
+
+def test_shap_mode_probability_from_attributions():
+    features, latent = sample()
+
+    body = call(features=features, latent_features=latent, attribution_mode='shap', generate_chart=False)
+
+    combined = np.concatenate([t2.scaler.transform([[features[name] for name in t2.FEATURE_NAMES]]), [latent]], axis=1)
+    assert body['cache']['prediction_proba_source'] == 'attribution'
+    np.testing.assert_allclose(body['prediction_proba'], t2.gb_model.predict_proba(combined)[0], atol=1e-9)
+    log_odds = body['base_value'] + sum(body['feature_contributions'].values()) + body['latent_total']
+    assert log_odds == pytest.approx(t2.gb_model.decision_function(combined)[0], abs=1e-9)
+
+    requested = call(features=features, latent_features=latent, attribution_mode='shap', generate_chart=False,
+                     prediction_proba=[0.3, 0.7])
+    assert requested['prediction_proba'] == [0.3, 0.7]
+    assert requested['cache']['prediction_proba_source'] == 'request'
+
+
+def test_shap_mode_imputes_missing_latent():
+    features, _ = sample()
+
+    body = call(features=features, attribution_mode='shap', generate_chart=False)
+
+    assert body['attribution_mode_used'] == 'shap' and body['latent_imputed']
+    combined = np.concatenate([t2.scaler.transform([[features[name] for name in t2.FEATURE_NAMES]]),
+                               np.zeros((1, 12))], axis=1)
+    np.testing.assert_allclose(body['prediction_proba'], t2.gb_model.predict_proba(combined)[0], atol=1e-9)
+
+    with_latent = call(features=features, latent_features=sample()[1], attribution_mode='shap', generate_chart=False)
+    assert with_latent['attribution_mode_used'] == 'shap' and not with_latent['latent_imputed']
@@ -0,0 +1,70 @@
+"""
+Lambda T2 배치 attribution 집계 테스트 (로컬 학습 모델 사용, S3 불필요)
+"""
+
+import json
+import os
+import sys
+
+import numpy as np
+import pytest
+
+os.environ.setdefault('AWS_DEFAULT_REGION', 'us-east-1')
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'appservice'))
+
+import lambda_t2_importance as t2
+
+pytestmark = pytest.mark.usefixtures('t2_local_models')
+
+
+def call_batch(**body):
+    result = t2.lambda_handler({'body': dict(action='batch', **body)}, None)
+    return result['statusCode'], json.loads(result['body'])
+
+
+def test_batch_matches_per_row_attributions():
+    rng = np.random.default_rng(1)
+    rows = rng.normal(size=(40, 30))
+    latent = rng.normal(size=(40, 12))
+
+    status, body = call_batch(feature_matrix=rows.tolist(), latent_matrix=latent.tolist(), return_matrix=True)
+    assert status == 200
+    assert body['n_rows'] == 40 and not body['latent_imputed']
+
+    combined = np.concatenate([t2.scaler.transform(rows), latent], axis=1)
+    phi, _ = t2.compute_attributions(combined)
+    np.testing.assert_allclose(body['attributions'], phi)
+
+    mean_abs = body['overall']['mean_abs_attribution']
+    np.testing.assert_allclose([mean_abs[name] for name in t2.FEATURE_NAMES], np.abs(phi[:, :30]).mean(axis=0))
+    assert sum(group['count'] for group in body['by_class'].values()) == 40
+
+
+def test_equipment_groups_sum_related_features():
+    rows = np.random.default_rng(2).normal(size=(10, 30))
+    _, body = call_batch(feature_matrix=[dict(zip(t2.FEATURE_NAMES, row)) for row in rows])
+
+    assert body['latent_imputed'] and 'attributions' not in body
+    mean_abs = body['overall']['mean_abs_attribution']
+    scores = [group['score'] for group in body['by_equipment']]
+    assert scores == sorted(scores, reverse=True)
+    for group in body['by_equipment']:
+        assert group['score'] == pytest.approx(sum(mean_abs[name] for name in group['features']))
+
+
+def test_batch_rejects_wrong_shapes():
+    status, _ = call_batch(feature_matrix=[[1.0, 2.0]])
+    assert status == 400
+    status, _ = call_batch(feature_matrix=np.zeros((3, 30)).tolist(), latent_matrix=np.zeros((1, 12)).tolist())
+    assert status == 400
+
+
+def test_equipment_rollup_dense_matches_sparse(monkeypatch):
+    importance = {name: float(i) for i, name in enumerate(t2.FEATURE_NAMES)}
+    sparse_ranking = t2.feature_importance_ranking(importance)
+
+    monkeypatch.setattr(t2, 'SCIPY_AVAILABLE', False)
+    t2.compile_equipment_matrix(t2.equipment_mapping)
+    assert isinstance(t2.equipment_matrix, np.ndarray)
+    assert t2.feature_importance_ranking(importance) == sparse_ranking
+    assert sparse_ranking[0]['id'] == 'cooling_system'  # Sensor_Temperature2 + Sensor_Flow + Process_CoolingTime
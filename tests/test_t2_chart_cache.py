@@ -0,0 +1,50 @@
+"""
+Lambda T2 차트 cache 테스트 - content-addressed 차트 S3 key, presigned URL cache (S3는 fake client로 대체)
+"""
+
+import json
+import os
+import sys
+
+os.environ.setdefault('AWS_DEFAULT_REGION', 'us-east-1')
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'appservice'))
+
+import lambda_t2_importance as t2
+
+
+def test_chart_key_is_content_addressed(monkeypatch):
+    sorted_features = [('Process_Temperature', 0.4), ('Sensor_Flow', 0.25)]
+
+    key = t2.chart_cache_key(sorted_features, 2)
+    assert key == t2.chart_cache_key([tuple(item) for item in json.loads(json.dumps(sorted_features))], 2)
+    assert key != t2.chart_cache_key(sorted_features, 3)
+    assert key != t2.chart_cache_key([('Process_Temperature', 0.41), ('Sensor_Flow', 0.25)], 2)
+
+    monkeypatch.setattr(t2, 'MODEL_VERSION', 'other')
+    assert key != t2.chart_cache_key(sorted_features, 2)
+
+
+class CountingS3:
+    def __init__(self):
+        self.signed = 0
+
+    def generate_presigned_url(self, operation, Params, ExpiresIn):
+        self.signed += 1
+        return f"https://example.com/{Params['Key']}?sig={self.signed}"
+
+
+def test_presigned_url_cache_expires_before_url(monkeypatch):
+    s3, now = CountingS3(), [1000.0]
+    monkeypatch.setattr(t2, 's3', s3)
+    monkeypatch.setattr(t2, 'presigned_url_cache', {})
+    monkeypatch.setattr(t2.time, 'time', lambda: now[0])
+
+    first = t2.generate_presigned_url('analysis/chart.png', expiration=3600)
+    now[0] += 3600 - t2.PRESIGNED_URL_REFRESH_MARGIN - 1
+    assert t2.generate_presigned_url('analysis/chart.png', expiration=3600) == first and s3.signed == 1
+
+    # URL 만료 전 refresh margin 안에 들어오면 새 URL 발급
+    now[0] += 2
+    second = t2.generate_presigned_url('analysis/chart.png', expiration=3600)
+    assert second != first and s3.signed == 2
+    assert t2.presigned_url_cache['analysis/chart.png'][1] == now[0] + 3600
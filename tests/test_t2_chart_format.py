@@ -0,0 +1,75 @@
+"""
+Lambda T2 chart_format 테스트 (로컬 학습 모델 사용, S3 / matplotlib 렌더링은 fake로 대체)
+- 기본 png (chart_url), svg / data는 명시적 선택
+"""
+
+import json
+import os
+import sys
+
+import numpy as np
+import pytest
+
+os.environ.setdefault('AWS_DEFAULT_REGION', 'us-east-1')
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'appservice'))
+
+from botocore.exceptions import ClientError
+
+import lambda_t2_importance as t2
+
+pytestmark = pytest.mark.usefixtures('t2_local_models')
+
+
+class FakeS3:
+    def __init__(self):
+        self.objects = {}
+
+    def head_object(self, Bucket, Key):
+        if Key not in self.objects:
+            raise ClientError({'Error': {'Code': '404'}}, 'HeadObject')
+        return {}
+
+    def generate_presigned_url(self, operation, Params, ExpiresIn):
+        return f"https://example.com/{Params['Key']}"
+
+
+def call(**body):
+    result = t2.lambda_handler({'body': body}, None)
+    assert result['statusCode'] == 200
+    return json.loads(result['body'])
+
+
+def sample(seed=1):
+    rng = np.random.default_rng(seed)
+    return dict(zip(t2.FEATURE_NAMES, rng.normal(size=30).tolist())), rng.normal(size=12).tolist()
+
+
+def test_default_chart_is_png_url(monkeypatch):
+    s3 = FakeS3()
+    monkeypatch.setattr(t2, 's3', s3)
+    monkeypatch.setattr(t2, 'uploaded_chart_keys', set())
+    monkeypatch.setattr(t2, 'presigned_url_cache', {})
+
+    def render(sorted_features, top_n, s3_key):
+        s3.objects[s3_key] = b'png'
+        return True
+
+    monkeypatch.setattr(t2, 'render_and_upload_chart', render)
+
+    body = call(top_n=5, generate_chart=True, prediction_proba=[0.8, 0.2])
+
+    assert body['chart_url'] == f"https://example.com/{next(iter(s3.objects))}"
+    assert 'chart_svg' not in body and 'chart_data' not in body
+
+
+def test_svg_and_data_formats_are_opt_in():
+    features, latent = sample()
+
+    data = call(features=features, latent_features=latent, attribution_mode='shap', chart_format='data', top_n=5)
+    assert data['chart_data']['labels'] == [name for name, _ in data['top_features']]
+    assert len(data['chart_data']['values']) == 5
+    assert 'chart_svg' not in data and data['chart_url'] is None
+
+    svg = call(top_n=5, chart_format='svg', prediction_proba=[0.8, 0.2])
+    assert svg['chart_svg'].startswith('<svg') and svg['chart_svg'].count('<rect') == 5
+    assert 'chart_data' not in svg and svg['chart_url'] is None
@@ -0,0 +1,114 @@
+"""
+Lambda T2 비동기 차트 작업 (chart_mode='async') 생명주기 테스트 - S3 / Lambda 호출은 fake client로 대체
+"""
+
+import io
+import json
+import os
+import sys
+
+import pytest
+
+os.environ.setdefault('AWS_DEFAULT_REGION', 'us-east-1')
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'appservice'))
+
+from botocore.exceptions import ClientError
+
+import lambda_t2_importance as t2
+
+IMPORTANCE = {'Process_Temperature': 0.4, 'Process_Pressure': 0.35, 'Sensor_Flow': 0.25}
+
+
+class FakeS3:
+    def __init__(self):
+        self.objects = {}
+
+    def head_object(self, Bucket, Key):
+        if Key not in self.objects:
+            raise ClientError({'Error': {'Code': '404'}}, 'HeadObject')
+        return {}
+
+    def get_object(self, Bucket, Key):
+        if Key not in self.objects:
+            raise ClientError({'Error': {'Code': 'NoSuchKey'}}, 'GetObject')
+        return {'Body': io.BytesIO(self.objects[Key])}
+
+    def put_object(self, Bucket, Key, Body, ContentType=None):
+        self.objects[Key] = Body
+
+    def generate_presigned_url(self, operation, Params, ExpiresIn):
+        return f"https://example.com/{Params['Key']}"
+
+
+class FakeLambda:
+    def __init__(self):
+        self.payloads = []
+
+    def invoke(self, FunctionName, InvocationType, Payload):
+        self.payloads.append(json.loads(Payload))
+
+
+@pytest.fixture
+def fake_aws(monkeypatch):
+    s3, client = FakeS3(), FakeLambda()
+    monkeypatch.setattr(t2, 's3', s3)
+    monkeypatch.setattr(t2, 'lambda_client', client)
+    monkeypatch.setattr(t2, 'CHART_WORKER_FUNCTION', 'chart-worker')
+    monkeypatch.setattr(t2, 'chart_jobs', {})
+    monkeypatch.setattr(t2, 'uploaded_chart_keys', set())
+    monkeypatch.setattr(t2, 'presigned_url_cache', {})
+
+    def render(sorted_features, top_n, s3_key):
+        s3.put_object(Bucket=t2.BUCKET_NAME, Key=s3_key, Body=b'png')
+        return True
+
+    monkeypatch.setattr(t2, 'render_and_upload_chart', render)
+    return s3, client
+
+
+def call(event):
+    result = t2.lambda_handler(event, None)
+    return result['statusCode'], json.loads(result['body'])
+
+
+def test_async_job_lifecycle_across_containers(fake_aws, monkeypatch):
+    s3, client = fake_aws
+
+    started = t2.start_chart_job(IMPORTANCE, 3)
+    assert started['chart_state'] == 'pending' and started['chart_url'] is None
+    payload = client.payloads[0]
+
+    # 다른 컨테이너의 조회: 메모리 기록 없이 S3 marker로 pending 확인
+    monkeypatch.setattr(t2, 'chart_jobs', {})
+    status, body = call({'body': json.dumps({'action': 'chart_status', 'chart_id': started['chart_id']})})
+    assert status == 200 and body['chart_state'] == 'pending'
+
+    # 워커: 비동기 self-invoke payload는 event 자체
+    status, body = call(payload)
+    assert status == 200 and body['chart_state'] == 'ready'
+
+    monkeypatch.setattr(t2, 'chart_jobs', {})
+    status, body = call({'body': json.dumps({'action': 'chart_status', 'chart_id': started['chart_id']})})
+    assert status == 200 and body['chart_url'].endswith(t2.chart_s3_key(started['chart_id']))
+
+
+def test_unknown_and_expired_jobs(fake_aws, monkeypatch):
+    status, body = call({'body': json.dumps({'action': 'chart_status', 'chart_id': 'typo'})})
+    assert status == 404 and body['chart_state'] == 'unknown'
+
+    started = t2.start_chart_job(IMPORTANCE, 3)
+    monkeypatch.setattr(t2, 'CHART_JOB_TIMEOUT', -1)
+    status, body = call({'body': {'action': 'chart_status', 'chart_id': started['chart_id']}})
+    assert status == 200 and body['chart_state'] == 'failed' and 'timed out' in body['error']
+
+
+def test_render_chart_is_internal_and_validated(fake_aws):
+    s3, client = fake_aws
+    t2.start_chart_job(IMPORTANCE, 3)
+    payload = client.payloads[0]
+
+    assert call({'requestContext': {}, 'body': json.dumps(payload)})[0] == 403  # Function URL 요청
+    assert call({'action': 'render_chart', 'chart_id': payload['chart_id']})[0] == 400  # sorted_features 누락
+    assert call(dict(payload, sorted_features=[['Process_Temperature']]))[0] == 400
+    assert call(dict(payload, chart_id='0' * 24))[0] == 400  # content address 불일치
+    assert not any(key.endswith('.png') for key in s3.objects)
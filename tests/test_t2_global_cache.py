@@ -0,0 +1,33 @@
+"""
+Lambda T2 global importance cache 테스트 (로컬 학습 모델 사용, S3 불필요)
+- 같은 모델 버전의 feature importance / 상위 N개 / 장비 설명은 cache에서 제공
+"""
+
+import json
+import os
+import sys
+
+import pytest
+
+os.environ.setdefault('AWS_DEFAULT_REGION', 'us-east-1')
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'appservice'))
+
+import lambda_t2_importance as t2
+
+pytestmark = pytest.mark.usefixtures('t2_local_models')
+
+
+def call(**body):
+    result = t2.lambda_handler({'body': body}, None)
+    assert result['statusCode'] == 200
+    return json.loads(result['body'])
+
+
+def test_global_mode_served_from_cache():
+    call(top_n=7, generate_chart=False, prediction_proba=[0.8, 0.2])
+    body = call(top_n=7, generate_chart=False, prediction_proba=[0.8, 0.2])
+
+    assert set(body['cache']['served_from_cache']) == {'feature_importance', 'top_features', 'equipment_descriptions'}
+    cached = t2.global_cache[t2.MODEL_VERSION]['sorted_importance'][:7]
+    assert [tuple(item) for item in body['top_features']] == cached
+    assert body['attribution_mode_used'] == 'global'
@@ -0,0 +1,75 @@
+"""
+Lambda T3 batch 모드 (queries) 테스트 - Bedrock 호출은 fake client로 대체
+"""
+
+import io
+import json
+import os
+import sys
+import threading
+import time
+
+os.environ.setdefault('AWS_DEFAULT_REGION', 'us-east-1')
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'appservice'))
+
+import lambda_t3_rag as t3
+
+
+class FakeBedrock:
+    """동시 invoke_model 호출 수를 기록하는 fake client"""
+
+    def __init__(self, delay=0.05):
+        self.delay = delay
+        self.active = 0
+        self.max_active = 0
+        self.calls = 0
+        self.lock = threading.Lock()
+
+    def invoke_model(self, modelId, body):
+        with self.lock:
+            self.active += 1
+            self.calls += 1
+            self.max_active = max(self.max_active, self.active)
+        time.sleep(self.delay)
+        with self.lock:
+            self.active -= 1
+        prompt = json.loads(body)['messages'][0]['content']
+        answer = {'content': [{'text': f"답변 ({len(prompt)})"}]}
+        return {'body': io.BytesIO(json.dumps(answer).encode('utf-8'))}
+
+
+def call_batch(monkeypatch, client, queries, **body):
+    monkeypatch.setattr(t3, 'bedrock_runtime', client)
+    monkeypatch.setattr(t3, 'get_kb_version', lambda: 'job-1')
+    monkeypatch.setattr(t3, 'bedrock_slots', threading.BoundedSemaphore(2))
+    t3.answers.clear()
+    result = t3.lambda_handler({'body': dict(retriever='local', queries=queries, **body)}, None)
+    return result['statusCode'], json.loads(result['body'])
+
+
+def test_batch_results_in_order_with_bounded_generation(monkeypatch):
+    client = FakeBedrock()
+    queries = ['냉각 시간 기준은?', '금형 온도 관리 방법', '사출 속도 점검', '포로시티 원인', '냉각 시간 기준은?']
+
+    status, body = call_batch(monkeypatch, client, queries)
+
+    assert status == 200
+    assert [r['query'] for r in body['results']] == queries
+    assert client.calls == 4 and client.max_active <= 2
+    assert body['results'][4]['deduplicated'] and body['results'][4]['answer'] == body['results'][0]['answer']
+    assert all(r['timings_ms']['total_ms'] >= r['timings_ms']['retrieval_ms'] for r in body['results'])
+    assert body['batch'] == {'queries': 5, 'unique_queries': 4, 'unique_sources': len(body['sources']),
+                             'max_concurrent_generations': t3.BEDROCK_MAX_CONCURRENCY}
+
+
+def test_batch_shares_passages_between_queries(monkeypatch):
+    status, body = call_batch(monkeypatch, FakeBedrock(delay=0), ['냉각 시간', '냉각 시간 기준'])
+
+    first, second = (set(r['source_ids']) for r in body['results'])
+    assert first & second
+    assert len(body['sources']) == len(first | second)
+
+
+def test_batch_validates_queries(monkeypatch):
+    assert call_batch(monkeypatch, FakeBedrock(), [])[0] == 400
+    assert call_batch(monkeypatch, FakeBedrock(), ['q'] * (t3.BATCH_MAX_QUERIES + 1))[0] == 400
@@ -0,0 +1,73 @@
+"""
+Lambda T3 hybrid 검색 (Bedrock KB + 로컬 BM25 동시 실행, RRF 결합) 테스트
+"""
+
+import os
+import sys
+import time
+
+os.environ.setdefault('AWS_DEFAULT_REGION', 'us-east-1')
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'appservice'))
+
+import lambda_t3_rag as t3
+
+
+def kb_result(chunk_id, content, score=0.5):
+    return {'content': content, 'score': score, 'uri': f's3://bucket/{chunk_id}.md',
+            'source_type': 'S3', 'chunk_id': chunk_id}
+
+
+def test_rrf_fuses_and_deduplicates():
+    shared = {'content': '냉각 시간', 'passage_id': 'a.md#0-10', 'score': 3.0}
+    rankings = {
+        'knowledge_base': [kb_result('c1', 'x'), dict(shared, score=0.4)],
+        'local': [dict(shared), {'content': 'y', 'passage_id': 'b.md#0-5', 'score': 1.0}]
+    }
+
+    fused = t3.reciprocal_rank_fusion(rankings, max_results=5)
+
+    assert [t3.result_id(d) for d in fused] == ['a.md#0-10', 'c1', 'b.md#0-5']
+    assert fused[0]['score'] == 1 / (t3.RRF_K + 2) + 1 / (t3.RRF_K + 1)
+    assert fused[0]['retrievers'] == ['knowledge_base', 'local']
+
+
+def test_hybrid_drops_slow_branch(monkeypatch):
+    def slow_kb(query, max_results=5, category=None):
+        time.sleep(0.5)
+        return [kb_result('c1', 'late')]
+
+    monkeypatch.setattr(t3, 'retrieve_from_knowledge_base', slow_kb)
+
+    start = time.time()
+    results, info = t3.retrieve_hybrid('냉각 시간 가이드라인', max_results=3, deadline_ms=100)
+
+    assert time.time() - start < 0.4
+    assert info['branches']['knowledge_base']['state'] == 'timeout'
+    assert info['branches']['local']['state'] == 'ok'
+    assert results and all(r['retrievers'] == ['local'] for r in results)
+
+
+def test_hybrid_survives_branch_error(monkeypatch):
+    def failing_kb(query, max_results=5, category=None):
+        raise RuntimeError('throttled')
+
+    monkeypatch.setattr(t3, 'retrieve_from_knowledge_base', failing_kb)
+    results, info = t3.retrieve_hybrid('보호구 착용', max_results=3)
+
+    assert info['branches']['knowledge_base']['state'] == 'error'
+    assert len(results) == 3
+
+
+def test_concurrent_hybrid_branches_do_not_queue(monkeypatch):
+    # batch 모드 최대 동시 질의 수만큼 hybrid 검색 - 모든 branch가 바로 실행되어야 deadline 내 완료
+    def slow_kb(query, max_results=5, category=None):
+        time.sleep(0.3)
+        return [kb_result('c1', 'kb')]
+
+    monkeypatch.setattr(t3, 'retrieve_from_knowledge_base', slow_kb)
+
+    futures = [t3.batch_executor.submit(t3.retrieve_hybrid, '냉각 시간 가이드라인', None, 3, 500)
+               for _ in range(t3.BATCH_MAX_WORKERS)]
+    infos = [future.result()[1] for future in futures]
+
+    assert all(info['branches']['knowledge_base']['state'] == 'ok' for info in infos)
@@ -0,0 +1,140 @@
+"""
+Lambda T3 streaming 답변 (NDJSON) 테스트 - Bedrock streaming 응답은 fake client로 대체
+- t3_stream_server: 로컬 HTTP 서버로 delta가 생성 즉시 전송되는지 확인
+"""
+
+import http.client
+import json
+import os
+import sys
+import threading
+
+os.environ.setdefault('AWS_DEFAULT_REGION', 'us-east-1')
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'appservice'))
+
+import lambda_t3_rag as t3
+import t3_stream_server
+
+
+class FakeBedrockStream:
+    """invoke_model_with_response_stream 이벤트 형식을 흉내내는 fake client"""
+
+    def __init__(self, texts, fail_after=None, gate=None):
+        self.texts = texts
+        self.fail_after = fail_after
+        self.gate = gate  # 설정 시 첫 delta 이후 gate가 열릴 때까지 다음 delta 보류
+        self.calls = 0
+
+    def invoke_model_with_response_stream(self, modelId, body):
+        self.calls += 1
+        return {'body': self.events()}
+
+    def events(self):
+        yield self.chunk({'type': 'message_start', 'message': {}})
+        for i, text in enumerate(self.texts):
+            if self.fail_after is not None and i == self.fail_after:
+                raise RuntimeError('stream interrupted')
+            if self.gate is not None and i == 1:
+                assert self.gate.wait(timeout=5), 'first delta was not delivered before the rest of the answer'
+            yield self.chunk({'type': 'content_block_delta', 'index': 0,
+                              'delta': {'type': 'text_delta', 'text': text}})
+        yield self.chunk({'type': 'message_stop'})
+
+    @staticmethod
+    def chunk(payload):
+        return {'chunk': {'bytes': json.dumps(payload).encode('utf-8')}}
+
+
+def call_stream(monkeypatch, client, **body):
+    monkeypatch.setattr(t3, 'bedrock_runtime', client)
+    monkeypatch.setattr(t3, 'get_kb_version', lambda: 'job-1')
+    t3.answers.clear()
+    result = t3.lambda_handler({'body': dict(retriever='local', stream=True, **body)}, None)
+    assert result['headers']['Content-Type'] == 'application/x-ndjson'
+    return [json.loads(line) for line in result['body'].splitlines()]
+
+
+def test_stream_emits_sources_deltas_and_done(monkeypatch):
+    client = FakeBedrockStream(['냉각 시간은 ', '15-20초', '입니다.'])
+    events = call_stream(monkeypatch, client, query='냉각 시간 기준은?')
+
+    assert events[0]['type'] == 'sources' and events[0]['sources']
+    deltas = [e['text'] for e in events if e['type'] == 'delta']
+    assert deltas == ['냉각 시간은 ', '15-20초', '입니다.']
+
+    done = events[-1]
+    assert done['type'] == 'done'
+    assert done['answer'] == '냉각 시간은 15-20초입니다.'
+    assert done['answer_cache']['status'] == 'miss'
+    assert done['first_token_ms'] <= done['processing_time_ms']
+
+    # 같은 질의는 cache에서 delta 1개로 응답
+    monkeypatch.setattr(t3, 'bedrock_runtime', client)
+    again = [json.loads(line) for line in t3.lambda_handler(
+        {'body': {'query': '냉각 시간 기준은?', 'retriever': 'local', 'stream': True}}, None)['body'].splitlines()]
+    assert [e['type'] for e in again] == ['sources', 'delta', 'done']
+    assert again[-1]['answer_cache']['status'] == 'hit'
+    assert client.calls == 1
+
+
+def test_stream_interrupted_keeps_partial_answer(monkeypatch):
+    events = call_stream(monkeypatch, FakeBedrockStream(['보호구 ', '착용 ', '필수'], fail_after=2),
+                         query='보호구 착용 기준')
+
+    assert [e['type'] for e in events] == ['sources', 'delta', 'delta', 'error', 'done']
+    assert events[-1]['answer'] == '보호구 착용'
+    assert len(t3.answers.entries) == 0
+
+
+def test_stream_falls_back_before_first_token(monkeypatch):
+    events = call_stream(monkeypatch, FakeBedrockStream(['x'], fail_after=0), query='불량의 주요 원인은?')
+
+    assert [e['type'] for e in events] == ['sources', 'delta', 'done']
+    assert events[-1]['answer'] == t3.generate_fallback_answer('불량의 주요 원인은?')
+
+
+def test_stream_holds_bedrock_slot_until_stream_ends(monkeypatch):
+    slots = threading.BoundedSemaphore(1)
+    monkeypatch.setattr(t3, 'bedrock_slots', slots)
+    monkeypatch.setattr(t3, 'bedrock_runtime', FakeBedrockStream(['a', 'b']))
+
+    stream = t3.stream_claude('prompt')
+    assert next(stream) == 'a'
+    assert not slots.acquire(blocking=False)  # stream 읽는 동안 점유
+    stream.close()
+    assert slots.acquire(blocking=False)  # 중간에 닫아도 반환
+    slots.release()
+
+    assert list(t3.stream_claude('prompt')) == ['a', 'b']
+    assert slots.acquire(blocking=False)
+
+
+def test_server_sends_each_line_as_generated(monkeypatch):
+    gate = threading.Event()
+    monkeypatch.setattr(t3, 'bedrock_runtime', FakeBedrockStream(['냉각 시간은 ', '15-20초'], gate=gate))
+    monkeypatch.setattr(t3, 'get_kb_version', lambda: 'job-1')
+    t3.answers.clear()
+
+    server = t3_stream_server.ThreadingHTTPServer(('127.0.0.1', 0), t3_stream_server.T3RequestHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        conn = http.client.HTTPConnection('127.0.0.1', server.server_address[1], timeout=10)
+        conn.request('POST', '/', json.dumps({'query': '냉각 시간 기준은?', 'retriever': 'local', 'stream': True}),
+                     {'Content-Type': 'application/json'})
+        response = conn.getresponse()
+        assert response.status == 200 and response.getheader('Transfer-Encoding') == 'chunked'
+
+        assert json.loads(response.readline())['type'] == 'sources'
+        # 두 번째 delta는 gate가 열려야 생성되므로, 첫 delta가 먼저 도착해야 진행 가능
+        assert json.loads(response.readline()) == {'type': 'delta', 'text': '냉각 시간은 '}
+        gate.set()
+        rest = [json.loads(line) for line in response.read().splitlines()]
+        assert [e['type'] for e in rest] == ['delta', 'done'] and rest[-1]['answer'] == '냉각 시간은 15-20초'
+
+        conn.request('POST', '/', json.dumps({'query': ''}), {'Content-Type': 'application/json'})
+        response = conn.getresponse()
+        assert response.status == 400 and json.loads(response.read())['error'] == 'Query is required'
+        conn.close()
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,88 @@
+"""
+Native TreeSHAP 테스트
+- shap.TreeExplainer (tree_path_dependent)와의 값 일치 확인
+- 배포 모델 검증: DEPLOYED_GB_MODEL=deployment_models/gradient_boosting_model.pkl pytest tests/test_tree_shap.py
+"""
+
+import os
+import pickle
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'appservice'))
+
+from sklearn.ensemble import GradientBoostingClassifier
+from tree_shap import TreeShapExplainer
+
+
+def make_model(max_depth=3, subsample=1.0, n_features=42):
+    """배포 모델과 같은 42D (30D + 12D latent) 입력의 GB 모델 학습"""
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(1000, n_features))
+    y = (X[:, 0] * X[:, 1] + X[:, 4] - X[:, 35] + rng.normal(size=1000) * 0.5 > 0).astype(int)
+    model = GradientBoostingClassifier(
+        n_estimators=50, max_depth=max_depth, subsample=subsample, random_state=0
+    ).fit(X, y)
+    return model, X
+
+
+def load_deployed_model():
+    path = os.environ.get('DEPLOYED_GB_MODEL')
+    if not path:
+        pytest.skip('DEPLOYED_GB_MODEL not set')
+    with open(path, 'rb') as f:
+        model = pickle.load(f)
+    X = np.random.default_rng(1).normal(size=(200, model.n_features_in_))
+    return model, X
+
+
+@pytest.mark.parametrize('max_depth,subsample', [(1, 1.0), (3, 1.0), (3, 0.8), (5, 1.0)])
+def test_additivity(max_depth, subsample):
+    """phi 합 + expected_value == decision_function"""
+    model, X = make_model(max_depth, subsample)
+    explainer = TreeShapExplainer(model)
+    phi = explainer.shap_values(X[:300])
+
+    np.testing.assert_allclose(phi.sum(axis=1) + explainer.expected_value,
+                               model.decision_function(X[:300]), atol=1e-10)
+    np.testing.assert_allclose(explainer.predict_raw(X[:300]),
+                               model.decision_function(X[:300]), atol=1e-10)
+
+
+@pytest.mark.parametrize('max_depth,subsample', [(3, 1.0), (3, 0.8), (5, 1.0)])
+def test_parity_with_shap(max_depth, subsample):
+    shap = pytest.importorskip('shap')
+    model, X = make_model(max_depth, subsample)
+
+    expected = shap.TreeExplainer(model).shap_values(X[:200])
+    explainer = TreeShapExplainer(model)
+
+    np.testing.assert_allclose(explainer.shap_values(X[:200]), expected, atol=1e-10)
+
+
+def test_parity_with_shap_deployed_model():
+    shap = pytest.importorskip('shap')
+    model, X = load_deployed_model()
+
+    reference = shap.TreeExplainer(model)
+    explainer = TreeShapExplainer(model)
+
+    np.testing.assert_allclose(explainer.shap_values(X), reference.shap_values(X), atol=1e-8)
+    assert explainer.expected_value == pytest.approx(float(np.atleast_1d(reference.expected_value)[-1]))
+
+
+def test_batch_matches_single_rows():
+    model, X = make_model()
+    explainer = TreeShapExplainer(model, batch_size=7)
+
+    batch = explainer.shap_values(X[:20])
+    single = np.vstack([explainer.shap_values(X[i:i + 1]) for i in range(20)])
+    np.testing.assert_allclose(batch, single, atol=1e-12)
+
+
+def test_rejects_wrong_feature_count():
+    model, X = make_model()
+    with pytest.raises(ValueError):
+        TreeShapExplainer(model).shap_values(X[:, :30])
@@ -0,0 +1,75 @@
+"""
+What-if sweep 테스트 (AutoEncoder 대신 Scaling → GB 파이프라인으로 채점)
+"""
+
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'appservice'))
+
+from sklearn.ensemble import GradientBoostingClassifier
+from sklearn.preprocessing import StandardScaler
+
+import whatif_sweep
+
+FEATURE_NAMES = [f'Process_F{i}' for i in range(5)] + [f'Sensor_F{i}' for i in range(25)]
+
+
+@pytest.fixture(scope='module')
+def pipeline():
+    rng = np.random.default_rng(0)
+    X = rng.normal(loc=100.0, scale=10.0, size=(2000, 30))
+    y = (X[:, 0] + 0.5 * X[:, 1] > 160).astype(int)  # F0, F1을 낮추면 양품
+    scaler = StandardScaler().fit(X)
+    model = GradientBoostingClassifier(n_estimators=50, random_state=0).fit(scaler.transform(X), y)
+
+    def predict_defect_proba(features):
+        return model.predict_proba(scaler.transform(features))[:, 1]
+
+    return scaler, predict_defect_proba
+
+
+def test_parse_guideline_ranges():
+    ranges = whatif_sweep.parse_guideline_ranges({
+        'A': {'description': '용탕 온도입니다. 650-680°C가 적정 범위이며'},
+        'B': {'description': '2.0-3.0 m/s가 적정 범위'},
+        'C': {'description': '범위 정보 없음'}
+    })
+    assert ranges == {'A': (650.0, 680.0), 'B': (2.0, 3.0)}
+
+
+def test_select_sweep_features_only_controllable():
+    contributions = {'Sensor_F0': 5.0, 'Process_F0': 1.0, 'Process_F1': 2.0, 'Process_F2': -3.0}
+    assert whatif_sweep.select_sweep_features(contributions, top_k=2) == ['Process_F1', 'Process_F0']
+
+
+def test_sweep_finds_minimal_flip(pipeline):
+    scaler, predict_defect_proba = pipeline
+    base = np.full(30, 100.0)
+    base[0], base[1] = 130.0, 110.0
+    assert predict_defect_proba(base[None, :])[0] >= 0.5
+
+    result = whatif_sweep.run_sweep(
+        base, FEATURE_NAMES, ['Process_F0', 'Process_F1'], predict_defect_proba,
+        {'Process_F0': (80.0, 140.0)}, scaler.scale_, steps=21
+    )
+
+    assert result['base_class'] == 'defect' and result['n_flipped'] > 0
+    best = result['counterfactuals'][0]
+    assert best['defect_proba'] < 0.5
+    assert all(change['delta'] < 0 for change in best['changes'])
+    distances = [cf['distance'] for cf in result['counterfactuals']]
+    assert distances == sorted(distances)
+    assert result['sweep_features']['Process_F1']['source'] == 'scaler'
+
+
+def test_sweep_rejects_oversized_grid(pipeline):
+    scaler, predict_defect_proba = pipeline
+    with pytest.raises(ValueError):
+        whatif_sweep.run_sweep(
+            np.full(30, 100.0), FEATURE_NAMES, FEATURE_NAMES[:5], predict_defect_proba,
+            {}, scaler.scale_, steps=20
+        )